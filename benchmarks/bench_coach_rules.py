@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CoachAgent rule engine on a large brand summary.
+
+Compares the vectorized rule table (saricoach.agents.coach.evaluate_rules)
+against the previous per-row iterrows() loop and checks both produce the
+same actions/risks/opportunities.
+
+    python benchmarks/bench_coach_rules.py --brands 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from saricoach.agents.coach import CoachAgent
+from saricoach.eval.types import AnalyticsResult, PlannerDecision
+
+
+def iterrows_coach(bs: pd.DataFrame):
+    """The pre-rule-table heuristics, kept here as the reference."""
+    actions, risks, opps = [], [], []
+    for _, row in bs.iterrows():
+        brand, cat = row["brand_name"], row["category"]
+        if row.get("risk_stockout_score", 0) > 0:
+            risks.append(f"{brand} ({cat}) is at risk of stockout: low facings and some days out-of-stock despite demand.")
+            actions.append(f"Increase {brand} facings and ensure safety stock for the next 7 days, especially on peak days.")
+        if row.get("risk_visibility_score", 0) > 0:
+            risks.append(f"{brand} ({cat}) has low share of shelf vs other brands in the same category.")
+            actions.append(f"Rearrange the shelf to give {brand} more eye-level space or move it closer to the counter.")
+        if row.get("opp_high_demand_score", 0) > 0:
+            opps.append(f"{brand} ({cat}) shows strong demand and positive sentiment when traffic is high.")
+            actions.append(f"Highlight {brand} with small in-store signage or bundles, especially on weekends and paydays.")
+
+    def dedupe(items):
+        return list(dict.fromkeys(items))
+
+    return dedupe(actions), dedupe(risks), dedupe(opps)
+
+
+def make_summary(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "brand_id": np.arange(n),
+        "brand_name": [f"Brand {i % (n // 2 or 1)}" for i in range(n)],
+        "category": rng.choice(["Snacks", "Beverages", "Tobacco"], n),
+        "risk_stockout_score": (rng.random(n) < 0.2).astype(float),
+        "risk_visibility_score": (rng.random(n) < 0.3).astype(float),
+        "opp_high_demand_score": (rng.random(n) < 0.25).astype(float),
+    })
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bs = make_summary(args.brands)
+    analytics = AnalyticsResult(
+        store_id=1,
+        decision=PlannerDecision("analyze_store", 1),
+        feature_frame=pd.DataFrame(),
+        brand_summary=bs,
+    )
+    agent = CoachAgent()
+
+    out = agent.coach(analytics)
+    assert (out.actions, out.risks, out.opportunities) == iterrows_coach(bs), "outputs differ"
+
+    t_rules = best_of(lambda: agent.coach(analytics), args.repeat)
+    t_rows = best_of(lambda: iterrows_coach(bs), args.repeat)
+    print(f"brands={args.brands}")
+    print(f"iterrows   : {t_rows * 1e3:8.2f} ms  ({t_rows / args.brands * 1e6:6.2f} us/brand)")
+    print(f"rule table : {t_rules * 1e3:8.2f} ms  ({t_rules / args.brands * 1e6:6.2f} us/brand)")
+    print(f"speedup    : {t_rows / t_rules:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
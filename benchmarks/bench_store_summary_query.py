@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Benchmark store summary fetching under network latency.
+
+Compares the previous five sequential queries per store against the
+single STORE_SUMMARY_SQL round trip (one store, and N stores in bulk).
+Each cursor.execute sleeps --rtt-ms to simulate the network round trip.
+
+Without --db-url the queries are answered by an in-memory fake, so only
+the round-trip count matters. With --db-url the real SQL runs against
+Postgres (tables from supabase/schema) with the latency added on top.
+
+    python benchmarks/bench_store_summary_query.py --rtt-ms 20 --stores 50
+"""
+import argparse
+import datetime as dt
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from service.app.backend.supabase_backend import STORE_SUMMARY_SQL, _calc_delta, summary_from_row
+from service.app.models import Kpi, StoreSummary
+
+
+def legacy_fetch_store_summary(conn, store_id):
+    """The pre-CTE five-query fetch, kept here as the reference."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT name FROM stores WHERE id = %s", (store_id,))
+        store_res = cur.fetchone()
+        if not store_res:
+            return None
+        store_name = store_res[0]
+
+        cur.execute("SELECT date FROM daily_metrics WHERE store_id = %s ORDER BY date DESC LIMIT 1", (store_id,))
+        latest_date_res = cur.fetchone()
+        if not latest_date_res:
+            return StoreSummary(store_id=store_id, store_name=store_name, period="No Data", kpis=[],
+                                chart=[], insights=[], coach_message="No data recorded yet.")
+        latest_date = latest_date_res[0]
+
+        cur.execute(
+            "SELECT date, volume, revenue, avg_basket_size, avg_duration_seconds "
+            "FROM daily_metrics WHERE store_id = %s ORDER BY date DESC LIMIT 2",
+            (store_id,),
+        )
+        rows = cur.fetchall()
+        curr_vol, curr_rev, curr_basket, curr_dur = rows[0][1:]
+        if len(rows) > 1:
+            prev_vol, prev_rev, prev_basket, prev_dur = rows[1][1:]
+            d_vol = _calc_delta(curr_vol, prev_vol)
+            d_rev = _calc_delta(curr_rev, prev_rev)
+            d_basket = _calc_delta(curr_basket, prev_basket)
+            d_dur = _calc_delta(curr_dur, prev_dur)
+        else:
+            d_vol = d_rev = d_basket = d_dur = 0.0
+
+        cur.execute(
+            "SELECT hour_of_day, volume FROM hourly_traffic "
+            "WHERE store_id = %s AND date = %s ORDER BY hour_of_day ASC",
+            (store_id, latest_date),
+        )
+        chart_data = [{"date": f"{row[0]:02d}:00", "volume": row[1]} for row in cur.fetchall()]
+
+        cur.execute(
+            "SELECT insights, coach_message FROM daily_insights WHERE store_id = %s AND date = %s",
+            (store_id, latest_date),
+        )
+        insight_res = cur.fetchone()
+        insights_list = insight_res[0] if insight_res else []
+        coach_msg = insight_res[1] if insight_res else "Analysis pending..."
+
+        return StoreSummary(
+            store_id=store_id,
+            store_name=store_name,
+            period=f"Latest ({latest_date.strftime('%Y-%m-%d')})",
+            kpis=[
+                Kpi(label="Daily Volume", value=curr_vol, delta_pct=round(d_vol, 1), trend="up" if d_vol >= 0 else "down"),
+                Kpi(label="Daily Revenue", value=f"₱{curr_rev:,.0f}", delta_pct=round(d_rev, 1), trend="up" if d_rev >= 0 else "down"),
+                Kpi(label="Avg Basket", value=float(curr_basket), delta_pct=round(d_basket, 1), trend="up" if d_basket >= 0 else "down"),
+                Kpi(label="Avg Duration", value=f"{curr_dur}s", delta_pct=round(d_dur, 1), trend="up" if d_dur >= 0 else "down"),
+            ],
+            chart=chart_data,
+            insights=insights_list,
+            coach_message=coach_msg,
+        )
+
+
+def bulk_fetch(conn, store_ids):
+    with conn.cursor() as cur:
+        cur.execute(STORE_SUMMARY_SQL, (list(store_ids),))
+        return {row[0]: summary_from_row(row) for row in cur.fetchall()}
+
+
+def make_data(num_stores, days=30, seed=7):
+    rng = random.Random(seed)
+    last = dt.date(2024, 3, 1)
+    data = {"stores": {}, "metrics": {}, "traffic": {}, "insights": {}}
+    for sid in range(1, num_stores + 1):
+        data["stores"][sid] = f"Store {sid}"
+        # Store 1 has no data at all, to exercise the empty state
+        if sid == 1:
+            continue
+        for d in range(days):
+            date = last - dt.timedelta(days=d)
+            data["metrics"][(sid, date)] = (
+                date, rng.randint(50, 500), Decimal(rng.randint(1000, 90000)) / 100,
+                Decimal(rng.randint(100, 500)) / 100, rng.randint(20, 90),
+            )
+        data["traffic"][(sid, last)] = [(h, rng.randint(0, 60)) for h in range(7, 21)]
+        if sid % 3:
+            data["insights"][(sid, last)] = ([f"Insight for store {sid}"], "Keep it up")
+    return data
+
+
+class FakeCursor:
+    """Answers exactly the queries above from in-memory data."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _metrics(self, sid):
+        rows = [v for (s, _), v in self.conn.data["metrics"].items() if s == sid]
+        return sorted(rows, key=lambda r: r[0], reverse=True)
+
+    def execute(self, sql, params):
+        time.sleep(self.conn.rtt_s)
+        self.conn.round_trips += 1
+        data = self.conn.data
+        if sql is STORE_SUMMARY_SQL:
+            self.rows = []
+            for sid in params[0]:
+                if sid not in data["stores"]:
+                    continue
+                metrics = self._metrics(sid)
+                cur = metrics[0] if metrics else (None,) * 5
+                prev = metrics[1][1:] if len(metrics) > 1 else (None,) * 4
+                traffic = data["traffic"].get((sid, cur[0]), [])
+                hours = [h for h, _ in traffic] or None
+                volumes = [v for _, v in traffic] or None
+                ins = data["insights"].get((sid, cur[0]))
+                found, insights, msg = (True, *ins) if ins else (None, None, None)
+                self.rows.append((sid, data["stores"][sid], *cur, *prev, hours, volumes, found, insights, msg))
+        elif sql.startswith("SELECT name"):
+            name = data["stores"].get(params[0])
+            self.rows = [(name,)] if name else []
+        elif sql.startswith("SELECT date FROM"):
+            self.rows = [(r[0],) for r in self._metrics(params[0])[:1]]
+        elif sql.startswith("SELECT date,"):
+            self.rows = self._metrics(params[0])[:2]
+        elif "hourly_traffic" in sql:
+            self.rows = data["traffic"].get(tuple(params), [])
+        else:
+            ins = data["insights"].get(tuple(params))
+            self.rows = [ins] if ins else []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class FakeConnection:
+    def __init__(self, data, rtt_s):
+        self.data = data
+        self.rtt_s = rtt_s
+        self.round_trips = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class LatencyConnection:
+    """Wraps a psycopg connection so every execute pays rtt_s first."""
+
+    def __init__(self, conn, rtt_s):
+        self.conn = conn
+        self.rtt_s = rtt_s
+        self.round_trips = 0
+
+    def cursor(self):
+        outer = self
+
+        class Cursor:
+            def __init__(self):
+                self.cur = outer.conn.cursor()
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.cur.close()
+                return False
+
+            def execute(self, sql, params):
+                time.sleep(outer.rtt_s)
+                outer.round_trips += 1
+                self.cur.execute(sql, params)
+
+            def fetchone(self):
+                return self.cur.fetchone()
+
+            def fetchall(self):
+                return self.cur.fetchall()
+
+        return Cursor()
+
+
+def load_postgres(conn, data):
+    """Fill session-local temp tables shadowing the real ones."""
+    conn.execute("CREATE TEMP TABLE stores (id bigint, name text)")
+    conn.execute(
+        "CREATE TEMP TABLE daily_metrics (store_id bigint, date date, volume int, "
+        "revenue numeric(10, 2), avg_basket_size numeric(5, 2), avg_duration_seconds int)"
+    )
+    conn.execute("CREATE TEMP TABLE hourly_traffic (store_id bigint, date date, hour_of_day int, volume int)")
+    conn.execute("CREATE TEMP TABLE daily_insights (store_id bigint, date date, insights text[], coach_message text)")
+    with conn.cursor() as cur:
+        cur.executemany("INSERT INTO stores VALUES (%s, %s)", list(data["stores"].items()))
+        cur.executemany(
+            "INSERT INTO daily_metrics VALUES (%s, %s, %s, %s, %s, %s)",
+            [(s, *v) for (s, _), v in data["metrics"].items()],
+        )
+        cur.executemany(
+            "INSERT INTO hourly_traffic VALUES (%s, %s, %s, %s)",
+            [(s, d, h, v) for (s, d), hv in data["traffic"].items() for h, v in hv],
+        )
+        cur.executemany(
+            "INSERT INTO daily_insights VALUES (%s, %s, %s, %s)",
+            [(s, d, *v) for (s, d), v in data["insights"].items()],
+        )
+    for table in ("daily_metrics", "hourly_traffic", "daily_insights"):
+        conn.execute(f"CREATE INDEX ON {table} (store_id, date)")
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--stores", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+
+    data = make_data(args.stores)
+    rtt_s = args.rtt_ms / 1e3
+    store_ids = list(data["stores"])
+
+    if args.db_url:
+        import psycopg
+        pg = psycopg.connect(args.db_url, autocommit=True)
+        load_postgres(pg, data)
+        conn = LatencyConnection(pg, rtt_s)
+    else:
+        conn = FakeConnection(data, rtt_s)
+
+    # Same summaries either way
+    bulk = bulk_fetch(conn, store_ids + [10**9])
+    for sid in store_ids:
+        assert legacy_fetch_store_summary(conn, sid) == bulk[sid], sid
+    assert legacy_fetch_store_summary(conn, 10**9) is None and 10**9 not in bulk
+
+    sid = store_ids[-1]
+    cases = [
+        ("1 store, legacy (5 queries)", lambda: legacy_fetch_store_summary(conn, sid), 1),
+        ("1 store, single query", lambda: bulk_fetch(conn, [sid]), 1),
+        (f"{len(store_ids)} stores, legacy loop", lambda: [legacy_fetch_store_summary(conn, s) for s in store_ids], max(args.repeats // 10, 3)),
+        (f"{len(store_ids)} stores, bulk query", lambda: bulk_fetch(conn, store_ids), 1),
+    ]
+    print(f"rtt={args.rtt_ms:.1f}ms backend={'postgres' if args.db_url else 'in-memory fake'}")
+    for label, fn, div in cases:
+        before = conn.round_trips
+        p50, p99 = timed(fn, max(args.repeats // div, 3))
+        trips = (conn.round_trips - before) / max(args.repeats // div, 3)
+        print(f"{label:<32} p50={p50:8.1f}ms  p99={p99:8.1f}ms  round_trips={trips:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark synthetic STT event generation (events/sec).
+
+Compares the vectorized seed_saricoach_data.generate_stt_events against
+the previous per-row iterrows() generator. The two draw from different
+random streams, so instead of equality the benchmark checks they agree
+on schema, per-row event rate, intent mix and sentiment ranges.
+
+    python benchmarks/bench_stt_events.py --stores 500 --days 365 --brands 20
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from seed_saricoach_data import STT_INTENTS, STT_SENTIMENT_RANGE, STT_TEMPLATES, generate_stt_events
+
+
+def iterrows_stt_events(shelf_vision_df: pd.DataFrame, max_events_per_day: int = 5) -> pd.DataFrame:
+    """The pre-vectorized generator, kept here as the reference."""
+    sv = shelf_vision_df.copy()
+    sv["date"] = sv["event_timestamp"].dt.date
+    daily = sv.groupby(["store_id", "date", "brand_id"])["facings"].mean().reset_index()
+
+    stt_rows = []
+    for _, row in daily.iterrows():
+        lam = max(0.5, row["facings"] / 6.0)
+        n_events = min(np.random.poisson(lam), max_events_per_day)
+        for _ in range(n_events):
+            intent = random.choice(STT_INTENTS)
+            raw_text = STT_TEMPLATES[intent].format(brand=f"Brand {row['brand_id']}")
+            if intent == "complaint":
+                sentiment = np.random.uniform(-0.7, -0.1)
+            elif intent == "promo_interest":
+                sentiment = np.random.uniform(0.1, 0.6)
+            else:
+                sentiment = np.random.uniform(-0.2, 0.4)
+            ts = datetime.combine(row["date"], datetime.min.time()) + timedelta(
+                hours=np.random.randint(8, 20),
+                minutes=np.random.randint(0, 60),
+            )
+            stt_rows.append({
+                "id": str(uuid.uuid4()),
+                "store_id": row["store_id"],
+                "event_timestamp": ts,
+                "brand_id": row["brand_id"],
+                "raw_text": raw_text,
+                "intent_label": intent,
+                "sentiment_score": sentiment,
+            })
+    return pd.DataFrame(stt_rows)
+
+
+def make_shelf_vision(stores: int, days: int, brands: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = stores * days * brands
+    dates = pd.date_range("2024-01-01", periods=days, freq="D") + pd.Timedelta(hours=8)
+    return pd.DataFrame({
+        "store_id": np.repeat(np.arange(1, stores + 1), days * brands),
+        "event_timestamp": np.tile(np.repeat(dates.to_numpy(), brands), stores),
+        "brand_id": np.tile(np.arange(1, brands + 1), stores * days),
+        "facings": rng.integers(1, 12, size=n),
+    })
+
+
+def check_agree(new: pd.DataFrame, old: pd.DataFrame, new_rows: int, old_rows: int) -> None:
+    assert list(new.columns) == list(old.columns), "columns differ"
+    rate_new, rate_old = len(new) / new_rows, len(old) / old_rows
+    assert abs(rate_new - rate_old) < 0.1 * rate_old, f"events/row {rate_new:.3f} vs {rate_old:.3f}"
+
+    mix_new = new["intent_label"].value_counts(normalize=True)
+    mix_old = old["intent_label"].value_counts(normalize=True)
+    assert (mix_new.reindex(STT_INTENTS) - mix_old.reindex(STT_INTENTS)).abs().max() < 0.05, "intent mix differs"
+
+    for code, intent in enumerate(STT_INTENTS):
+        low, high = STT_SENTIMENT_RANGE[code]
+        s = new.loc[new["intent_label"] == intent, "sentiment_score"]
+        assert s.between(low, high).all(), f"{intent} sentiment out of range"
+    hours = new["event_timestamp"].dt.hour
+    assert hours.between(8, 19).all(), "timestamps outside store hours"
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stores", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--brands", type=int, default=20)
+    parser.add_argument("--legacy-stores", type=int, default=5,
+                        help="stores for the iterrows reference (it is slow)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sv = make_shelf_vision(args.stores, args.days, args.brands)
+    sv_small = sv[sv["store_id"] <= args.legacy_stores]
+
+    np.random.seed(0)
+    random.seed(0)
+    t0 = time.perf_counter()
+    old = iterrows_stt_events(sv_small)
+    t_old = time.perf_counter() - t0
+
+    new = generate_stt_events(sv, rng=np.random.default_rng(0))
+    assert new.equals(generate_stt_events(sv, rng=np.random.default_rng(0))), "not reproducible"
+    check_agree(new, old, len(sv), len(sv_small))
+
+    t_new = best_of(lambda: generate_stt_events(sv, rng=np.random.default_rng(0)), args.repeat)
+    print(f"store-brand-days={len(sv):,} (iterrows on {len(sv_small):,})")
+    print(f"iterrows   : {len(old):>10,} events in {t_old:8.2f}s  ({len(old) / t_old:>12,.0f} events/s)")
+    print(f"vectorized : {len(new):>10,} events in {t_new:8.2f}s  ({len(new) / t_new:>12,.0f} events/s)")
+    print(f"speedup    : {(len(new) / t_new) / (len(old) / t_old):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Parametric synthetic data generator for load testing SariCoach.
+
+Produces all nine canonical tables (see seed_saricoach_data.py) for
+N stores x D days x B brands, without any raw Kaggle input:
+
+    python generate_synthetic_data.py --stores 2000 --days 365 --brands 300 \\
+        --tx-per-day 150 --out data/synthetic --format parquet
+
+Distributions:
+  - stores spread over PH cities, each with a lognormal size factor that
+    scales its transaction volume;
+  - brands with Zipf-like popularity across sari-sari categories, 1-4
+    products each, priced from per-category bands;
+  - daily transactions ~ Poisson(tx_per_day x size x weekend/payday lift),
+    timed around morning and evening peaks, 1 + Poisson(1.4) lines each;
+  - shelf vision, STT, weather and foot traffic from the seed generators.
+
+Fact tables are generated per shard of --stores-per-chunk stores, on a
+process pool when --workers > 1, and appended chunk by chunk to one file
+per table, so memory stays bounded by a few shards. With --layout parts
+each worker writes its shard as compressed part files instead, and the
+run ends with a manifest.json listing every part and its row count. Every shard draws
+from its own SeedSequence child, so output depends only on --seed and
+the chunking, not on the number of workers.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from saricoach.backends.csv_backend import CSV_FILES
+from saricoach.backends.parts import PartWriter, clear_parts, write_part
+from seed_saricoach_data import (
+    generate_shelf_vision,
+    generate_stt_events,
+    generate_weather_and_traffic,
+    render_ids,
+    uuid4_strings,
+)
+
+# (city, region, relative weight)
+CITIES = [
+    ("Quezon City", "NCR", 6),
+    ("Manila", "NCR", 5),
+    ("Caloocan", "NCR", 4),
+    ("Pasig", "NCR", 2),
+    ("Taguig", "NCR", 2),
+    ("Cebu City", "Central Visayas", 3),
+    ("Davao City", "Davao Region", 4),
+    ("Cagayan de Oro", "Northern Mindanao", 2),
+    ("Iloilo City", "Western Visayas", 2),
+    ("Baguio", "CAR", 1),
+]
+
+# category -> (unit price band in PHP, relative share of brands)
+CATEGORIES = {
+    "Beverages": ((12, 60), 5),
+    "Snacks": ((8, 35), 5),
+    "Instant Noodles": ((10, 20), 2),
+    "Canned Goods": ((25, 70), 2),
+    "Condiments": ((10, 45), 2),
+    "Personal Care": ((7, 120), 3),
+    "Household": ((10, 90), 2),
+    "Tobacco": ((70, 170), 1),
+}
+
+PACKS = [("sachet", "1 pc"), ("bottle", "350 ml"), ("pack", "1 unit"), ("can", "155 g")]
+
+# Share of a store's daily transactions per hour, 06:00-21:00
+_HOUR_WEIGHTS = np.array([2, 6, 8, 6, 4, 4, 6, 5, 4, 4, 5, 8, 9, 7, 4, 2], dtype=float)
+HOURS = np.arange(6, 22)
+HOUR_P = _HOUR_WEIGHTS / _HOUR_WEIGHTS.sum()
+
+# Output file per table: the canonical CSV names, so build_context_from_csv
+# can read a --format csv output directory directly.
+TABLE_FILES = {
+    "brands": "brands",
+    "products": "products",
+    "stores": "stores",
+    "transactions": "transactions",
+    "transaction_lines": "transaction_lines",
+    "shelf_vision_events": "shelf_vision",
+    "stt_events": "stt_events",
+    "weather_daily": "weather",
+    "foot_traffic_daily": "foot_traffic",
+}
+
+
+# ---------------------------------------------------------------------------
+# Dimensions
+# ---------------------------------------------------------------------------
+
+def build_stores(n_stores: int, rng: np.random.Generator) -> pd.DataFrame:
+    weights = np.array([w for _, _, w in CITIES], dtype=float)
+    city_idx = rng.choice(len(CITIES), size=n_stores, p=weights / weights.sum())
+    store_id = np.arange(1, n_stores + 1)
+    city = np.array([c for c, _, _ in CITIES])[city_idx]
+    return pd.DataFrame({
+        "store_id": store_id,
+        "store_name": [f"Aling Nena Sari-Sari Store #{s} – {c}" for s, c in zip(store_id, city)],
+        "region": np.array([r for _, r, _ in CITIES])[city_idx],
+        "city": city,
+        "barangay": [f"Barangay {b}" for b in rng.integers(1, 200, size=n_stores)],
+        "store_type": np.where(rng.random(n_stores) < 0.9, "sari-sari", "mini-mart"),
+    })
+
+
+def build_brands_products(n_brands: int, rng: np.random.Generator):
+    names = list(CATEGORIES)
+    shares = np.array([CATEGORIES[c][1] for c in names], dtype=float)
+    category = np.array(names)[rng.choice(len(names), size=n_brands, p=shares / shares.sum())]
+    brands_df = pd.DataFrame({
+        "brand_id": np.arange(1, n_brands + 1),
+        "brand_name": [f"Brand {i:04d}" for i in range(1, n_brands + 1)],
+        "category": category,
+    })
+
+    per_brand = rng.integers(1, 5, size=n_brands)
+    brand_id = np.repeat(brands_df["brand_id"].to_numpy(), per_brand)
+    product_category = np.repeat(category, per_brand)
+    n_products = len(brand_id)
+    pack = rng.integers(0, len(PACKS), size=n_products)
+    low, high = np.array([CATEGORIES[c][0] for c in product_category], dtype=float).T
+    product_id = np.arange(1, n_products + 1)
+    products_df = pd.DataFrame({
+        "product_id": product_id,
+        "sku": product_id.astype(str),
+        "barcode": [f"4800{p:09d}" for p in product_id],
+        "brand_id": brand_id,
+        "product_name": [f"Brand {b:04d} item {p}" for b, p in zip(brand_id, product_id)],
+        "category": product_category,
+        "pack_size": np.array([s for _, s in PACKS])[pack],
+        "pack_type": np.array([t for t, _ in PACKS])[pack],
+    })
+    # Not a canonical column: carried to the workers for line prices
+    price = np.round(rng.uniform(low, high) * 4) / 4
+    return brands_df, products_df, price
+
+
+def product_weights(products_df: pd.DataFrame, rng: np.random.Generator) -> np.ndarray:
+    """
+    Zipf-like brand popularity, split evenly over each brand's products.
+    """
+    brand_ids = products_df["brand_id"].to_numpy()
+    n_brands = brand_ids.max()
+    rank = rng.permutation(n_brands) + 1
+    brand_pop = 1.0 / rank ** 0.9
+    per_brand = np.bincount(brand_ids, minlength=n_brands + 1)[brand_ids]
+    w = brand_pop[brand_ids - 1] / per_brand
+    return w / w.sum()
+
+
+# ---------------------------------------------------------------------------
+# Facts, one shard of stores at a time
+# ---------------------------------------------------------------------------
+
+def build_shard_transactions(
+    stores: pd.DataFrame,
+    size_factor: np.ndarray,
+    dates: pd.DatetimeIndex,
+    products_df: pd.DataFrame,
+    price: np.ndarray,
+    weights: np.ndarray,
+    tx_per_day: float,
+    rng: np.random.Generator,
+):
+    n_stores, n_days = len(stores), len(dates)
+    day_lift = np.where(dates.dayofweek >= 5, 1.15, 1.0) * np.where(dates.day.isin([15, 30]), 1.3, 1.0)
+    lam = tx_per_day * size_factor[:, np.newaxis] * day_lift[np.newaxis, :]
+    counts = rng.poisson(lam).ravel()
+    n_tx = int(counts.sum())
+
+    cell = np.repeat(np.arange(n_stores * n_days), counts)
+    store_id = stores["store_id"].to_numpy()[cell // n_days]
+    day = dates.to_numpy()[cell % n_days]
+    offset = (
+        rng.choice(HOURS, size=n_tx, p=HOUR_P).astype("timedelta64[h]")
+        + rng.integers(0, 3600, size=n_tx).astype("timedelta64[s]")
+    )
+    tx_id = uuid4_strings(rng, n_tx)
+
+    n_lines = 1 + rng.poisson(1.4, size=n_tx)
+    line_tx = np.repeat(np.arange(n_tx), n_lines)
+    first_line = np.cumsum(n_lines) - n_lines
+    line_no = np.arange(len(line_tx)) - first_line[line_tx] + 1
+    product_pos = rng.choice(len(products_df), size=len(line_tx), p=weights)
+    quantity = rng.geometric(0.6, size=len(line_tx))
+    price_unit = price[product_pos]
+    subtotal = price_unit * quantity
+
+    transactions_df = pd.DataFrame({
+        "transaction_id": tx_id,
+        "store_id": store_id,
+        "tx_timestamp": day + offset,
+        "total_amount": np.bincount(line_tx, weights=subtotal, minlength=n_tx),
+    }).astype({"transaction_id": "str"})
+    lines_df = pd.DataFrame({
+        "transaction_id": tx_id[line_tx],
+        "line_no": line_no,
+        "product_id": products_df["product_id"].to_numpy()[product_pos],
+        "brand_id": products_df["brand_id"].to_numpy()[product_pos],
+        "quantity": quantity,
+        "price_unit": price_unit,
+        "subtotal": subtotal,
+    }).astype({"transaction_id": "str"})
+    return transactions_df, lines_df
+
+
+def generate_shard(task: dict) -> Dict[str, pd.DataFrame]:
+    """
+    All fact tables for one shard of stores. Runs in a worker process.
+    """
+    rng = np.random.default_rng(task["seed"])
+
+    stores = task["stores"]
+    dates = task["dates"]
+    transactions_df, lines_df = build_shard_transactions(
+        stores, task["size_factor"], dates, task["products"], task["price"],
+        task["weights"], task["tx_per_day"], rng,
+    )
+    shelf_df = generate_shelf_vision(lines_df, transactions_df, stores, rng=rng)
+    stt_df = generate_stt_events(shelf_df, rng=rng)
+    weather_df, traffic_df = generate_weather_and_traffic(
+        stores, pd.DataFrame({"tx_timestamp": dates[[0, -1]]}), rng=rng,
+    )
+    return {
+        "transactions": transactions_df,
+        "transaction_lines": lines_df,
+        "shelf_vision_events": shelf_df,
+        "stt_events": stt_df,
+        "weather_daily": weather_df,
+        "foot_traffic_daily": traffic_df,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+class TableWriter:
+    """
+    Appends DataFrame chunks to one CSV or Parquet file per table.
+    """
+
+    def __init__(self, out_dir: Path, fmt: str = "csv"):
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unknown format {fmt!r}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.rows: Dict[str, int] = {}
+        self._parquet: Dict[str, object] = {}
+
+    def path(self, table: str) -> Path:
+        file_name = CSV_FILES[TABLE_FILES[table]][0]
+        if self.fmt == "parquet":
+            file_name = file_name.replace(".csv", ".parquet")
+        return self.out_dir / file_name
+
+    def write(self, table: str, df: pd.DataFrame) -> None:
+        df = render_ids(table, df)
+        first = table not in self.rows
+        self.rows[table] = self.rows.get(table, 0) + len(df)
+        if self.fmt == "csv":
+            df.to_csv(self.path(table), mode="w" if first else "a", header=first, index=False)
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self._parquet.get(table)
+        if writer is None:
+            writer = self._parquet[table] = pq.ParquetWriter(self.path(table), arrow.schema)
+        writer.write_table(arrow.cast(writer.schema))
+
+    def close(self) -> None:
+        for writer in self._parquet.values():
+            writer.close()
+        self._parquet.clear()
+
+
+def write_shard_parts(task: dict) -> Dict[str, tuple]:
+    """
+    Generate one shard and write each table as part `task["parts"]["index"]`.
+    Runs in a worker process; only the manifest entries travel back.
+    """
+    parts = task["parts"]
+    written = {}
+    tables = generate_shard(task)
+    # Lines carry no store_id; record their store range from the shard's transactions
+    line_stores = tables["transaction_lines"]["transaction_id"].map(
+        tables["transactions"].set_index("transaction_id")["store_id"]
+    )
+    for table, df in tables.items():
+        entry = write_part(
+            parts["out_dir"], table, parts["index"], render_ids(table, df), parts["fmt"],
+            store_ids=line_stores if table == "transaction_lines" else None,
+        )
+        written[table] = (entry, list(df.columns))
+    return written
+
+
+def _run_shards(tasks, worker, handle, workers: int) -> None:
+    """
+    Run worker over tasks, inline or on a process pool with at most two
+    shards per process in flight, and hand results to handle in order.
+    """
+    if workers <= 1:
+        for task in tasks:
+            handle(worker(task))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for task in tasks:
+            pending.append(pool.submit(worker, task))
+            if len(pending) >= 2 * workers:
+                handle(pending.popleft().result())
+        while pending:
+            handle(pending.popleft().result())
+
+
+def generate(
+    out_dir: Path,
+    stores: int,
+    days: int,
+    brands: int,
+    tx_per_day: float,
+    start_date: str = "2024-01-01",
+    fmt: str = "csv",
+    stores_per_chunk: int = 10,
+    workers: Optional[int] = None,
+    seed: int = 42,
+    layout: str = "files",
+) -> Dict[str, int]:
+    """
+    Write all nine tables to out_dir. Returns rows written per table.
+
+    layout="files" appends every shard to one file per table.
+    layout="parts" has each worker write its shard as compressed part
+    files (see saricoach.backends.parts) and finishes with a manifest of
+    parts and row counts, so no shard's frames leave its worker.
+    """
+    if layout not in ("files", "parts"):
+        raise ValueError(f"Unknown layout {layout!r}")
+    root = np.random.SeedSequence(seed)
+    dim_seq, size_seq, weight_seq, shard_root = root.spawn(4)
+    dim_rng = np.random.default_rng(dim_seq)
+
+    stores_df = build_stores(stores, dim_rng)
+    brands_df, products_df, price = build_brands_products(brands, dim_rng)
+    size_factor = np.random.default_rng(size_seq).lognormal(0.0, 0.5, size=stores)
+    weights = product_weights(products_df, np.random.default_rng(weight_seq))
+    dates = pd.date_range(start_date, periods=days, freq="D")
+
+    if layout == "files":
+        writer = TableWriter(out_dir, fmt)
+    else:
+        writer = PartWriter(out_dir, fmt)
+        for table in TABLE_FILES:
+            clear_parts(out_dir, table)
+    writer.write("brands", brands_df)
+    writer.write("products", products_df)
+    writer.write("stores", stores_df)
+
+    bounds = list(range(0, stores, stores_per_chunk))
+    shard_seqs = shard_root.spawn(len(bounds))
+
+    def tasks():
+        for i, (start, shard_seq) in enumerate(zip(bounds, shard_seqs)):
+            end = start + stores_per_chunk
+            yield {
+                "seed": shard_seq,
+                "stores": stores_df.iloc[start:end].reset_index(drop=True),
+                "size_factor": size_factor[start:end],
+                "dates": dates,
+                "products": products_df[["product_id", "brand_id"]],
+                "price": price,
+                "weights": weights,
+                "tx_per_day": tx_per_day,
+                "parts": {"out_dir": Path(out_dir), "fmt": fmt, "index": i},
+            }
+
+    started = time.perf_counter()
+    done = 0
+
+    def handle(result: dict) -> None:
+        nonlocal done
+        for table, value in result.items():
+            if layout == "files":
+                writer.write(table, value)
+            else:
+                writer.add(table, *value)
+        done += 1
+        tx = writer.rows["transactions"]
+        elapsed = time.perf_counter() - started
+        print(f"[*] shard {done}/{len(bounds)}: {tx:,} transactions so far ({tx / elapsed:,.0f} tx/s)")
+
+    worker = generate_shard if layout == "files" else write_shard_parts
+    try:
+        _run_shards(tasks(), worker, handle, workers or os.cpu_count() or 1)
+    finally:
+        if layout == "files":
+            writer.close()
+    if layout == "parts":
+        writer.write_manifest()
+    return writer.rows
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", type=int, default=100)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--brands", type=int, default=50)
+    parser.add_argument("--tx-per-day", type=float, default=150.0, help="mean transactions per average store-day")
+    parser.add_argument("--start-date", default="2024-01-01")
+    parser.add_argument("--out", type=Path, default=Path("data/synthetic"))
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument(
+        "--layout",
+        choices=("files", "parts"),
+        default="files",
+        help="files: one file per table; parts: compressed part files per shard plus manifest.json",
+    )
+    parser.add_argument("--stores-per-chunk", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    rows = generate(
+        args.out, args.stores, args.days, args.brands, args.tx_per_day,
+        start_date=args.start_date, fmt=args.format, stores_per_chunk=args.stores_per_chunk,
+        workers=args.workers, seed=args.seed, layout=args.layout,
+    )
+    elapsed = time.perf_counter() - started
+    for table, n in rows.items():
+        print(f"[OK] {table}: {n:,} rows")
+    print(f"[✓] wrote {sum(rows.values()):,} rows to {args.out} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Command-line entry point: `python -m saricoach <command>`.
+
+Commands:
+  snapshot build   Convert data/processed CSVs into an Arrow snapshot.
+  snapshot status  Report whether the snapshot is fresh.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_DATA_DIR = BASE_DIR / "data" / "processed"
+DEFAULT_SNAPSHOT_DIR = BASE_DIR / "data" / "snapshot"
+
+
+def _snapshot(args: argparse.Namespace) -> int:
+    from saricoach.backends.snapshot import build_snapshot, is_snapshot_stale
+
+    if args.action == "build":
+        manifest_path = build_snapshot(args.data_dir, args.snapshot_dir)
+        print(f"[OK] wrote snapshot manifest {manifest_path}")
+        return 0
+
+    stale = is_snapshot_stale(args.snapshot_dir, args.data_dir)
+    print("stale" if stale else "fresh")
+    return 1 if stale else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="saricoach")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="Columnar snapshot of the CSV data")
+    snap.add_argument("action", choices=["build", "status"])
+    snap.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    snap.add_argument("--snapshot-dir", type=Path, default=DEFAULT_SNAPSHOT_DIR)
+    snap.set_defaults(func=_snapshot)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,117 @@
-from typing import Literal, List
+from dataclasses import dataclass
+from string import Formatter
+from typing import Literal, List, Tuple
+import numpy as np
+import pandas as pd
 from saricoach.eval.types import AnalyticsResult, CoachOutput
 
+Bucket = Literal["action", "risk", "opportunity"]
+
+@dataclass(frozen=True)
+class CoachRule:
+    """
+    One coaching heuristic: when `score_column` > 0 for a brand, render
+    `template` (fields: brand, cat) into `bucket`.
+    """
+    rule_id: str
+    score_column: str
+    bucket: Bucket
+    template: str
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(f for _, f, _, _ in Formatter().parse(self.template) if f)
+
+# Order matters: within a brand, output follows rule order.
+COACH_RULES: Tuple[CoachRule, ...] = (
+    # Risk: stockout
+    CoachRule(
+        "stockout_risk", "risk_stockout_score", "risk",
+        "{brand} ({cat}) is at risk of stockout: low facings and some days out-of-stock despite demand.",
+    ),
+    CoachRule(
+        "stockout_action", "risk_stockout_score", "action",
+        "Increase {brand} facings and ensure safety stock for the next 7 days, especially on peak days.",
+    ),
+    # Risk: visibility
+    CoachRule(
+        "visibility_risk", "risk_visibility_score", "risk",
+        "{brand} ({cat}) has low share of shelf vs other brands in the same category.",
+    ),
+    CoachRule(
+        "visibility_action", "risk_visibility_score", "action",
+        "Rearrange the shelf to give {brand} more eye-level space or move it closer to the counter.",
+    ),
+    # Opportunity: high demand
+    CoachRule(
+        "high_demand_opportunity", "opp_high_demand_score", "opportunity",
+        "{brand} ({cat}) shows strong demand and positive sentiment when traffic is high.",
+    ),
+    CoachRule(
+        "high_demand_action", "opp_high_demand_score", "action",
+        "Highlight {brand} with small in-store signage or bundles, especially on weekends and paydays.",
+    ),
+)
+
+def evaluate_rules(
+    brand_summary: pd.DataFrame,
+    rules: Tuple[CoachRule, ...] = COACH_RULES,
+) -> pd.DataFrame:
+    """
+    Evaluate every rule as a vectorized mask over the brand summary.
+
+    Returns one row per fired (brand row, rule) in brand-then-rule order,
+    deduplicated on the rule ID plus the template fields it uses, with
+    columns: row, rule_id, bucket, text.
+    """
+    n = len(brand_summary)
+    fired = np.zeros((n, len(rules)), dtype=bool)
+    for pos, rule in enumerate(rules):
+        if rule.score_column in brand_summary.columns:
+            fired[:, pos] = (brand_summary[rule.score_column] > 0).to_numpy()
+
+    # Row-major nonzero yields hits already in brand-then-rule order
+    rows, rule_pos = np.nonzero(fired)
+    hits = pd.DataFrame({
+        "row": rows,
+        "pos": rule_pos,
+        "brand": brand_summary["brand_name"].to_numpy(dtype=object)[rows],
+        "cat": brand_summary["category"].to_numpy(dtype=object)[rows],
+    })
+
+    # Dedupe on rule ID plus only the fields that rule renders
+    uses_cat = np.array([("cat" in r.fields) for r in rules], dtype=bool)
+    hits["cat_key"] = hits["cat"].where(uses_cat[hits["pos"].to_numpy()])
+    hits = hits.drop_duplicates(["pos", "brand", "cat_key"])
+
+    # Render column-wise: one pass per rule over all of its hits
+    text = pd.Series("", index=hits.index, dtype=object)
+    for pos, group in hits.groupby("pos", sort=False):
+        text[group.index] = _render(rules[pos].template, group)
+
+    ids = np.array([r.rule_id for r in rules], dtype=object)
+    buckets = np.array([r.bucket for r in rules], dtype=object)
+    return pd.DataFrame({
+        "row": hits["row"].to_numpy(),
+        "rule_id": ids[hits["pos"].to_numpy()],
+        "bucket": buckets[hits["pos"].to_numpy()],
+        "text": text.to_numpy(),
+    })
+
+def _render(template: str, hits: pd.DataFrame) -> pd.Series:
+    """template.format(brand=..., cat=...) for every hit, as string concatenation."""
+    # numpy's str cast renders None/NaN the way str.format does
+    columns = {
+        field: pd.Series(hits[field].to_numpy().astype(str), index=hits.index, dtype=object)
+        for field in ("brand", "cat")
+    }
+    out = pd.Series("", index=hits.index, dtype=object)
+    for literal, field, _, _ in Formatter().parse(template):
+        out = out + literal
+        if field:
+            out = out + columns[field]
+    return out
+
 class CoachAgent:
     """
     Language-facing coaching agent.
@@ -24,41 +135,10 @@ class CoachAgent:
             # Optional: call out to Gemini for richer text
             pass
 
-        actions = []
-        risks = []
-        opps = []
-
-        # Simple heuristics
-        for _, row in bs.iterrows():
-            brand = row["brand_name"]
-            cat = row["category"]
-
-            # Risk: stockout
-            if row.get("risk_stockout_score", 0) > 0:
-                risks.append(
-                    f"{brand} ({cat}) is at risk of stockout: low facings and some days out-of-stock despite demand."
-                )
-                actions.append(
-                    f"Increase {brand} facings and ensure safety stock for the next 7 days, especially on peak days."
-                )
-
-            # Risk: visibility
-            if row.get("risk_visibility_score", 0) > 0:
-                risks.append(
-                    f"{brand} ({cat}) has low share of shelf vs other brands in the same category."
-                )
-                actions.append(
-                    f"Rearrange the shelf to give {brand} more eye-level space or move it closer to the counter."
-                )
-
-            # Opportunity: high demand
-            if row.get("opp_high_demand_score", 0) > 0:
-                opps.append(
-                    f"{brand} ({cat}) shows strong demand and positive sentiment when traffic is high."
-                )
-                actions.append(
-                    f"Highlight {brand} with small in-store signage or bundles, especially on weekends and paydays."
-                )
+        fired = evaluate_rules(bs)
+        actions = fired.loc[fired["bucket"] == "action", "text"].tolist()
+        risks = fired.loc[fired["bucket"] == "risk", "text"].tolist()
+        opps = fired.loc[fired["bucket"] == "opportunity", "text"].tolist()
 
         # Fallbacks
         if not actions:
@@ -77,19 +157,8 @@ class CoachAgent:
         }
 
         return CoachOutput(
-            actions=self._dedupe_keep_order(actions),
-            risks=self._dedupe_keep_order(risks),
-            opportunities=self._dedupe_keep_order(opps),
+            actions=actions,
+            risks=risks,
+            opportunities=opps,
             debug_notes=debug_notes,
         )
-
-    @staticmethod
-    def _dedupe_keep_order(items: List[str]) -> List[str]:
-        seen = set()
-        out: List[str] = []
-        for x in items:
-            if x in seen:
-                continue
-            seen.add(x)
-            out.append(x)
-        return out
@@ -1,7 +1,17 @@
+import threading
 import pandas as pd
 import numpy as np
-from saricoach.data_context import DataContext
-from saricoach.feature_frame import build_brand_day_frame, summarize_brand_window
+from saricoach.data_context import DataContext, store_offsets
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+from saricoach.feature_frame import (
+    BrandWindowIndex,
+    StoreFrames,
+    build_brand_day_frames_all_stores,
+    summarize_store_windows,
+    with_dates,
+)
+from saricoach.incremental import IncrementalFeatureFrame
 from saricoach.eval.types import PlannerDecision, AnalyticsResult
 
 class DataAnalystAgent:
@@ -13,12 +23,45 @@ class DataAnalystAgent:
       - Compute simple "risk" and "opportunity" signals.
     """
 
-    def __init__(self, ctx: DataContext):
+    def __init__(self, ctx: DataContext, frames: Optional[StoreFrames] = None):
         self.ctx = ctx
+        self._frames = frames
+        self._incremental: Optional[IncrementalFeatureFrame] = None
+        # Serializes ingest against the lazy frame (re)builds below
+        self._lock = threading.Lock()
 
-    def analyze(self, decision: PlannerDecision) -> AnalyticsResult:
+    @property
+    def frames(self) -> StoreFrames:
+        """
+        Feature frames for all stores, built once on first use and then
+        sliced per request. After an ingest, the stores it touched are
+        re-emitted on the next read.
+        """
+        with self._lock:
+            if self._incremental is not None:
+                self._frames = self._incremental.refresh(self._frames)
+            elif self._frames is None:
+                self._frames = build_brand_day_frames_all_stores(self.ctx)
+            return self._frames
+
+    def ingest(self, **batches: pd.DataFrame) -> None:
+        """
+        Fold newly arrived rows (transactions, transaction_lines,
+        shelf_vision, stt_events, weather, foot_traffic) into the running
+        aggregates, updating only the affected store/day/brand buckets.
+        """
+        with self._lock:
+            if self._incremental is None:
+                self._incremental = IncrementalFeatureFrame.from_context(self.ctx)
+            self._incremental.append(**batches)
+
+    def analyze(self, decision: PlannerDecision, windows: Sequence[int] = ()) -> AnalyticsResult:
+        """
+        Summarize the store over the trailing decision.focus_days, plus any
+        extra trailing windows (e.g. 7/30/90) from the same prefix sums.
+        """
         # For now we keep date range implicit (all available)
-        ff = build_brand_day_frame(self.ctx, store_id=decision.store_id)
+        ff = self.frames.for_store(decision.store_id)
 
         # Optional brand/category filtering
         if decision.brand_id is not None:
@@ -27,33 +70,89 @@ class DataAnalystAgent:
         if decision.category:
             ff = ff[ff["category"] == decision.category]
 
-        brand_summary = summarize_brand_window(ff, window_days=decision.focus_days)
-        brand_summary = self._add_simple_scores(brand_summary)
+        window_index = BrandWindowIndex.from_frame(ff)
+        brand_summary = self._add_simple_scores(window_index.summarize(decision.focus_days))
 
         return AnalyticsResult(
             store_id=decision.store_id,
             decision=decision,
             feature_frame=ff,
             brand_summary=brand_summary,
+            window_summaries={
+                w: self._add_simple_scores(window_index.summarize(w)) for w in windows
+            },
+        )
+
+    def analyze_stores(
+        self,
+        decision: PlannerDecision,
+        store_ids: Sequence[int],
+    ) -> Dict[int, AnalyticsResult]:
+        """
+        Run `analyze` for many stores that share one decision's filters and
+        window. Brand summaries and scores for all stores come from a
+        single grouped pass over the all-stores frame; results are keyed
+        by store_id in request order.
+        """
+        frames = self.frames
+        store_ids = list(dict.fromkeys(int(s) for s in store_ids))
+        ranges = [frames.offsets.get(s, (0, 0)) for s in store_ids]
+        positions = np.concatenate(
+            [np.arange(start, stop) for start, stop in ranges] or [np.zeros(0, dtype=np.int64)]
         )
+        ff = frames.frame.iloc[positions]
+
+        if decision.brand_id is not None:
+            ff = ff[ff["brand_id"] == decision.brand_id]
+
+        if decision.category:
+            ff = ff[ff["category"] == decision.category]
+
+        summaries = self._add_simple_scores(
+            summarize_store_windows(ff, decision.focus_days),
+            by=["store_id"],
+        )
+        summary_offsets = store_offsets(summaries["store_id"].to_numpy())
+        frame_offsets = store_offsets(ff["store_id"].to_numpy())
+
+        results: Dict[int, AnalyticsResult] = {}
+        for store_id in store_ids:
+            start, stop = summary_offsets.get(store_id, (0, 0))
+            brand_summary = summaries.iloc[start:stop].drop(columns="store_id").reset_index(drop=True)
+            start, stop = frame_offsets.get(store_id, (0, 0))
+            results[store_id] = AnalyticsResult(
+                store_id=store_id,
+                decision=replace(decision, store_id=store_id),
+                feature_frame=with_dates(ff.iloc[start:stop].drop(columns="store_id").reset_index(drop=True)),
+                brand_summary=brand_summary,
+            )
+        return results
 
     @staticmethod
-    def _add_simple_scores(df: pd.DataFrame) -> pd.DataFrame:
+    def _add_simple_scores(df: pd.DataFrame, by: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Add "risk" and "opportunity" flags based on simple heuristics.
+        With `by` (e.g. ["store_id"]), benchmarks and medians are computed
+        within each group rather than across the whole frame.
         """
         out = df.copy()
+        by = list(by or [])
 
         # Category-level benchmarks
         cat_stats = (
-            out.groupby("category")[["share_of_shelf_avg", "facings_avg"]]
+            out.groupby([*by, "category"], observed=True)[["share_of_shelf_avg", "facings_avg"]]
             .mean()
             .rename(columns={
                 "share_of_shelf_avg": "cat_share_avg",
                 "facings_avg": "cat_facings_avg",
             })
         )
-        out = out.merge(cat_stats, on="category", how="left")
+        out = out.merge(cat_stats, on=[*by, "category"], how="left")
+
+        def median(col: str):
+            if by:
+                return out.groupby(by, observed=True)[col].transform("median")
+            return out[col].median()
 
         # Risk: potential stockout
         out["risk_stockout_score"] = np.where(
@@ -71,9 +170,9 @@ class DataAnalystAgent:
 
         # Opportunity: strong demand + sentiment + traffic
         out["opp_high_demand_score"] = np.where(
-            (out["mentions_total"] > out["mentions_total"].median()) &
+            (out["mentions_total"] > median("mentions_total")) &
             (out["avg_sentiment"] > 0) &
-            (out["traffic_avg"] > out["traffic_avg"].median()),
+            (out["traffic_avg"] > median("traffic_avg")),
             1.0,
             0.0,
         )
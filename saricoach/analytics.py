@@ -1,3 +1,4 @@
+import pandas as pd
 from typing import Dict, Any
 from saricoach.eval.types import AnalyticsResult
 
@@ -59,5 +60,3 @@ def compute_store_kpis(analytics: AnalyticsResult, store_id: int) -> Dict[str, A
         "stockout_risk": stockout_risk,
         "hot_brand": hot_brand,
     }
-
-import pandas as pd
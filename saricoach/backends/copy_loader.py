@@ -0,0 +1,219 @@
+"""
+Bulk seeding of the saricoach Postgres schema with COPY FROM STDIN.
+
+`copy_tables` streams each canonical DataFrame into its table as CSV over
+`COPY ... FROM STDIN`, one connection per table. Tables are loaded in
+dependency stages (dimensions, then facts keyed on them, then
+transaction lines), with the tables of a stage copied in parallel.
+"""
+import io
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SEED_SCHEMA = "saricoach"
+
+# Column definitions per table, in load order.
+SEED_TABLES: Dict[str, str] = {
+    "brands": """
+        brand_id INT PRIMARY KEY,
+        brand_name TEXT,
+        category TEXT""",
+    "products": """
+        product_id INT PRIMARY KEY,
+        sku TEXT,
+        barcode TEXT,
+        brand_id INT,
+        product_name TEXT,
+        category TEXT,
+        pack_size TEXT,
+        pack_type TEXT""",
+    "stores": """
+        store_id INT PRIMARY KEY,
+        store_name TEXT,
+        region TEXT,
+        city TEXT,
+        barangay TEXT,
+        store_type TEXT""",
+    "transactions": """
+        transaction_id TEXT PRIMARY KEY,
+        store_id INT,
+        tx_timestamp TIMESTAMP,
+        total_amount FLOAT""",
+    "transaction_lines": """
+        transaction_id TEXT,
+        line_no INT,
+        product_id INT,
+        brand_id INT,
+        quantity INT,
+        price_unit FLOAT,
+        subtotal FLOAT,
+        PRIMARY KEY (transaction_id, line_no)""",
+    "shelf_vision_events": """
+        id TEXT PRIMARY KEY,
+        store_id INT,
+        event_timestamp TIMESTAMP,
+        brand_id INT,
+        facings INT,
+        share_of_shelf FLOAT,
+        oos_flag BOOLEAN,
+        confidence FLOAT""",
+    "stt_events": """
+        id TEXT PRIMARY KEY,
+        store_id INT,
+        event_timestamp TIMESTAMP,
+        brand_id INT,
+        raw_text TEXT,
+        intent_label TEXT,
+        sentiment_score FLOAT""",
+    "weather_daily": """
+        id TEXT PRIMARY KEY,
+        store_id INT,
+        date DATE,
+        temp_c FLOAT,
+        rainfall_mm FLOAT,
+        condition TEXT""",
+    "foot_traffic_daily": """
+        id TEXT PRIMARY KEY,
+        store_id INT,
+        date DATE,
+        traffic_index FLOAT""",
+}
+
+# Tables within a stage only reference tables of earlier stages.
+SEED_STAGES: List[Tuple[str, ...]] = [
+    ("brands", "stores"),
+    ("products", "transactions", "shelf_vision_events", "stt_events", "weather_daily", "foot_traffic_daily"),
+    ("transaction_lines",),
+]
+
+# COPY's NULL marker; unquoted empty fields then stay empty strings.
+_NULL = r"\N"
+
+
+@dataclass
+class CopyStats:
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def seed_ddl(schema: str = SEED_SCHEMA) -> str:
+    """
+    CREATE SCHEMA plus CREATE TABLE IF NOT EXISTS for every seed table.
+    """
+    parts = [f"CREATE SCHEMA IF NOT EXISTS {schema};\n"]
+    for table, columns in SEED_TABLES.items():
+        parts.append(f"CREATE TABLE IF NOT EXISTS {schema}.{table} ({columns}\n);\n")
+    return "\n".join(parts)
+
+
+def _require_psycopg():
+    try:
+        import psycopg
+    except ImportError as e:
+        raise ImportError("psycopg 3 is required for COPY seeding: pip install 'psycopg[binary]'") from e
+    return psycopg
+
+
+def _libpq_url(db_url: str) -> str:
+    # Accept SQLAlchemy-style URLs such as postgresql+psycopg://...
+    return re.sub(r"^postgres(ql)?\+\w+://", "postgresql://", db_url)
+
+
+def _csv_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[str]:
+    for start in range(0, len(df), chunk_rows):
+        buf = io.StringIO()
+        df.iloc[start:start + chunk_rows].to_csv(buf, header=False, index=False, na_rep=_NULL)
+        yield buf.getvalue()
+
+
+def copy_dataframe(
+    conn,
+    table: str,
+    df: pd.DataFrame,
+    schema: str = SEED_SCHEMA,
+    chunk_rows: int = 50_000,
+) -> int:
+    """
+    COPY df into schema.table on an open psycopg connection, serializing
+    chunk_rows rows at a time. Returns the number of rows copied.
+    """
+    cols = ", ".join(df.columns)
+    sql = f"COPY {schema}.{table} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{_NULL}')"
+    with conn.cursor() as cur:
+        with cur.copy(sql) as copy:
+            for data in _csv_chunks(df, chunk_rows):
+                copy.write(data)
+    return len(df)
+
+
+def _load_table(
+    db_url: str,
+    table: str,
+    df: pd.DataFrame,
+    schema: str,
+    truncate: bool,
+    chunk_rows: int,
+) -> CopyStats:
+    psycopg = _require_psycopg()
+    started = time.perf_counter()
+    with psycopg.connect(db_url) as conn:
+        if truncate:
+            conn.execute(f"TRUNCATE {schema}.{table}")
+        rows = copy_dataframe(conn, table, df, schema=schema, chunk_rows=chunk_rows)
+    stats = CopyStats(table, rows, time.perf_counter() - started)
+    logger.info("copied %s: %d rows in %.2fs (%.0f rows/s)", table, rows, stats.seconds, stats.rows_per_s)
+    return stats
+
+
+def copy_tables(
+    tables: Dict[str, pd.DataFrame],
+    db_url: str,
+    schema: str = SEED_SCHEMA,
+    workers: int = 4,
+    truncate: bool = True,
+    create: bool = True,
+    chunk_rows: int = 50_000,
+    stages: Optional[Sequence[Sequence[str]]] = None,
+) -> List[CopyStats]:
+    """
+    Load seed tables (keyed by table name) into Postgres with COPY.
+
+    The schema and tables are created first when `create` is set. Each
+    stage's tables are copied in parallel, each in its own connection and
+    transaction (truncated first when `truncate` is set); a stage starts
+    once the previous one has committed. Returns per-table stats in load
+    order.
+    """
+    unknown = set(tables) - set(SEED_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown seed tables: {sorted(unknown)}")
+
+    psycopg = _require_psycopg()
+    db_url = _libpq_url(db_url)
+    if create:
+        with psycopg.connect(db_url) as conn:
+            conn.execute(seed_ddl(schema))
+
+    results: List[CopyStats] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="seed-copy") as pool:
+        for stage in stages or SEED_STAGES:
+            futures = [
+                pool.submit(_load_table, db_url, table, tables[table], schema, truncate, chunk_rows)
+                for table in stage
+                if table in tables
+            ]
+            results.extend(f.result() for f in futures)
+    return results
@@ -1,10 +1,25 @@
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
-from saricoach.data_context import DataContext
+from saricoach.data_context import DataContext, IndexedDataContext
+from saricoach.schema import compact_tables
 
-def build_context_from_csv(data_dir: Path) -> DataContext:
+# DataContext field -> (CSV file name, columns to parse as datetimes)
+CSV_FILES: Dict[str, Tuple[str, Optional[List[str]]]] = {
+    "brands": ("brands.csv", None),
+    "products": ("products.csv", None),
+    "stores": ("stores.csv", None),
+    "transactions": ("transactions.csv", ["tx_timestamp"]),
+    "transaction_lines": ("transaction_lines.csv", None),
+    "shelf_vision": ("shelf_vision_events.csv", ["event_timestamp"]),
+    "stt_events": ("stt_events.csv", ["event_timestamp"]),
+    "weather": ("weather_daily.csv", ["date"]),
+    "foot_traffic": ("foot_traffic_daily.csv", ["date"]),
+}
+
+def read_csv_tables(data_dir: Path) -> Dict[str, pd.DataFrame]:
     """
-    Load DataContext from a directory of CSV files.
+    Read the raw canonical tables, keyed by DataContext field name.
     """
     # Helper to read CSV safely
     def read(name: str, parse_dates=None) -> pd.DataFrame:
@@ -15,24 +30,17 @@ def build_context_from_csv(data_dir: Path) -> DataContext:
             raise FileNotFoundError(f"Missing required data file: {p}")
         return pd.read_csv(p, parse_dates=parse_dates)
 
-    brands = read("brands.csv")
-    products = read("products.csv")
-    stores = read("stores.csv")
-    transactions = read("transactions.csv", parse_dates=["tx_timestamp"])
-    transaction_lines = read("transaction_lines.csv")
-    shelf_vision = read("shelf_vision_events.csv", parse_dates=["event_timestamp"])
-    stt_events = read("stt_events.csv", parse_dates=["event_timestamp"])
-    weather = read("weather_daily.csv", parse_dates=["date"])
-    foot_traffic = read("foot_traffic_daily.csv", parse_dates=["date"])
+    return {
+        table: read(file_name, parse_dates=parse_dates)
+        for table, (file_name, parse_dates) in CSV_FILES.items()
+    }
 
-    return DataContext(
-        brands=brands,
-        products=products,
-        stores=stores,
-        transactions=transactions,
-        transaction_lines=transaction_lines,
-        shelf_vision=shelf_vision,
-        stt_events=stt_events,
-        weather=weather,
-        foot_traffic=foot_traffic,
-    )
+def build_context_from_csv(data_dir: Path, compact: bool = True) -> IndexedDataContext:
+    """
+    Load DataContext from a directory of CSV files, indexed by store.
+    With compact=True (default) tables are cast via saricoach.schema.
+    """
+    tables = read_csv_tables(Path(data_dir))
+    if compact:
+        tables = compact_tables(tables, log_report=True)
+    return DataContext(**tables).index()
@@ -0,0 +1,463 @@
+"""
+Partitioned ("part file") layout for the canonical tables.
+
+Each table is a directory of part files, one per store chunk, written as
+gzip CSV or zstd Parquet:
+
+    out_dir/
+      manifest.json
+      transactions/part-00000.csv.gz
+      transactions/part-00001.csv.gz
+      ...
+
+`write_part` writes one chunk and returns its manifest entry (file, row
+count, store_id and date ranges), so producers can write parts from
+worker processes and only send the entry back. `PartWriter` collects
+entries and writes the manifest listing every table's parts. Part i of
+transaction_lines holds the lines of part i of transactions (split by
+the transactions' stores, empty parts included) and records the store
+range of its lines, so it can be pruned on its own.
+
+`build_context_from_parts` reads such a directory back on a thread pool.
+Store and date predicates prune whole parts using the manifest ranges or
+Hive-style `store_id=<id>/` directories before anything is read, then
+filter rows inside the surviving parts. Plain `<table>.csv` / `.parquet`
+files and part directories without a manifest load as well.
+"""
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from saricoach.backends.csv_backend import CSV_FILES
+from saricoach.data_context import DataContext, IndexedDataContext
+from saricoach.schema import compact_tables
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# 2: lines parts are chunked by the transactions' stores and carry store
+# ranges; older manifests are ignored and their parts filtered by row
+PARTS_VERSION = 2
+
+# Default compression per format
+COMPRESSION = {"csv": "gzip", "parquet": "zstd"}
+_SUFFIX = {"csv": ".csv", "parquet": ".parquet"}
+_COMPRESSED_SUFFIX = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+
+# Column each table's date range is taken from, by table (file) name
+DATE_COLUMNS = {
+    "transactions": "tx_timestamp",
+    "shelf_vision_events": "event_timestamp",
+    "stt_events": "event_timestamp",
+    "weather_daily": "date",
+    "foot_traffic_daily": "date",
+}
+
+
+def part_file_name(index: int, fmt: str = "csv", compression: Optional[str] = None) -> str:
+    name = f"part-{index:05d}{_SUFFIX[fmt]}"
+    if fmt == "csv" and compression:
+        name += _COMPRESSED_SUFFIX[compression]
+    return name
+
+
+def _part_stats(table: str, df: pd.DataFrame, store_ids: Optional[pd.Series] = None) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {}
+    if store_ids is None and "store_id" in df.columns:
+        store_ids = df["store_id"]
+    if len(df) and store_ids is not None:
+        stats["store_id"] = [int(store_ids.min()), int(store_ids.max())]
+    col = DATE_COLUMNS.get(table)
+    if len(df) and col in df.columns:
+        dates = pd.to_datetime(df[col])
+        stats["date"] = [dates.min().date().isoformat(), dates.max().date().isoformat()]
+    return stats
+
+
+def write_part(
+    out_dir: Path,
+    table: str,
+    index: int,
+    df: pd.DataFrame,
+    fmt: str = "csv",
+    compression: Optional[str] = "default",
+    store_ids: Optional[pd.Series] = None,
+) -> Dict[str, Any]:
+    """
+    Write df as part `index` of `table` under out_dir and return its
+    manifest entry. store_ids (aligned with df) gives the store range of
+    tables that only reach the store through a join (transaction lines).
+    """
+    if fmt not in _SUFFIX:
+        raise ValueError(f"Unknown part format {fmt!r}")
+    if compression == "default":
+        compression = COMPRESSION[fmt]
+    rel = Path(table) / part_file_name(index, fmt, compression)
+    path = Path(out_dir) / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False, compression=compression)
+    else:
+        df.to_parquet(path, index=False, compression=compression)
+    return {"index": index, "file": rel.as_posix(), "rows": len(df), **_part_stats(table, df, store_ids)}
+
+
+def split_by_store(
+    df: pd.DataFrame,
+    stores_per_part: int,
+    store_ids: Optional[pd.Series] = None,
+    stores: Optional[Iterable[int]] = None,
+) -> List[pd.DataFrame]:
+    """
+    Split df into chunks of `stores_per_part` consecutive store ids.
+
+    store_ids defaults to df["store_id"]; pass an aligned Series for
+    tables that only reach the store through a join (transaction lines).
+    With `stores` (e.g. the transactions' stores), chunks are cut from
+    that list instead of the stores df happens to have, one chunk per
+    `stores_per_part` of them, empty ones included, so chunk i lines up
+    with chunk i of the table the list came from. Frames with no store
+    at all come back as a single part.
+    """
+    if store_ids is None:
+        if "store_id" not in df.columns:
+            return [df]
+        store_ids = df["store_id"]
+    if stores is None:
+        stores = store_ids.dropna().to_numpy()
+    stores = np.unique(np.asarray(list(stores) if not isinstance(stores, (np.ndarray, pd.Series)) else stores))
+    if len(stores) == 0:
+        return [df]
+    per = max(1, stores_per_part)
+    chunk = np.searchsorted(stores, store_ids.to_numpy()) // per
+    return [df[chunk == i].reset_index(drop=True) for i in range(-(-len(stores) // per))]
+
+
+def clear_parts(out_dir: Path, table: str) -> None:
+    """
+    Remove table's existing part files, so a rewrite with fewer parts
+    leaves no stale ones behind.
+    """
+    for path in (Path(out_dir) / table).glob("part-*"):
+        path.unlink()
+
+
+class PartWriter:
+    """
+    Writes part files for any number of tables and then their manifest.
+
+        with PartWriter(out_dir, fmt="parquet") as writer:
+            for chunk in chunks:
+                writer.write("transactions", chunk)
+    """
+
+    def __init__(self, out_dir: Path, fmt: str = "csv", compression: Optional[str] = "default"):
+        if fmt not in _SUFFIX:
+            raise ValueError(f"Unknown part format {fmt!r}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.compression = COMPRESSION[fmt] if compression == "default" else compression
+        self.parts: Dict[str, List[Dict[str, Any]]] = {}
+        self.columns: Dict[str, List[str]] = {}
+
+    def write(self, table: str, df: pd.DataFrame, index: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Write df as the next part of table (or as part `index`).
+        """
+        if index is None:
+            index = len(self.parts.get(table, []))
+        entry = write_part(self.out_dir, table, index, df, self.fmt, self.compression)
+        self.add(table, entry, list(df.columns))
+        return entry
+
+    def add(self, table: str, entry: Dict[str, Any], columns: Optional[List[str]] = None) -> None:
+        """
+        Record a part written elsewhere, e.g. by write_part in a worker.
+        """
+        self.parts.setdefault(table, []).append(entry)
+        if columns is not None:
+            self.columns.setdefault(table, columns)
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        return {table: sum(p["rows"] for p in parts) for table, parts in self.parts.items()}
+
+    def write_manifest(self) -> Path:
+        manifest = {
+            "version": PARTS_VERSION,
+            "format": self.fmt,
+            "compression": self.compression,
+            "tables": {
+                table: {
+                    "rows": sum(p["rows"] for p in parts),
+                    "columns": self.columns.get(table),
+                    "parts": sorted(parts, key=lambda p: p["index"]),
+                }
+                for table, parts in self.parts.items()
+            },
+        }
+        path = self.out_dir / MANIFEST_NAME
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        tmp.replace(path)
+        logger.info("parts manifest: %d tables, %d rows -> %s",
+                    len(self.parts), sum(self.rows.values()), path)
+        return path
+
+    def __enter__(self) -> "PartWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.write_manifest()
+
+
+def load_parts_manifest(out_dir: Path) -> Optional[Dict[str, Any]]:
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != PARTS_VERSION:
+        return None
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+DateLike = Union[str, date, pd.Timestamp]
+
+# Dimension tables, always read in full
+UNPARTITIONED = ("brands", "products")
+
+_HIVE_STORE = re.compile(r"^store_id=(-?\d+)$")
+
+
+def _table_name(field_name: str) -> str:
+    """DataContext field -> table (file) name, e.g. weather -> weather_daily."""
+    return Path(CSV_FILES[field_name][0]).stem
+
+
+def _discover_parts(root: Path, table: str) -> List[Dict[str, Any]]:
+    """
+    Part entries for a table without a manifest: `<table>/part-*`,
+    `<table>/store_id=<id>/*`, or a single `<table>.csv(.gz)`/`.parquet`.
+    """
+    table_dir = root / table
+    entries: List[Dict[str, Any]] = []
+    if table_dir.is_dir():
+        for path in sorted(table_dir.rglob("*")):
+            if not path.is_file() or not _is_data_file(path):
+                continue
+            entry: Dict[str, Any] = {"file": path.relative_to(root).as_posix()}
+            for part in path.relative_to(table_dir).parts[:-1]:
+                match = _HIVE_STORE.match(part)
+                if match:
+                    entry["store_id"] = [int(match.group(1))] * 2
+                    entry["hive_store_id"] = int(match.group(1))
+            entries.append(entry)
+        return entries
+    for suffix in (".parquet", ".csv", ".csv.gz"):
+        if (root / f"{table}{suffix}").exists():
+            return [{"file": f"{table}{suffix}"}]
+    return entries
+
+
+def _is_data_file(path: Path) -> bool:
+    name = path.name
+    return name.endswith(".parquet") or ".csv" in name
+
+
+def _keep_part(
+    entry: Dict[str, Any],
+    store_ids: Optional[np.ndarray],
+    start: Optional[str],
+    end: Optional[str],
+) -> bool:
+    """
+    False when the part's recorded ranges cannot match the predicates.
+    Parts without stats are always kept (and filtered by row).
+    """
+    if store_ids is not None and "store_id" in entry:
+        low, high = entry["store_id"]
+        if not ((store_ids >= low) & (store_ids <= high)).any():
+            return False
+    if "date" in entry:
+        low, high = entry["date"]
+        if (start is not None and high < start) or (end is not None and low > end):
+            return False
+    return True
+
+
+def _read_part(path: Path, store_ids: Optional[np.ndarray], parse_dates: Optional[List[str]]) -> pd.DataFrame:
+    if path.name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        filters = None
+        if store_ids is not None and "store_id" in pq.read_schema(path).names:
+            filters = [("store_id", "in", store_ids.tolist())]
+        df = pq.read_table(path, filters=filters).to_pandas()
+    else:
+        df = pd.read_csv(path, parse_dates=parse_dates)
+    for col in parse_dates or ():
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def _filter_rows(
+    field_name: str,
+    df: pd.DataFrame,
+    store_ids: Optional[np.ndarray],
+    start: Optional[str],
+    end: Optional[str],
+) -> pd.DataFrame:
+    mask = np.ones(len(df), dtype=bool)
+    if store_ids is not None and "store_id" in df.columns:
+        mask &= df["store_id"].isin(store_ids).to_numpy()
+    col = DATE_COLUMNS.get(_table_name(field_name))
+    if col in df.columns and (start is not None or end is not None):
+        days = df[col].dt.normalize()
+        if start is not None:
+            mask &= (days >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (days <= pd.Timestamp(end)).to_numpy()
+    return df if mask.all() else df[mask].reset_index(drop=True)
+
+
+def read_part_tables(
+    parts_dir: Path,
+    store_ids: Optional[Iterable[int]] = None,
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None,
+    region: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Read the canonical tables from parts_dir, keyed by DataContext field
+    name, keeping only the given stores (or region's stores) and the
+    inclusive [start_date, end_date] range.
+
+    Every surviving part file is read on a thread pool; pyarrow and the
+    CSV parser release the GIL, so files load concurrently.
+    """
+    root = Path(parts_dir)
+    manifest = load_parts_manifest(root)
+    start = pd.Timestamp(start_date).date().isoformat() if start_date is not None else None
+    end = pd.Timestamp(end_date).date().isoformat() if end_date is not None else None
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def entries_for(field_name: str) -> List[Dict[str, Any]]:
+        table = _table_name(field_name)
+        if manifest is not None and table in manifest["tables"]:
+            return manifest["tables"][table]["parts"]
+        entries = _discover_parts(root, table)
+        if not entries:
+            raise FileNotFoundError(f"Missing required table {table!r} under {root}")
+        return entries
+
+    ids = None if store_ids is None else np.unique(np.asarray(list(store_ids), dtype=np.int64))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if region is not None:
+            stores = _read_table(pool, root, "stores", entries_for("stores"), ids)
+            region_ids = stores.loc[stores["region"] == region, "store_id"].to_numpy(dtype=np.int64)
+            ids = region_ids if ids is None else np.intersect1d(ids, region_ids)
+
+        # Prune parts by their stats; lines parts also follow their
+        # transactions part, which adds the date range lines lack
+        selected = {
+            field_name: entries_for(field_name) if field_name in UNPARTITIONED
+            else [e for e in entries_for(field_name) if _keep_part(e, ids, start, end)]
+            for field_name in CSV_FILES
+        }
+        tx_entries = entries_for("transactions")
+        if len(entries_for("transaction_lines")) == len(tx_entries) and all("index" in e for e in tx_entries):
+            kept = {e["index"] for e in selected["transactions"]}
+            selected["transaction_lines"] = [e for e in selected["transaction_lines"] if e.get("index") in kept]
+
+        # One task per part file across all tables, so small tables do not
+        # wait behind the large ones
+        futures = {
+            field_name: [
+                pool.submit(_read_entry, root, e, None if field_name in UNPARTITIONED else ids, CSV_FILES[field_name][1])
+                for e in entries
+            ]
+            for field_name, entries in selected.items()
+        }
+        tables = {
+            field_name: _concat([f.result() for f in parts], root, field_name, entries_for(field_name))
+            for field_name, parts in futures.items()
+        }
+
+    for field_name, df in tables.items():
+        tables[field_name] = _filter_rows(field_name, df, ids, start, end)
+    if ids is not None or start is not None or end is not None:
+        lines = tables["transaction_lines"]
+        keep = lines["transaction_id"].isin(tables["transactions"]["transaction_id"])
+        tables["transaction_lines"] = lines if keep.all() else lines[keep.to_numpy()].reset_index(drop=True)
+    return tables
+
+
+def _read_entry(
+    root: Path,
+    entry: Dict[str, Any],
+    store_ids: Optional[np.ndarray],
+    parse_dates: Optional[List[str]],
+) -> pd.DataFrame:
+    df = _read_part(root / entry["file"], store_ids, parse_dates)
+    if "hive_store_id" in entry and "store_id" not in df.columns:
+        df.insert(0, "store_id", entry["hive_store_id"])
+    return df
+
+
+def _read_table(pool, root: Path, field_name: str, entries: List[Dict[str, Any]], store_ids) -> pd.DataFrame:
+    parse_dates = CSV_FILES[field_name][1]
+    frames = list(pool.map(lambda e: _read_entry(root, e, store_ids, parse_dates), entries))
+    return _concat(frames, root, field_name, entries)
+
+
+def _concat(frames: List[pd.DataFrame], root: Path, field_name: str, entries: List[Dict[str, Any]]) -> pd.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+    if frames:
+        return pd.concat(frames, ignore_index=True)
+    # Every part was pruned: a zero-row frame with the table's columns
+    if not entries:
+        return pd.DataFrame()
+    return _read_entry(root, entries[0], None, CSV_FILES[field_name][1]).iloc[:0]
+
+
+def build_context_from_parts(
+    parts_dir: Path,
+    store_ids: Optional[Iterable[int]] = None,
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None,
+    region: Optional[str] = None,
+    workers: Optional[int] = None,
+    compact: bool = True,
+) -> IndexedDataContext:
+    """
+    Load DataContext from a part-file directory, indexed by store.
+
+        ctx = build_context_from_parts("data/synthetic", region="NCR")
+
+    See read_part_tables for the predicates. With compact=True (default)
+    tables are cast via saricoach.schema.
+    """
+    tables = read_part_tables(
+        parts_dir, store_ids=store_ids, start_date=start_date, end_date=end_date,
+        region=region, workers=workers,
+    )
+    if compact:
+        tables = compact_tables(tables, log_report=True)
+    return DataContext(**tables).index()
@@ -0,0 +1,170 @@
+"""
+Columnar snapshot of the CSV data directory.
+
+`build_snapshot` converts the canonical CSVs into Arrow IPC files typed
+by saricoach.schema (dictionary-encoded labels, int32 ids, timestamp
+columns) plus a manifest of the source files.
+`build_context_from_snapshot` reads those files on cold start instead of
+parsing CSV, and falls back to CSV when the snapshot is missing or stale.
+The IPC files are read through a memory map, but each table is still
+converted into pandas-owned memory (indexing re-sorts it anyway), so the
+saving is the parse, not the copy.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from saricoach.data_context import DataContext, IndexedDataContext
+from saricoach.backends.csv_backend import CSV_FILES, build_context_from_csv, read_csv_tables
+from saricoach.schema import compact_tables
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_VERSION = 2
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("pyarrow is required for snapshots: pip install pyarrow") from e
+    return pyarrow
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_fingerprint(path: Path) -> Dict[str, Any]:
+    st = path.stat()
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": _file_sha256(path),
+    }
+
+
+def build_snapshot(data_dir: Path, snapshot_dir: Path) -> Path:
+    """
+    Write one Arrow IPC file per DataContext table plus a manifest that
+    fingerprints the source CSVs. Returns the manifest path.
+    """
+    pa = _require_pyarrow()
+    data_dir = Path(data_dir)
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    # Tables are stored already compacted, so categories become Arrow
+    # dictionary arrays and ids int32.
+    tables = compact_tables(read_csv_tables(data_dir), log_report=True)
+    manifest: Dict[str, Any] = {"version": SNAPSHOT_VERSION, "tables": {}}
+
+    for table, df in tables.items():
+        file_name = CSV_FILES[table][0]
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+        out_path = snapshot_dir / f"{table}.arrow"
+        with pa.OSFile(str(out_path), "wb") as sink:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+
+        manifest["tables"][table] = {
+            "file": out_path.name,
+            "rows": arrow_table.num_rows,
+            "source": file_name,
+            **_source_fingerprint(data_dir / file_name),
+        }
+        logger.info("snapshot %s: %d rows -> %s", table, arrow_table.num_rows, out_path)
+
+    manifest_path = snapshot_dir / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest_path
+
+
+def load_manifest(snapshot_dir: Path) -> Optional[Dict[str, Any]]:
+    path = Path(snapshot_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+
+def is_snapshot_stale(snapshot_dir: Path, data_dir: Path) -> bool:
+    """
+    A snapshot is stale when any source CSV changed since it was built.
+    Unchanged mtime and size are trusted; otherwise the content hash decides,
+    so a touched-but-identical file does not force a rebuild.
+    """
+    manifest = load_manifest(snapshot_dir)
+    if manifest is None:
+        return True
+
+    for table, (file_name, _) in CSV_FILES.items():
+        entry = manifest["tables"].get(table)
+        src = Path(data_dir) / file_name
+        if entry is None or not src.exists():
+            return True
+        if not (Path(snapshot_dir) / entry["file"]).exists():
+            return True
+        st = src.stat()
+        if st.st_mtime_ns == entry["mtime_ns"] and st.st_size == entry["size"]:
+            continue
+        if _file_sha256(src) != entry["sha256"]:
+            return True
+    return False
+
+
+def _read_snapshot_tables(snapshot_dir: Path, manifest: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    pa = _require_pyarrow()
+    tables: Dict[str, pd.DataFrame] = {}
+    for table in CSV_FILES:
+        path = Path(snapshot_dir) / manifest["tables"][table]["file"]
+        with pa.memory_map(str(path), "r") as source:
+            # split_blocks skips consolidating same-dtype columns into one
+            # 2-D block, saving a second full copy while converting
+            tables[table] = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+    return tables
+
+
+def build_context_from_snapshot(
+    snapshot_dir: Path,
+    data_dir: Optional[Path] = None,
+) -> IndexedDataContext:
+    """
+    Load DataContext from an Arrow snapshot, indexed by store.
+
+    When data_dir is given the snapshot is checked against the source CSVs,
+    and the CSVs are loaded instead if the snapshot is missing, stale, or
+    pyarrow is unavailable.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest = load_manifest(snapshot_dir)
+
+    fallback_reason = None
+    if manifest is None:
+        fallback_reason = "no snapshot"
+    elif data_dir is not None and is_snapshot_stale(snapshot_dir, Path(data_dir)):
+        fallback_reason = "snapshot is stale"
+    else:
+        try:
+            _require_pyarrow()
+        except ImportError:
+            fallback_reason = "pyarrow not installed"
+
+    if fallback_reason is not None:
+        if data_dir is None:
+            raise FileNotFoundError(f"Cannot load snapshot from {snapshot_dir}: {fallback_reason}")
+        logger.warning("Loading CSVs from %s (%s)", data_dir, fallback_reason)
+        return build_context_from_csv(Path(data_dir))
+
+    return DataContext(**_read_snapshot_tables(snapshot_dir, manifest)).index()
@@ -1,8 +1,57 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Optional, List, Dict, Any, Tuple, Union
+import numpy as np
 import pandas as pd
 
+# Fact tables partitioned by store, with the timestamp column used to
+# order rows inside each store partition.
+STORE_TABLES: Dict[str, str] = {
+    "transactions": "tx_timestamp",
+    "transaction_lines": "day",
+    "shelf_vision": "event_timestamp",
+    "stt_events": "event_timestamp",
+    "weather": "day",
+    "foot_traffic": "day",
+}
+
+# Source column of each fact table's `day` key
+DAY_SOURCES: Dict[str, str] = {
+    "transactions": "tx_timestamp",
+    "shelf_vision": "event_timestamp",
+    "stt_events": "event_timestamp",
+    "weather": "date",
+    "foot_traffic": "date",
+}
+
+def day_keys(values: Any) -> np.ndarray:
+    """
+    int32 day numbers (days since 1970-01-01) for datetimes, dates or
+    date strings. Joins and groupbys on these avoid Python date objects.
+    """
+    stamps = np.asarray(pd.to_datetime(values), dtype="datetime64[ns]")
+    return stamps.astype("datetime64[D]").astype(np.int32)
+
+def day_dates(days: Any) -> np.ndarray:
+    """
+    datetime.date objects (object array) for day numbers from day_keys.
+    """
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype(object)
+
+def store_offsets(store_ids: np.ndarray) -> Dict[int, Tuple[int, int]]:
+    """
+    Map each store_id to its [start, stop) row range in an array that is
+    already sorted by store_id.
+    """
+    if len(store_ids) == 0:
+        return {}
+    starts = np.flatnonzero(np.r_[True, store_ids[1:] != store_ids[:-1]])
+    stops = np.r_[starts[1:], len(store_ids)]
+    return {
+        int(store_ids[start]): (int(start), int(stop))
+        for start, stop in zip(starts, stops)
+    }
+
 @dataclass
 class DataContext:
     """
@@ -23,3 +72,77 @@ class DataContext:
     def from_folder(cls, base_path: Union[str, "os.PathLike[str]"]) -> "DataContext":
         # This will be implemented by the CSV backend, but we keep the type here.
         raise NotImplementedError("Use saricoach.backends.csv_backend.build_context_from_csv")
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        return {f.name: getattr(self, f.name) for f in fields(DataContext)}
+
+    def index(self) -> "IndexedDataContext":
+        """
+        Sort fact tables by store once and record per-store row offsets,
+        so per-store slices no longer need a boolean scan.
+        """
+        return IndexedDataContext.from_context(self)
+
+
+@dataclass
+class IndexedDataContext(DataContext):
+    """
+    DataContext whose fact tables are sorted by (store_id, timestamp), with
+    date columns already normalized and the row range of each store kept
+    in `offsets`.
+
+    Differences from the raw tables:
+      - every fact table gains an int32 `day` key (see day_keys), computed
+        once here so feature frames join and group on integers.
+      - transaction_lines gain `store_id` and `day` from their transaction;
+        lines without a matching transaction are dropped.
+      - timestamp and weather/foot_traffic `date` columns are datetime64.
+    """
+    offsets: Dict[str, Dict[int, Tuple[int, int]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_context(cls, ctx: DataContext) -> "IndexedDataContext":
+        if isinstance(ctx, IndexedDataContext):
+            return ctx
+
+        tables = ctx.tables()
+
+        for name, col in DAY_SOURCES.items():
+            df = tables[name].copy()
+            df[col] = pd.to_datetime(df[col])
+            df["day"] = day_keys(df[col])
+            tables[name] = df
+
+        tables["transaction_lines"] = tables["transaction_lines"].merge(
+            tables["transactions"][["transaction_id", "store_id", "day"]],
+            on="transaction_id",
+            how="inner",
+        )
+
+        offsets: Dict[str, Dict[int, Tuple[int, int]]] = {}
+        for name, ts_col in STORE_TABLES.items():
+            df = tables[name].sort_values(["store_id", ts_col], kind="stable").reset_index(drop=True)
+            tables[name] = df
+            offsets[name] = store_offsets(df["store_id"].to_numpy())
+
+        return cls(**tables, offsets=offsets)
+
+    def store_rows(self, name: str, store_id: int) -> pd.DataFrame:
+        """
+        Positional slice of one store's rows in a fact table.
+        """
+        start, stop = self.offsets[name].get(int(store_id), (0, 0))
+        return getattr(self, name).iloc[start:stop]
+
+    def for_store(self, store_id: int) -> "IndexedDataContext":
+        """
+        Context restricted to a single store; dims are shared, fact tables
+        are positional slices.
+        """
+        tables = self.tables()
+        offsets: Dict[str, Dict[int, Tuple[int, int]]] = {}
+        for name in STORE_TABLES:
+            rows = self.store_rows(name, store_id)
+            tables[name] = rows
+            offsets[name] = {int(store_id): (0, len(rows))} if len(rows) else {}
+        return IndexedDataContext(**tables, offsets=offsets)
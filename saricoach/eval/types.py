@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Literal, Optional, List, Dict, Any
 import pandas as pd
 
@@ -22,6 +22,8 @@ class AnalyticsResult:
     decision: PlannerDecision
     feature_frame: pd.DataFrame
     brand_summary: pd.DataFrame
+    # Extra trailing-window summaries keyed by window length in days
+    window_summaries: Dict[int, pd.DataFrame] = field(default_factory=dict)
 
 @dataclass
 class CoachOutput:
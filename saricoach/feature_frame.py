@@ -1,44 +1,107 @@
 from __future__ import annotations
-from typing import Optional, List
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Tuple
 import pandas as pd
 import numpy as np
-from .data_context import DataContext
+from .data_context import DataContext, IndexedDataContext, day_dates, day_keys, store_offsets
 
-def _normalize_dates(df: pd.DataFrame, col: str) -> pd.DataFrame:
-    out = df.copy()
-    out[col] = pd.to_datetime(out[col])
-    out["date"] = out[col].dt.date
+# Frames are keyed and joined on the int32 `day` number (see day_keys);
+# `with_dates` turns it into the public `date` column on the way out.
+FRAME_KEYS = ["store_id", "day", "brand_id"]
+
+def _with_day(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """
+    df plus its `day` key, unless it already carries one (indexed tables).
+    """
+    if "day" in df.columns:
+        return df
+    return df.assign(day=day_keys(df[col]))
+
+def with_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace a frame's `day` key with the `date` column (datetime.date
+    values) callers see. Only done for frames leaving this module.
+    """
+    if "day" not in df.columns:
+        return df
+    out = df.rename(columns={"day": "date"})
+    out["date"] = day_dates(df["day"].to_numpy())
     return out
 
-def build_brand_day_frame(
-    ctx: DataContext,
-    store_id: int,
-    start_date: Optional[pd.Timestamp] = None,
-    end_date: Optional[pd.Timestamp] = None,
-    focus_brand_ids: Optional[List[int]] = None,
-) -> pd.DataFrame:
+def _day_number(value) -> int:
+    return int(day_keys([value])[0])
+
+def _frame_days(df: pd.DataFrame) -> np.ndarray:
     """
-    Build a per-store, per-day, per-brand feature frame combining:
-    - Sales (quantity, revenue)
-    - Shelf vision (facings, share_of_shelf, oos_flag)
-    - STT demand (mentions, intent mix, avg sentiment)
-    - Weather (temp, rainfall, condition)
-    - Foot traffic (traffic_index)
+    Day numbers of a feature frame, keyed by `day` or carrying `date`.
+    """
+    if "day" in df.columns:
+        return df["day"].to_numpy(dtype=np.int64)
+    return day_keys(df["date"]).astype(np.int64)
+
+def _filter_store(df: pd.DataFrame, store_id: Optional[int]) -> pd.DataFrame:
+    if store_id is None:
+        return df
+    return df[df["store_id"] == store_id]
+
+def _combine_signals(ctx: DataContext, store_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    Aggregate every signal to one row per (store_id, date, brand_id).
+
+    With store_id=None all stores are grouped in a single pass; otherwise
+    only the given store's rows are used.
     """
+    if isinstance(ctx, IndexedDataContext):
+        return _combine_indexed_signals(ctx, store_id)
 
     # --- Transactions + lines ---
-    tx = _normalize_dates(ctx.transactions, "tx_timestamp")
-    tx = tx[tx["store_id"] == store_id]
+    tx = _with_day(_filter_store(ctx.transactions, store_id), "tx_timestamp")
 
-    tl = ctx.transaction_lines.copy()
-    tl = tl.merge(
-        tx[["transaction_id", "date"]],
+    tl = ctx.transaction_lines.merge(
+        tx[["transaction_id", "store_id", "day"]],
         on="transaction_id",
         how="inner",
     )
+    sv = _with_day(_filter_store(ctx.shelf_vision, store_id), "event_timestamp")
+    stt = _with_day(_filter_store(ctx.stt_events, store_id), "event_timestamp")
+    w = _with_day(_filter_store(ctx.weather, store_id), "date")
+    t = _with_day(_filter_store(ctx.foot_traffic, store_id), "date")
+
+    return _aggregate_signals(tl, sv, stt, w, t, ctx.brands)
 
-    sales_agg = (
-        tl.groupby(["date", "brand_id"])
+def _combine_indexed_signals(ctx: IndexedDataContext, store_id: Optional[int]) -> pd.DataFrame:
+    # Day keys are already computed and lines already carry store_id/day;
+    # a single store is a positional slice rather than a boolean scan.
+    if store_id is not None:
+        ctx = ctx.for_store(store_id)
+    return _aggregate_signals(
+        ctx.transaction_lines,
+        ctx.shelf_vision,
+        ctx.stt_events,
+        ctx.weather,
+        ctx.foot_traffic,
+        ctx.brands,
+    )
+
+def _aggregate_signals(
+    tl: pd.DataFrame,
+    sv: pd.DataFrame,
+    stt: pd.DataFrame,
+    w: pd.DataFrame,
+    t: pd.DataFrame,
+    brands: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Group store-tagged, day-keyed signal tables by (store_id, day,
+    brand_id) and join them into one frame.
+    """
+    return _assemble_frame(
+        _sales_agg(tl), _shelf_agg(sv), _stt_agg(stt), _intent_counts(stt), w, t, brands
+    )
+
+def _sales_agg(tl: pd.DataFrame) -> pd.DataFrame:
+    return (
+        tl.groupby(FRAME_KEYS, observed=True)
         .agg(
             qty_sold=("quantity", "sum"),
             revenue=("subtotal", "sum"),
@@ -46,12 +109,9 @@ def build_brand_day_frame(
         .reset_index()
     )
 
-    # --- Shelf vision ---
-    sv = _normalize_dates(ctx.shelf_vision, "event_timestamp")
-    sv = sv[sv["store_id"] == store_id]
-
-    shelf_agg = (
-        sv.groupby(["date", "brand_id"])
+def _shelf_agg(sv: pd.DataFrame) -> pd.DataFrame:
+    return (
+        sv.groupby(FRAME_KEYS, observed=True)
         .agg(
             facings=("facings", "mean"),
             share_of_shelf=("share_of_shelf", "mean"),
@@ -60,136 +120,594 @@ def build_brand_day_frame(
         .reset_index()
     )
 
-    # --- STT events ---
-    stt = _normalize_dates(ctx.stt_events, "event_timestamp")
-    stt = stt[stt["store_id"] == store_id]
-
-    stt_agg = (
-        stt.groupby(["date", "brand_id"])
+def _stt_agg(stt: pd.DataFrame) -> pd.DataFrame:
+    return (
+        stt.groupby(FRAME_KEYS, observed=True)
         .agg(
-            mention_count=("id", "count"),
+            mention_count=("brand_id", "size"),
             avg_sentiment=("sentiment_score", "mean"),
         )
         .reset_index()
     )
 
-    # Intent distribution (wide)
-    if not stt.empty:
-        intent_counts = (
-            stt.groupby(["date", "brand_id", "intent_label"])["id"]
-            .count()
-            .reset_index(name="intent_count")
-        )
-        intent_pivot = intent_counts.pivot_table(
-            index=["date", "brand_id"],
-            columns="intent_label",
-            values="intent_count",
-            fill_value=0,
-        ).reset_index()
-        intent_pivot.columns = [
-            "date",
-            "brand_id",
-            *[f"intent_{c}" for c in intent_pivot.columns[2:]],
-        ]
-    else:
-        intent_pivot = pd.DataFrame(columns=["date", "brand_id"])
+def _intent_counts(stt: pd.DataFrame) -> pd.DataFrame:
+    # Long form: one row per (store_id, day, brand_id, intent_label)
+    if stt.empty:
+        return pd.DataFrame(columns=[*FRAME_KEYS, "intent_label", "intent_count"])
+    return (
+        stt.groupby([*FRAME_KEYS, "intent_label"], observed=True)
+        .size()
+        .reset_index(name="intent_count")
+    )
 
-    # --- Weather & traffic (per store/day) ---
-    w = ctx.weather.copy()
-    w["date"] = pd.to_datetime(w["date"]).dt.date
-    w = w[w["store_id"] == store_id]
+def _intent_pivot(intent_counts: pd.DataFrame) -> pd.DataFrame:
+    # Wide form: one intent_<label> column per observed label
+    if intent_counts.empty:
+        return pd.DataFrame(columns=FRAME_KEYS)
+    intent_pivot = intent_counts.pivot_table(
+        index=FRAME_KEYS,
+        columns="intent_label",
+        values="intent_count",
+        fill_value=0,
+        observed=True,
+    ).reset_index()
+    intent_pivot.columns = [
+        *FRAME_KEYS,
+        *[f"intent_{c}" for c in intent_pivot.columns[len(FRAME_KEYS):]],
+    ]
+    return intent_pivot
 
-    t = ctx.foot_traffic.copy()
-    t["date"] = pd.to_datetime(t["date"]).dt.date
-    t = t[t["store_id"] == store_id]
+def _assemble_frame(
+    sales_agg: pd.DataFrame,
+    shelf_agg: pd.DataFrame,
+    stt_agg: pd.DataFrame,
+    intent_counts: pd.DataFrame,
+    w: pd.DataFrame,
+    t: pd.DataFrame,
+    brands: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Join per-(store_id, day, brand_id) signal aggregates with weather,
+    traffic and brand meta into the feature frame schema (still keyed
+    by day; see with_dates).
+    """
+    keys = FRAME_KEYS
+    intent_pivot = _intent_pivot(intent_counts)
 
+    # --- Weather & traffic (per store/day) ---
     wt = w.merge(
-        t[["store_id", "date", "traffic_index"]],
-        on=["store_id", "date"],
+        t[["store_id", "day", "traffic_index"]],
+        on=["store_id", "day"],
         how="left",
     )
 
     # --- Combine all signals ---
-    df = sales_agg.merge(shelf_agg, on=["date", "brand_id"], how="outer")
-    df = df.merge(stt_agg, on=["date", "brand_id"], how="outer")
+    df = sales_agg.merge(shelf_agg, on=keys, how="outer")
+    df = df.merge(stt_agg, on=keys, how="outer")
     if not intent_pivot.empty:
-        df = df.merge(intent_pivot, on=["date", "brand_id"], how="outer")
-    
-    # Merge weather/traffic on date
-    # Note: sales_agg etc have date, brand_id. wt has date.
-    # We need to be careful with the merge.
-    # The original code merged on date, but df has multiple rows per date (one per brand).
-    # This is a left join from df to wt.
-    
+        df = df.merge(intent_pivot, on=keys, how="outer")
+
+    # Weather/traffic is per store/day, so it fans out to every brand row
+    # of that day (left join from df to wt).
     df = df.merge(
-        wt[["date", "temp_c", "rainfall_mm", "condition", "traffic_index"]],
-        on="date",
+        wt[["store_id", "day", "temp_c", "rainfall_mm", "condition", "traffic_index"]],
+        on=["store_id", "day"],
         how="left",
     )
 
     # Attach brand meta (name + category)
-    brands = ctx.brands.copy()
     df = df.merge(brands[["brand_id", "brand_name", "category"]], on="brand_id", how="left")
 
-    # Filter date range if provided
+    # Fill NaNs in numeric cols with 0 for downstream ML/statistics
+    num_cols = df.select_dtypes(include=[np.number]).columns
+    df[num_cols] = df[num_cols].fillna(0)
+
+    return _restore_int_dtypes(df, sales_agg, shelf_agg, stt_agg, wt)
+
+def _restore_int_dtypes(df: pd.DataFrame, *sources: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast columns that were integer in `sources` back to that dtype. The
+    outer joins turn integer columns with gaps into float; after the zero
+    fill they are whole again, so every store's frame (and the all-stores
+    frame) keeps counts as integers regardless of which cells were empty.
+    """
+    dtypes = {
+        col: dtype
+        for src in sources
+        for col, dtype in src.dtypes.items()
+        if col not in FRAME_KEYS and col in df.columns
+        and pd.api.types.is_integer_dtype(dtype) and df[col].dtype != dtype
+    }
+    return df.astype(dtypes) if dtypes else df
+
+def _filter_frame(
+    df: pd.DataFrame,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    focus_brand_ids: Optional[List[int]] = None,
+) -> pd.DataFrame:
+    # Filter date range if provided, on the integer day key
     if start_date is not None:
-        start_d = pd.to_datetime(start_date).date()
-        df = df[df["date"] >= start_d]
+        df = df[df["day"] >= _day_number(start_date)]
     if end_date is not None:
-        end_d = pd.to_datetime(end_date).date()
-        df = df[df["date"] <= end_d]
+        df = df[df["day"] <= _day_number(end_date)]
 
     # Filter brands if provided
     if focus_brand_ids:
         df = df[df["brand_id"].isin(focus_brand_ids)]
 
+    return df
+
+# Cube signals: (output column, source table, source column, "sum" | "mean" | "size")
+CUBE_SIGNALS: List[Tuple[str, str, Optional[str], str]] = [
+    ("qty_sold", "sales", "quantity", "sum"),
+    ("revenue", "sales", "subtotal", "sum"),
+    ("facings", "shelf", "facings", "mean"),
+    ("share_of_shelf", "shelf", "share_of_shelf", "mean"),
+    ("oos_rate", "shelf", "oos_flag", "mean"),
+    ("mention_count", "stt", None, "size"),
+    ("avg_sentiment", "stt", "sentiment_score", "mean"),
+]
+
+def _store_signal_tables(ctx: DataContext, store_id: int) -> Dict[str, pd.DataFrame]:
+    """
+    One store's day-keyed signal tables, lines tagged with their day.
+    """
+    if isinstance(ctx, IndexedDataContext):
+        ctx = ctx.for_store(store_id)
+        return {
+            "sales": ctx.transaction_lines, "shelf": ctx.shelf_vision, "stt": ctx.stt_events,
+            "weather": ctx.weather, "traffic": ctx.foot_traffic,
+        }
+    tx = _with_day(_filter_store(ctx.transactions, store_id), "tx_timestamp")
+    # Positional lookup of each line's transaction instead of a merge
+    pos = pd.Index(tx["transaction_id"]).get_indexer(ctx.transaction_lines["transaction_id"])
+    tl = ctx.transaction_lines[pos >= 0].assign(day=tx["day"].to_numpy()[pos[pos >= 0]])
+    return {
+        "sales": tl,
+        "shelf": _with_day(_filter_store(ctx.shelf_vision, store_id), "event_timestamp"),
+        "stt": _with_day(_filter_store(ctx.stt_events, store_id), "event_timestamp"),
+        "weather": _with_day(_filter_store(ctx.weather, store_id), "date"),
+        "traffic": _with_day(_filter_store(ctx.foot_traffic, store_id), "date"),
+    }
+
+def _agg_dtype(dtype, how: str):
+    """
+    Dtype pandas groupby gives a "sum", "mean" or "size" of a column.
+    """
+    if how == "size":
+        return np.dtype(np.int64)
+    if pd.api.types.is_bool_dtype(dtype):
+        return np.dtype(np.int64) if how == "sum" else np.dtype(np.float64)
+    if how == "mean" and pd.api.types.is_integer_dtype(dtype):
+        return pd.Float64Dtype() if isinstance(dtype, pd.api.extensions.ExtensionDtype) else np.dtype(np.float64)
+    return dtype
+
+def _frame_dtypes(tables: Dict[str, pd.DataFrame]) -> Dict[str, object]:
+    """
+    Dtypes the pandas engine gives each aggregate column, before the
+    outer joins widen columns with gaps.
+    """
+    dtypes = {
+        name: _agg_dtype(tables[table][col].dtype if col else None, how)
+        for name, table, col, how in CUBE_SIGNALS
+    }
+    # Keys take the common type of the tables that have rows
+    brand_dtypes = [tables[name]["brand_id"].dtype for name in ("sales", "shelf", "stt") if len(tables[name])]
+    if brand_dtypes and all(pd.api.types.is_integer_dtype(t) for t in brand_dtypes):
+        dtypes["brand_id"] = np.result_type(*brand_dtypes)
+    return dtypes
+
+def _lookup(df: pd.DataFrame, col: str, rows: np.ndarray) -> pd.Series:
+    """
+    df[col] at positions rows, NaN where rows is -1, keeping the dtype
+    (categories included) when nothing is missing.
+    """
+    if len(df) == 0 and len(rows):
+        return pd.Series(np.full(len(rows), np.nan))
+    values = df[col].iloc[np.maximum(rows, 0)].reset_index(drop=True)
+    missing = rows < 0
+    if missing.any():
+        if pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+            values = values.astype(np.float64)
+        values = values.where(~missing)
+    return values
+
+def _day_positions(df: pd.DataFrame, day0: int, num_days: int) -> np.ndarray:
+    """
+    Row of df for each day in [day0, day0 + num_days), -1 when absent.
+    """
+    pos = np.full(num_days, -1, dtype=np.int64)
+    if len(df) and num_days:
+        day = df["day"].to_numpy(dtype=np.int64) - day0
+        ok = (day >= 0) & (day < num_days)
+        pos[day[ok]] = np.flatnonzero(ok)
+    return pos
+
+def _cube_frame(
+    ctx: DataContext,
+    store_id: int,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    focus_brand_ids: Optional[List[int]] = None,
+) -> pd.DataFrame:
+    """
+    build_brand_day_frame's frame (keyed by day) without joins: every
+    signal is scatter-added with np.bincount into a dense
+    [signal, day, brand] cube over the store's day range and brands, and
+    the frame is read back from the occupied cells. Weather, traffic and
+    brand meta are positional lookups by day and brand.
+
+    Assumes one weather/traffic row per store-day and one row per brand,
+    as the canonical tables have.
+    """
+    tables = _store_signal_tables(ctx, store_id)
+    signals = {name: tables[name] for name in ("sales", "shelf", "stt")}
+
+    # Keys per signal row; rows with a missing key are dropped, as groupby does
+    keys = {}
+    for name, df in signals.items():
+        day = df["day"].to_numpy(dtype=np.float64, na_value=np.nan)
+        brand = df["brand_id"].to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = ~(np.isnan(day) | np.isnan(brand))
+        keys[name] = (ok, day[ok].astype(np.int64), brand[ok].astype(np.int64))
+
+    all_days = np.concatenate([k[1] for k in keys.values()])
+    brands = np.unique(np.concatenate([k[2] for k in keys.values()]))
+    day0 = int(all_days.min()) if len(all_days) else 0
+    num_days = int(all_days.max()) - day0 + 1 if len(all_days) else 0
+    num_cells = num_days * len(brands)
+
+    # Row counts per cell per table, then one cube row per signal
+    cells = {name: (d - day0) * len(brands) + np.searchsorted(brands, b) for name, (_, d, b) in keys.items()}
+    rows = {name: np.bincount(c, minlength=num_cells) for name, c in cells.items()}
+
+    stt = signals["stt"][keys["stt"][0]]
+    labels = stt["intent_label"]
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        label_names = list(labels.cat.categories)
+        codes = labels.cat.codes.to_numpy()
+    else:
+        label_names = sorted(labels.dropna().unique())
+        codes = pd.Categorical(labels, categories=label_names).codes
+    observed = [k for k in range(len(label_names)) if (codes == k).any()]
+
+    cube = np.zeros((len(CUBE_SIGNALS) * 2 + len(observed), num_cells))
+    for k, (_, table, col, how) in enumerate(CUBE_SIGNALS):
+        if how == "size":
+            cube[2 * k] = rows[table]
+            continue
+        v = signals[table][col].to_numpy(dtype=np.float64, na_value=np.nan)[keys[table][0]]
+        ok = ~np.isnan(v)
+        cube[2 * k] = np.bincount(cells[table][ok], weights=v[ok], minlength=num_cells)
+        cube[2 * k + 1] = np.bincount(cells[table][ok], minlength=num_cells)
+    for j, code in enumerate(observed):
+        cube[2 * len(CUBE_SIGNALS) + j] = np.bincount(cells["stt"][codes == code], minlength=num_cells)
+    cube = cube.reshape(len(cube), num_days, len(brands))
+
+    # Occupied cells, in (day, brand) order like the sorted pandas frame
+    present = (rows["sales"] + rows["shelf"] + rows["stt"]).reshape(num_days, len(brands)) > 0
+    has = {name: r.reshape(num_days, len(brands))[present] > 0 for name, r in rows.items()}
+    intent_any = cube[2 * len(CUBE_SIGNALS):, present].sum(axis=0) > 0 if observed else np.zeros(0, bool)
+    day_idx, brand_idx = np.nonzero(present)
+
+    keep = np.ones(len(day_idx), dtype=bool)
+    if start_date is not None:
+        keep &= day_idx + day0 >= _day_number(start_date)
+    if end_date is not None:
+        keep &= day_idx + day0 <= _day_number(end_date)
+    if focus_brand_ids:
+        keep &= np.isin(brands[brand_idx], focus_brand_ids)
+    d, b = day_idx[keep], brand_idx[keep]
+
+    dtypes = _frame_dtypes(tables)
+
+    def column(name: str, values: np.ndarray, has: np.ndarray) -> np.ndarray:
+        # Cells the outer join would leave empty: 0 in integer columns, as
+        # after the pandas path's fill, otherwise NaN (filled below)
+        dtype = dtypes.get(name, np.dtype(np.float64))
+        if not has.all():
+            values = np.where(has[keep], values, 0 if pd.api.types.is_integer_dtype(dtype) else np.nan)
+        return pd.array(values, dtype=dtype) if isinstance(dtype, pd.api.extensions.ExtensionDtype) else values.astype(dtype)
+
+    out = pd.DataFrame({
+        "day": (d + day0).astype(np.int32),
+        "brand_id": brands[b].astype(dtypes.get("brand_id", np.int64)),
+    })
+    for k, (name, table, _, how) in enumerate(CUBE_SIGNALS):
+        total = cube[2 * k, d, b]
+        if how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                total = total / cube[2 * k + 1, d, b]
+        out[name] = column(name, total, has[table])
+    for j, code in enumerate(observed):
+        name = f"intent_{label_names[code]}"
+        out[name] = column(name, cube[2 * len(CUBE_SIGNALS) + j, d, b], intent_any)
+
+    # Weather (and traffic through it) per day, brand meta per brand
+    w, t = tables["weather"], tables["traffic"]
+    w_rows = _day_positions(w, day0, num_days)[d]
+    t_rows = _day_positions(t, day0, num_days)[d]
+    t_rows = np.where(w_rows >= 0, t_rows, -1)
+    for col in ("temp_c", "rainfall_mm", "condition"):
+        out[col] = _lookup(w, col, w_rows).values
+    out["traffic_index"] = _lookup(t, "traffic_index", t_rows).values
+    meta = ctx.brands
+    meta_rows = pd.Index(meta["brand_id"]).get_indexer(brands[b])
+    for col in ("brand_name", "category"):
+        out[col] = _lookup(meta, col, meta_rows).values
+
+    num_cols = out.select_dtypes(include=[np.number]).columns
+    out[num_cols] = out[num_cols].fillna(0)
+    return _restore_int_dtypes(out, w[["temp_c", "rainfall_mm"]], t[["traffic_index"]])
+
+def build_brand_day_frame(
+    ctx: DataContext,
+    store_id: int,
+    start_date: Optional[pd.Timestamp] = None,
+    end_date: Optional[pd.Timestamp] = None,
+    focus_brand_ids: Optional[List[int]] = None,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    """
+    Build a per-store, per-day, per-brand feature frame combining:
+    - Sales (quantity, revenue)
+    - Shelf vision (facings, share_of_shelf, oos_flag)
+    - STT demand (mentions, intent mix, avg sentiment)
+    - Weather (temp, rainfall, condition)
+    - Foot traffic (traffic_index)
+
+    engine="pandas" groups each signal and outer-joins the aggregates;
+    engine="cube" scatter-adds into a dense [signal, day, brand] array
+    instead (cost linear in event rows, no hash joins) and returns the
+    same frame, up to float summation order.
+
+    To build frames for many stores, use build_brand_day_frames_all_stores
+    instead of calling this once per store.
+    """
+    if engine == "cube":
+        return with_dates(_cube_frame(ctx, store_id, start_date, end_date, focus_brand_ids))
+    if engine != "pandas":
+        raise ValueError(f"Unknown engine {engine!r}")
+    df = _combine_signals(ctx, store_id=store_id).drop(columns="store_id")
+    df = _filter_frame(df, start_date, end_date, focus_brand_ids)
+
     # Sort for readability
-    df = df.sort_values(["date", "brand_id"]).reset_index(drop=True)
+    return with_dates(df.sort_values(["day", "brand_id"]).reset_index(drop=True))
 
-    # Fill NaNs in numeric cols with 0 for downstream ML/statistics
-    num_cols = df.select_dtypes(include=[np.number]).columns
-    df[num_cols] = df[num_cols].fillna(0)
 
-    return df
+@dataclass
+class StoreFrames:
+    """
+    Brand-day feature frames for many stores, held as one frame sorted by
+    (store_id, day, brand_id) with the row range of each store. The
+    frame keeps the integer `day` key; for_store returns `date`.
+    """
+    frame: pd.DataFrame
+    offsets: Dict[int, Tuple[int, int]] = field(default_factory=dict)
 
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "StoreFrames":
+        frame = frame.sort_values(FRAME_KEYS).reset_index(drop=True)
+        return cls(frame=frame, offsets=store_offsets(frame["store_id"].to_numpy()))
+
+    @property
+    def store_ids(self) -> List[int]:
+        return list(self.offsets)
+
+    def for_store(
+        self,
+        store_id: int,
+        start_date: Optional[pd.Timestamp] = None,
+        end_date: Optional[pd.Timestamp] = None,
+        focus_brand_ids: Optional[List[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        Return the same frame build_brand_day_frame would build for store_id.
+        """
+        start, stop = self.offsets.get(int(store_id), (0, 0))
+        df = self.frame.iloc[start:stop].drop(columns="store_id")
+
+        # Intent columns are shared across stores; keep only the ones this
+        # store actually observed, as a per-store build would.
+        unseen = [
+            c for c in df.columns
+            if c.startswith("intent_") and not df[c].any()
+        ]
+        if unseen:
+            df = df.drop(columns=unseen)
+
+        df = _filter_frame(df, start_date, end_date, focus_brand_ids)
+        return with_dates(df.reset_index(drop=True))
+
+
+def build_brand_day_frames_all_stores(ctx: DataContext) -> StoreFrames:
+    """
+    Build brand-day feature frames for every store in a single pass,
+    grouping by (store_id, date, brand_id) once.
+    """
+    return StoreFrames.from_frame(_combine_signals(ctx))
+
+
+# Summary column -> (feature frame column, "sum" | "mean")
+WINDOW_METRICS: Dict[str, Tuple[str, str]] = {
+    "qty_sold_total": ("qty_sold", "sum"),
+    "qty_sold_avg": ("qty_sold", "mean"),
+    "revenue_total": ("revenue", "sum"),
+    "revenue_avg": ("revenue", "mean"),
+    "facings_avg": ("facings", "mean"),
+    "share_of_shelf_avg": ("share_of_shelf", "mean"),
+    "oos_rate_avg": ("oos_rate", "mean"),
+    "mentions_total": ("mention_count", "sum"),
+    "avg_sentiment": ("avg_sentiment", "mean"),
+    "traffic_avg": ("traffic_index", "mean"),
+    "temp_avg": ("temp_c", "mean"),
+    "rainfall_avg": ("rainfall_mm", "mean"),
+}
+
+class BrandWindowIndex:
+    """
+    Per-brand prefix sums over a dense daily calendar for one store's
+    feature frame. Totals and means for any trailing window are a
+    difference of two prefix rows, so each window costs O(brands)
+    regardless of how much history the frame holds.
+    """
+
+    def __init__(
+        self,
+        start: pd.Timestamp,
+        brand_meta: pd.DataFrame,
+        sources: List[str],
+        value_cum: np.ndarray,
+        count_cum: np.ndarray,
+        row_cum: np.ndarray,
+        int_sources: List[str],
+    ):
+        self.start = start
+        self.brand_meta = brand_meta
+        self.sources = sources
+        # value_cum/count_cum: [source, day + 1, brand]; row_cum: [day + 1, brand]
+        self.value_cum = value_cum
+        self.count_cum = count_cum
+        self.row_cum = row_cum
+        self.int_sources = int_sources
+
+    @property
+    def num_days(self) -> int:
+        return self.row_cum.shape[0] - 1
+
+    @classmethod
+    def from_frame(cls, feature_frame: pd.DataFrame) -> "BrandWindowIndex":
+        if "date" not in feature_frame.columns and "day" not in feature_frame.columns:
+            raise ValueError("feature_frame must contain a 'date' column")
+        if "brand_id" not in feature_frame.columns:
+            raise ValueError("feature_frame must contain a 'brand_id' column")
+
+        df = feature_frame
+        brand_meta = (
+            df.groupby("brand_id", observed=True)[["brand_name", "category"]]
+            .first()
+            .reset_index()
+        )
+        sources = sorted({src for src, _ in WINDOW_METRICS.values()})
+        int_sources = [c for c in sources if pd.api.types.is_integer_dtype(df[c])]
+
+        days = _frame_days(df)
+        first = int(days.min()) if len(df) else 0
+        start = pd.Timestamp(day_dates([first])[0])
+        day = days - first
+        num_days = int(day.max()) + 1 if len(df) else 0
+        brand = np.searchsorted(brand_meta["brand_id"].to_numpy(), df["brand_id"].to_numpy())
+        num_brands = len(brand_meta)
+
+        values = np.zeros((len(sources), num_days + 1, num_brands))
+        counts = np.zeros((len(sources), num_days + 1, num_brands))
+        rows = np.zeros((num_days + 1, num_brands))
+        for k, col in enumerate(sources):
+            v = df[col].to_numpy(dtype=np.float64)
+            ok = ~np.isnan(v)
+            np.add.at(values[k], (day[ok] + 1, brand[ok]), v[ok])
+            np.add.at(counts[k], (day[ok] + 1, brand[ok]), 1)
+        np.add.at(rows, (day + 1, brand), 1)
+
+        return cls(
+            start=start,
+            brand_meta=brand_meta,
+            sources=sources,
+            value_cum=np.cumsum(values, axis=1),
+            count_cum=np.cumsum(counts, axis=1),
+            row_cum=np.cumsum(rows, axis=0),
+            int_sources=int_sources,
+        )
+
+    def summarize(
+        self,
+        window_days: Optional[int] = 30,
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+        Brand summary over the trailing window ending at end_date (default:
+        last day in the frame). window_days=None covers the whole frame.
+        """
+        end = self.num_days if end_date is None else (
+            (pd.to_datetime(end_date) - self.start).days + 1
+        )
+        end = int(min(max(end, 0), self.num_days))
+        begin = 0 if not window_days else max(end - int(window_days), 0)
+
+        totals = self.value_cum[:, end, :] - self.value_cum[:, begin, :]
+        counts = self.count_cum[:, end, :] - self.count_cum[:, begin, :]
+        days = self.row_cum[end, :] - self.row_cum[begin, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = totals / counts
+
+        out = self.brand_meta.copy()
+        out["days_observed"] = days.astype(np.int64)
+        for name, (src, how) in WINDOW_METRICS.items():
+            k = self.sources.index(src)
+            if how == "sum":
+                out[name] = totals[k].astype(np.int64) if src in self.int_sources else totals[k]
+            else:
+                out[name] = means[k]
+
+        return out[days > 0].reset_index(drop=True)
+
+    def summarize_many(
+        self,
+        windows: List[Optional[int]],
+        end_date: Optional[pd.Timestamp] = None,
+    ) -> Dict[Optional[int], pd.DataFrame]:
+        return {w: self.summarize(w, end_date=end_date) for w in windows}
 
 def summarize_brand_window(
     feature_frame: pd.DataFrame,
-    window_days: int = 30,
+    window_days: Optional[int] = 30,
+) -> pd.DataFrame:
+    """
+    Take a daily feature frame and aggregate it per brand over the trailing
+    window_days ending at the frame's last date (None = entire frame).
+    This is the object the CoachAgent will typically see.
+    """
+    return BrandWindowIndex.from_frame(feature_frame).summarize(window_days)
+
+def summarize_brand_windows(
+    feature_frame: pd.DataFrame,
+    windows: List[Optional[int]],
+) -> Dict[Optional[int], pd.DataFrame]:
+    """
+    Several trailing-window summaries from one pass over the frame.
+    """
+    return BrandWindowIndex.from_frame(feature_frame).summarize_many(windows)
+
+def summarize_store_windows(
+    frame: pd.DataFrame,
+    window_days: Optional[int] = 30,
 ) -> pd.DataFrame:
     """
-    Take a daily feature frame and aggregate to a rolling window summary
-    per brand. This is the object the CoachAgent will typically see.
+    Brand summaries for many stores in one grouped pass over a multi-store
+    feature frame (with store_id). Each store's trailing window ends at
+    that store's own last date, so every store's rows match
+    summarize_brand_window on its frame. Sorted by (store_id, brand_id).
     """
-    df = feature_frame.copy()
-    if "date" not in df.columns:
-        raise ValueError("feature_frame must contain a 'date' column")
+    df = frame
+    if window_days and len(df):
+        days = _frame_days(df)
+        last = pd.Series(days).groupby(df["store_id"].to_numpy()).transform("max").to_numpy()
+        df = df[days > last - int(window_days)]
 
-    # For capstone simplicity: just aggregate over entire frame
-    # Ensure brand_id exists (it should from build_brand_day_frame)
-    if "brand_id" not in df.columns:
-         raise ValueError("feature_frame must contain a 'brand_id' column")
+    sources = sorted({src for src, _ in WINDOW_METRICS.values()})
+    int_sources = [c for c in sources if pd.api.types.is_integer_dtype(df[c])]
+    values = df[sources].astype(np.float64)
+    keys = [df["store_id"], df["brand_id"]]
 
-    grouped = (
-        df.groupby("brand_id")
-        .agg(
-            brand_name=("brand_name", "first"),
-            category=("category", "first"),
-            days_observed=("date", "nunique"),
-            qty_sold_total=("qty_sold", "sum"),
-            qty_sold_avg=("qty_sold", "mean"),
-            revenue_total=("revenue", "sum"),
-            revenue_avg=("revenue", "mean"),
-            facings_avg=("facings", "mean"),
-            share_of_shelf_avg=("share_of_shelf", "mean"),
-            oos_rate_avg=("oos_rate", "mean"),
-            mentions_total=("mention_count", "sum"),
-            avg_sentiment=("avg_sentiment", "mean"),
-            traffic_avg=("traffic_index", "mean"),
-            temp_avg=("temp_c", "mean"),
-            rainfall_avg=("rainfall_mm", "mean"),
-        )
-        .reset_index()
-    )
+    out = df.groupby(keys, observed=True)[["brand_name", "category"]].first()
+    out["days_observed"] = df.groupby(keys, observed=True).size().astype(np.int64)
+    totals = values.groupby(keys, observed=True).sum()
+    means = values.groupby(keys, observed=True).mean()
+    for name, (src, how) in WINDOW_METRICS.items():
+        if how == "sum":
+            out[name] = totals[src].astype(np.int64) if src in int_sources else totals[src]
+        else:
+            out[name] = means[src]
 
-    return grouped
+    return out.reset_index()
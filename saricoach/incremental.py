@@ -0,0 +1,530 @@
+"""
+Incremental maintenance of brand-day feature frames.
+
+`IncrementalFeatureFrame` keeps running sums and counts per
+(store_id, date, brand_id) bucket for every signal in the feature frame.
+Appending a batch of new rows only touches the buckets those rows fall
+into; emitting a frame joins the bucket aggregates with weather, traffic
+and brand meta exactly like `build_brand_day_frame`. `refresh` re-emits
+only the stores touched since the last refresh.
+
+Float sums use the same compensated (Kahan) summation as pandas' groupby
+sum/mean, applied in row order per bucket, so as long as batches arrive
+in the order the rows appear in the source tables the result is
+bit-identical to a full rebuild. `verify()` diffs the two.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+import pandas as pd
+
+from .data_context import DataContext, store_offsets
+from .feature_frame import (
+    FRAME_KEYS,
+    StoreFrames,
+    _assemble_frame,
+    _intent_counts,
+    _sales_agg,
+    _shelf_agg,
+    _stt_agg,
+    _with_day,
+    build_brand_day_frames_all_stores,
+    with_dates,
+)
+
+
+def _grown(arr: np.ndarray, n: int) -> np.ndarray:
+    """
+    arr zero-padded to at least n entries. Capacity doubles, so appending
+    k new buckets costs amortized O(k) rather than a copy of every bucket.
+    """
+    if len(arr) >= n:
+        return arr
+    out = np.zeros(max(n, 2 * len(arr)), dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+
+def _rank_in_bucket(buckets: np.ndarray) -> np.ndarray:
+    """
+    0-based position of each row among the rows of its bucket, in row order.
+    """
+    order = np.argsort(buckets, kind="stable")
+    sorted_b = buckets[order]
+    starts = np.r_[True, sorted_b[1:] != sorted_b[:-1]] if len(sorted_b) else np.zeros(0, bool)
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(sorted_b)), 0))
+    rank = np.empty_like(buckets)
+    rank[order] = np.arange(len(sorted_b)) - first
+    return rank
+
+
+class _RunningColumn:
+    """
+    Per-bucket running sum and non-null count for one source column,
+    reproducing pandas groupby sum ("sum") or mean ("mean").
+    """
+
+    def __init__(self, how: str):
+        self.how = how
+        self.dtype: Optional[np.dtype] = None
+        self.out_dtype: Optional[np.dtype] = None
+        self.sums = np.zeros(0)
+        self.comp = np.zeros(0)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _init_dtype(self, src: np.dtype) -> None:
+        is_int = src.kind in "iub"
+        if self.how == "sum" and is_int:
+            # Integer sums are exact; pandas keeps the source int dtype
+            self.dtype, self.out_dtype = np.dtype(np.int64), src
+        elif is_int:
+            self.dtype = self.out_dtype = np.dtype(np.float64)
+        else:
+            self.dtype = self.out_dtype = src
+        self.sums = self.sums.astype(self.dtype)
+        self.comp = self.comp.astype(self.dtype)
+
+    def grow(self, n: int) -> None:
+        self.sums = _grown(self.sums, n)
+        self.comp = _grown(self.comp, n)
+        self.counts = _grown(self.counts, n)
+
+    def add(self, buckets: np.ndarray, rank: np.ndarray, values: pd.Series) -> None:
+        if self.dtype is None:
+            self._init_dtype(np.dtype(values.dtype))
+
+        valid = values.notna().to_numpy()
+        vals = values.to_numpy()[valid].astype(self.dtype)
+        b, r = buckets[valid], rank[valid]
+        np.add.at(self.counts, b, 1)
+
+        if self.dtype.kind in "iu":
+            np.add.at(self.sums, b, vals)
+            return
+
+        # Kahan step per rank: within one rank every bucket appears at most
+        # once, so fancy-indexed updates never collide.
+        for k in range(int(r.max()) + 1 if len(r) else 0):
+            m = r == k
+            bk, x = b[m], vals[m]
+            y = x - self.comp[bk]
+            t = self.sums[bk] + y
+            c = t - self.sums[bk] - y
+            c[c != c] = 0
+            self.comp[bk] = c
+            self.sums[bk] = t
+
+    def values(self, idx: np.ndarray) -> np.ndarray:
+        if self.how == "sum":
+            return self.sums[idx].astype(self.out_dtype)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.sums[idx].astype(np.float64) / self.counts[idx]
+        return mean.astype(self.out_dtype)
+
+
+class _RunningSignal:
+    """
+    Running aggregates for one event table (sales, shelf or STT).
+    """
+
+    def __init__(self, columns: Dict[str, tuple]):
+        # output column -> (source column, "sum" | "mean")
+        self.columns = columns
+        self.running = {out: _RunningColumn(how) for out, (_, how) in columns.items()}
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.prototype: Optional[pd.DataFrame] = None
+
+    def grow(self, n: int) -> None:
+        self.rows = _grown(self.rows, n)
+        for col in self.running.values():
+            col.grow(n)
+
+    def add(self, buckets: np.ndarray, df: pd.DataFrame) -> None:
+        if self.prototype is None:
+            self.prototype = df.iloc[:0]
+        rank = _rank_in_bucket(buckets)
+        np.add.at(self.rows, buckets, 1)
+        for out, (src, _) in self.columns.items():
+            self.running[out].add(buckets, rank, df[src])
+
+    def present(self, idx: np.ndarray) -> np.ndarray:
+        return idx[self.rows[idx] > 0]
+
+
+class IncrementalFeatureFrame:
+    """
+    Brand-day feature aggregates maintained from appended event batches.
+
+    Typical use:
+        inc = IncrementalFeatureFrame.from_context(ctx)
+        inc.append(transactions=new_tx, transaction_lines=new_lines,
+                   shelf_vision=new_sv, stt_events=new_stt)
+        ff = inc.frame(store_id=1)
+    """
+
+    def __init__(self, brands: pd.DataFrame):
+        self.brands = brands
+        self._bucket_of: Dict[tuple, int] = {}
+        # Key columns per bucket id, with spare capacity, and their dtypes
+        self._key_cols: Dict[str, np.ndarray] = {}
+        self._key_dtypes: Dict[str, np.dtype] = {}
+        # Stores touched since the last refresh()
+        self._dirty: Set[int] = set()
+
+        self._sales = _RunningSignal({
+            "qty_sold": ("quantity", "sum"),
+            "revenue": ("subtotal", "sum"),
+        })
+        self._shelf = _RunningSignal({
+            "facings": ("facings", "mean"),
+            "share_of_shelf": ("share_of_shelf", "mean"),
+            "oos_rate": ("oos_flag", "mean"),
+        })
+        self._stt = _RunningSignal({
+            "avg_sentiment": ("sentiment_score", "mean"),
+        })
+        self._intents: Dict[object, np.ndarray] = {}
+
+        # (store_id, day) of every transaction, indexed by transaction_id,
+        # in runs of roughly doubling size so a batch only re-indexes the
+        # small recent runs
+        self._tx_runs: List[pd.DataFrame] = []
+        self._pending_lines: Optional[pd.DataFrame] = None
+        self._weather: List[pd.DataFrame] = []
+        self._traffic: List[pd.DataFrame] = []
+
+    @classmethod
+    def from_context(cls, ctx: DataContext) -> "IncrementalFeatureFrame":
+        inc = cls(ctx.brands)
+        inc.append(
+            transactions=ctx.transactions,
+            transaction_lines=ctx.transaction_lines,
+            shelf_vision=ctx.shelf_vision,
+            stt_events=ctx.stt_events,
+            weather=ctx.weather,
+            foot_traffic=ctx.foot_traffic,
+        )
+        # Frames built from ctx already hold everything appended here
+        inc._dirty.clear()
+        return inc
+
+    # ------------------------------------------------------------------
+    # Appending
+    # ------------------------------------------------------------------
+
+    def _buckets(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Bucket id per row, registering keys not seen before.
+        """
+        keys = df[FRAME_KEYS]
+        uniq = keys.drop_duplicates()
+        tuples = list(uniq.itertuples(index=False, name=None))
+        get = self._bucket_of.get
+        ids = np.fromiter((get(k, -1) for k in tuples), dtype=np.int64, count=len(tuples))
+        new = np.flatnonzero(ids < 0)
+        if len(new):
+            start = len(self._bucket_of)
+            ids[new] = np.arange(start, start + len(new))
+            self._bucket_of.update(zip((tuples[i] for i in new), ids[new].tolist()))
+            n = len(self._bucket_of)
+            for col in FRAME_KEYS:
+                values = uniq[col].to_numpy()[new]
+                dtype = self._key_dtypes.get(col)
+                dtype = values.dtype if dtype is None else np.result_type(dtype, values.dtype)
+                self._key_dtypes[col] = dtype
+                arr = _grown(self._key_cols.get(col, np.zeros(0, dtype=dtype)).astype(dtype, copy=False), n)
+                arr[start:n] = values
+                self._key_cols[col] = arr
+            for signal in (self._sales, self._shelf, self._stt):
+                signal.grow(n)
+            for label, counts in self._intents.items():
+                self._intents[label] = _grown(counts, n)
+        self._dirty.update(uniq["store_id"].tolist())
+
+        lookup = uniq.assign(_bucket=ids)
+        return keys.merge(lookup, on=FRAME_KEYS, how="left")["_bucket"].to_numpy()
+
+    def _add_transactions(self, tx: pd.DataFrame) -> None:
+        runs = self._tx_runs
+        runs.append(tx[["transaction_id", "store_id", "day"]].set_index("transaction_id"))
+        while len(runs) > 1 and len(runs[-2]) <= 2 * len(runs[-1]):
+            last = runs.pop()
+            runs[-1] = pd.concat([runs[-1], last])
+
+    def _tag_lines(self, lines: pd.DataFrame) -> pd.DataFrame:
+        if {"store_id", "day"}.issubset(lines.columns):
+            return lines
+        if self._pending_lines is not None:
+            lines = pd.concat([self._pending_lines, lines], ignore_index=True)
+            self._pending_lines = None
+
+        # Look each line's transaction up run by run, keeping line order
+        ids = lines["transaction_id"]
+        run_of = np.full(len(lines), -1, dtype=np.int64)
+        pos = np.full(len(lines), -1, dtype=np.int64)
+        for k, run in enumerate(self._tx_runs):
+            todo = np.flatnonzero(run_of < 0)
+            if not len(todo):
+                break
+            found = run.index.get_indexer(ids.iloc[todo])
+            hit = found >= 0
+            run_of[todo[hit]] = k
+            pos[todo[hit]] = found[hit]
+
+        orphan = run_of < 0
+        if orphan.any():
+            # Lines whose transaction has not arrived yet wait for a later batch
+            self._pending_lines = lines[orphan]
+        tagged = lines[~orphan].reset_index(drop=True)
+        if tagged.empty:
+            return tagged
+        run_of, pos = run_of[~orphan], pos[~orphan]
+        for col in ("store_id", "day"):
+            dtype = np.result_type(*(run[col].dtype for run in self._tx_runs))
+            values = np.empty(len(tagged), dtype=dtype)
+            for k, run in enumerate(self._tx_runs):
+                m = run_of == k
+                values[m] = run[col].to_numpy()[pos[m]]
+            tagged[col] = values
+        return tagged
+
+    def append(
+        self,
+        transactions: Optional[pd.DataFrame] = None,
+        transaction_lines: Optional[pd.DataFrame] = None,
+        shelf_vision: Optional[pd.DataFrame] = None,
+        stt_events: Optional[pd.DataFrame] = None,
+        weather: Optional[pd.DataFrame] = None,
+        foot_traffic: Optional[pd.DataFrame] = None,
+    ) -> None:
+        """
+        Fold a batch of new rows into the running aggregates. Tables use the
+        canonical schema; raw or indexed (day-keyed) rows are both accepted.
+        """
+        if transactions is not None and not transactions.empty:
+            self._add_transactions(_with_day(transactions, "tx_timestamp"))
+
+        has_lines = transaction_lines is not None and not transaction_lines.empty
+        if has_lines or self._pending_lines is not None:
+            tl = self._tag_lines(transaction_lines if has_lines else self._pending_lines.iloc[:0])
+            if not tl.empty:
+                self._sales.add(self._buckets(tl), tl)
+
+        if shelf_vision is not None and not shelf_vision.empty:
+            sv = _with_day(shelf_vision, "event_timestamp")
+            self._shelf.add(self._buckets(sv), sv)
+
+        if stt_events is not None and not stt_events.empty:
+            stt = _with_day(stt_events, "event_timestamp")
+            buckets = self._buckets(stt)
+            self._stt.add(buckets, stt)
+            n = len(self._bucket_of)
+            for label, rows in pd.Series(buckets).groupby(stt["intent_label"].to_numpy(), observed=True):
+                counts = self._intents.setdefault(label, np.zeros(n, dtype=np.int64))
+                np.add.at(counts, rows.to_numpy(), 1)
+
+        for df, parts in ((weather, self._weather), (foot_traffic, self._traffic)):
+            if df is not None and not df.empty:
+                parts.append(_with_day(df, "date"))
+                self._dirty.update(df["store_id"].unique().tolist())
+
+        # Prototypes keep empty-signal aggregates shaped like a full rebuild
+        if self._sales.prototype is None and transaction_lines is not None:
+            proto = transaction_lines.iloc[:0]
+            if "store_id" not in proto.columns:
+                tx_proto = (
+                    self._tx_runs[0].iloc[:0].reset_index() if self._tx_runs
+                    else pd.DataFrame(columns=["transaction_id", "store_id", "day"])
+                )
+                proto = proto.merge(tx_proto, on="transaction_id")
+            self._sales.prototype = proto
+        for signal, df in ((self._shelf, shelf_vision), (self._stt, stt_events)):
+            if signal.prototype is None and df is not None:
+                signal.prototype = df.iloc[:0]
+
+    # ------------------------------------------------------------------
+    # Emitting
+    # ------------------------------------------------------------------
+
+    def _key_frame(self, idx: np.ndarray) -> pd.DataFrame:
+        if not self._key_cols:
+            return pd.DataFrame(columns=FRAME_KEYS)
+        return pd.DataFrame({
+            col: self._key_cols[col][idx].astype(self._key_dtypes[col], copy=False) for col in FRAME_KEYS
+        })
+
+    @property
+    def keys(self) -> pd.DataFrame:
+        """
+        (store_id, day, brand_id) of every bucket, by bucket id.
+        """
+        return self._key_frame(np.arange(len(self._bucket_of)))
+
+    def _signal_agg(self, signal: _RunningSignal, idx: np.ndarray, empty_agg) -> pd.DataFrame:
+        present = signal.present(idx)
+        if len(present) == 0:
+            proto = signal.prototype
+            if proto is None:
+                proto = pd.DataFrame(columns=[*FRAME_KEYS, *(src for src, _ in signal.columns.values())])
+            return empty_agg(proto)
+        out = self._key_frame(present)
+        for name, col in signal.running.items():
+            out[name] = col.values(present)
+        return out
+
+    def _aggregate(self, store_ids: Optional[Iterable[int]]) -> pd.DataFrame:
+        """
+        Feature frame rows for the given stores (all when None), keyed by
+        (store_id, day, brand_id).
+        """
+        idx = np.arange(len(self._bucket_of))
+        if store_ids is not None:
+            store_ids = list(store_ids)
+            if len(idx):
+                idx = idx[np.isin(self._key_cols["store_id"][idx], store_ids)]
+
+        sales_agg = self._signal_agg(self._sales, idx, _sales_agg)
+        shelf_agg = self._signal_agg(self._shelf, idx, _shelf_agg)
+
+        stt_present = self._stt.present(idx)
+        if len(stt_present):
+            stt_agg = self._key_frame(stt_present)
+            stt_agg["mention_count"] = self._stt.rows[stt_present]
+            stt_agg["avg_sentiment"] = self._stt.running["avg_sentiment"].values(stt_present)
+            parts = []
+            for label, counts in self._intents.items():
+                hit = idx[counts[idx] > 0]
+                if len(hit):
+                    part = self._key_frame(hit)
+                    part["intent_label"] = label
+                    part["intent_count"] = counts[hit]
+                    parts.append(part)
+            intent_counts = pd.concat(parts, ignore_index=True)
+        else:
+            proto = self._stt.prototype
+            if proto is None:
+                proto = pd.DataFrame(columns=[*FRAME_KEYS, "sentiment_score", "intent_label"])
+            stt_agg = _stt_agg(proto)
+            intent_counts = _intent_counts(proto)
+
+        w = self._concat(self._weather, ["store_id", "day", "temp_c", "rainfall_mm", "condition"], store_ids)
+        t = self._concat(self._traffic, ["store_id", "day", "traffic_index"], store_ids)
+
+        return _assemble_frame(sales_agg, shelf_agg, stt_agg, intent_counts, w, t, self.brands)
+
+    @staticmethod
+    def _concat(parts: List[pd.DataFrame], columns: List[str], store_ids: Optional[List[int]]) -> pd.DataFrame:
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        if store_ids is not None:
+            parts = [df[df["store_id"].isin(store_ids)] for df in parts]
+        return pd.concat(parts, ignore_index=True)
+
+    def frame(self, store_id: int) -> pd.DataFrame:
+        """
+        Same frame as build_brand_day_frame(ctx, store_id) over all rows
+        appended so far.
+        """
+        df = self._aggregate([store_id]).drop(columns="store_id")
+        return with_dates(df.sort_values(["day", "brand_id"]).reset_index(drop=True))
+
+    def store_frames(self) -> StoreFrames:
+        """
+        Same frames as build_brand_day_frames_all_stores(ctx).
+        """
+        self._dirty.clear()
+        return StoreFrames.from_frame(self._aggregate(None))
+
+    def refresh(self, frames: Optional[StoreFrames]) -> StoreFrames:
+        """
+        Bring frames (from store_frames(), or built from the context this
+        was created from) up to date with the rows appended since. Only the
+        stores those rows touched are re-aggregated; the rest of the frame
+        is reused as is.
+        """
+        if frames is None:
+            return self.store_frames()
+        if not self._dirty:
+            return frames
+        stores = sorted(self._dirty)
+        fresh = self._aggregate(stores)
+        frame = frames.frame
+
+        # A new intent label adds a column to every store: rebuild in full
+        missing = [c for c in frame.columns if c not in fresh.columns]
+        if any(c not in frame.columns for c in fresh.columns) or any(
+            not c.startswith("intent_") for c in missing
+        ):
+            return self.store_frames()
+        fresh = fresh.assign(**{c: 0.0 for c in missing})[list(frame.columns)]
+        if len(fresh) and not fresh.dtypes.equals(frame.dtypes):
+            return self.store_frames()
+
+        self._dirty.clear()
+        # frame is sorted by store: cut each touched store's rows out by
+        # position and put its fresh rows in their place, without a re-sort
+        fresh = fresh.sort_values(FRAME_KEYS)
+        fresh_ids = fresh["store_id"].to_numpy()
+        frame_ids = frame["store_id"].to_numpy()
+        pieces, pos = [], 0
+        for store_id in stores:
+            lo = np.searchsorted(frame_ids, store_id, side="left")
+            hi = np.searchsorted(frame_ids, store_id, side="right")
+            pieces.append(frame.iloc[pos:lo])
+            pieces.append(fresh.iloc[
+                np.searchsorted(fresh_ids, store_id, side="left"):np.searchsorted(fresh_ids, store_id, side="right")
+            ])
+            pos = hi
+        pieces.append(frame.iloc[pos:])
+        spliced = pd.concat(pieces, ignore_index=True)
+        return StoreFrames(frame=spliced, offsets=store_offsets(spliced["store_id"].to_numpy()))
+
+    def verify(self, ctx: DataContext) -> pd.DataFrame:
+        """
+        Diff the incremental frames against a full rebuild from ctx, which
+        should hold every row appended so far. Returns one row per
+        mismatching cell (empty when bit-identical).
+        """
+        expected = build_brand_day_frames_all_stores(ctx).frame
+        actual = self.store_frames().frame
+        return diff_frames(expected, actual)
+
+
+def diff_frames(expected: pd.DataFrame, actual: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cell-level diff of two feature frames keyed by (store_id, day, brand_id).
+    Numeric cells must match bit for bit (NaN equals NaN); dtype changes
+    on numeric columns are reported with column-level rows.
+    """
+    out_cols = [*FRAME_KEYS, "column", "expected", "actual"]
+    rows = []
+
+    merged = expected.merge(
+        actual, on=FRAME_KEYS, how="outer", suffixes=("__exp", "__act"), indicator=True
+    )
+    for side, label in (("left_only", "<row>"), ("right_only", "<row>")):
+        for key in merged.loc[merged["_merge"] == side, FRAME_KEYS].itertuples(index=False, name=None):
+            exp, act = ("present", "missing") if side == "left_only" else ("missing", "present")
+            rows.append((*key, label, exp, act))
+    both = merged[merged["_merge"] == "both"]
+
+    for col in expected.columns.union(actual.columns):
+        if col in FRAME_KEYS:
+            continue
+        if col not in expected.columns or col not in actual.columns:
+            rows.append((None, None, None, col, col in expected.columns, col in actual.columns))
+            continue
+        e, a = both[f"{col}__exp"], both[f"{col}__act"]
+        numeric = pd.api.types.is_numeric_dtype(expected[col]) and pd.api.types.is_numeric_dtype(actual[col])
+        if numeric:
+            if expected[col].dtype != actual[col].dtype:
+                rows.append((None, None, None, col, str(expected[col].dtype), str(actual[col].dtype)))
+            ev, av = e.to_numpy(dtype=np.float64), a.to_numpy(dtype=np.float64)
+            bad = ~((ev == av) | (np.isnan(ev) & np.isnan(av)))
+        else:
+            ev, av = e.astype(object).to_numpy(), a.astype(object).to_numpy()
+            bad = ~(pd.isna(ev) & pd.isna(av)) & (ev != av)
+        for i in np.flatnonzero(bad):
+            rows.append((*both.iloc[i][FRAME_KEYS], col, ev[i], av[i]))
+
+    return pd.DataFrame(rows, columns=out_cols)
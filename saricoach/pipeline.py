@@ -0,0 +1,273 @@
+"""
+Small DAG runner for batch pipelines such as the seed generator.
+
+A Pipeline is a list of Stages, each naming the artifacts it consumes and
+produces. Stages whose inputs are ready run concurrently on a process
+pool. With a cache_dir, every stage's outputs are stored under a key
+hashed from its code, params and the content of its inputs. A re-run
+then recomputes only the stages whose code or upstream data changed;
+unchanged outputs keep their downstream stages cached.
+"""
+import hashlib
+import inspect
+import logging
+import pickle
+import time
+import types
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One pipeline step, called as fn(*inputs, **params).
+
+    fn must be a module-level function so it can run in a worker process.
+    It returns a single value for one output, a tuple for several, and
+    anything (ignored) for none. Set cache=False for stages whose effect
+    lives outside the pipeline, such as loading a database.
+    """
+    name: str
+    fn: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    params: Mapping[str, Any] = field(default_factory=dict)
+    cache: bool = True
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Content hash of an artifact. DataFrames hash their values, columns and
+    dtypes; Paths hash their size and mtime, so a rewritten or deleted
+    file counts as changed.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _update(h, value)
+    return h.hexdigest()
+
+
+def _update(h, value: Any) -> None:
+    if isinstance(value, pd.DataFrame):
+        h.update(b"df")
+        h.update(repr(list(value.columns)).encode())
+        h.update(repr([str(t) for t in value.dtypes]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, Path):
+        h.update(b"path" + str(value).encode())
+        if value.exists():
+            st = value.stat()
+            h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    elif isinstance(value, dict):
+        h.update(b"dict")
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            _update(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(type(value).__name__.encode())
+        for v in value:
+            _update(h, v)
+    else:
+        h.update(pickle.dumps(value))
+
+
+def code_fingerprint(fn: Callable[..., Any]) -> str:
+    """
+    Hash fn's source plus the source of same-module functions it calls and
+    the values of simple module constants it reads, recursively.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    seen: Set[str] = set()
+
+    def visit(f) -> None:
+        key = f"{f.__module__}.{f.__qualname__}"
+        if key in seen:
+            return
+        seen.add(key)
+        try:
+            h.update(inspect.getsource(f).encode())
+        except (OSError, TypeError):
+            h.update(f.__code__.co_code)
+        for name in _code_names(f.__code__):
+            ref = f.__globals__.get(name)
+            if isinstance(ref, types.FunctionType):
+                if ref.__module__ == f.__module__:
+                    visit(ref)
+            elif ref is not None and not isinstance(ref, (types.ModuleType, type)):
+                try:
+                    h.update(name.encode() + pickle.dumps(ref))
+                except Exception:
+                    pass
+
+    visit(fn)
+    return h.hexdigest()
+
+
+def _code_names(code: types.CodeType) -> List[str]:
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names.extend(_code_names(const))
+    return names
+
+
+def _has_path(value: Any) -> bool:
+    if isinstance(value, Path):
+        return True
+    if isinstance(value, dict):
+        return any(_has_path(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_path(v) for v in value)
+    return False
+
+
+def _call_stage(stage: Stage, args: List[Any]) -> Dict[str, Any]:
+    result = stage.fn(*args, **stage.params)
+    if len(stage.outputs) == 1:
+        result = (result,)
+    return dict(zip(stage.outputs, result)) if stage.outputs else {}
+
+
+class Pipeline:
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        cache_dir: Optional[Path] = None,
+        workers: int = 1,
+        progress: Callable[[str], None] = logger.info,
+        keep_entries: int = 4,
+    ):
+        self.stages = list(stages)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.workers = max(1, workers)
+        self.progress = progress
+        self.keep_entries = max(1, keep_entries)
+        # stage name -> seconds it ran for, or None when served from cache
+        self.timings: Dict[str, Optional[float]] = {}
+        self._check()
+
+    def _check(self) -> None:
+        producers: Dict[str, str] = {}
+        for stage in self.stages:
+            if stage.name in {s.name for s in self.stages if s is not stage}:
+                raise ValueError(f"Duplicate stage name {stage.name!r}")
+            for out in stage.outputs:
+                if out in producers:
+                    raise ValueError(f"{out!r} is produced by both {producers[out]!r} and {stage.name!r}")
+                producers[out] = stage.name
+        for stage in self.stages:
+            missing = [i for i in stage.inputs if i not in producers]
+            if missing:
+                raise ValueError(f"Stage {stage.name!r} needs {missing}, which no stage produces")
+        # Every stage must become runnable, i.e. no cycles
+        done: Set[str] = set()
+        remaining = list(self.stages)
+        while remaining:
+            ready = [s for s in remaining if all(producers[i] in done for i in s.inputs)]
+            if not ready:
+                raise ValueError(f"Cycle between stages {[s.name for s in remaining]}")
+            done.update(s.name for s in ready)
+            remaining = [s for s in remaining if s.name not in done]
+
+    def _cache_key(self, stage: Stage) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(stage.name.encode())
+        h.update(code_fingerprint(stage.fn).encode())
+        # Params hash by value; a Path param names a file, not its contents
+        h.update(pickle.dumps(sorted(stage.params.items())))
+        for name in stage.inputs:
+            h.update(name.encode() + self._hashes[name].encode())
+        return h.hexdigest()
+
+    def _cache_path(self, stage: Stage, key: str) -> Path:
+        return self.cache_dir / stage.name / f"{key}.pkl"
+
+    def _load_cached(self, stage: Stage, key: str) -> Optional[Dict[str, Any]]:
+        if self.cache_dir is None or not stage.cache:
+            return None
+        path = self._cache_path(stage, key)
+        if not path.exists():
+            return None
+        with path.open("rb") as f:
+            entry = pickle.load(f)
+        # Outputs that are (or hold) files must still be the ones the stage wrote
+        for name, value in entry["outputs"].items():
+            if _has_path(value) and fingerprint(value) != entry["hashes"][name]:
+                return None
+        return entry
+
+    def _store(self, stage: Stage, key: str, outputs: Dict[str, Any], hashes: Dict[str, str]) -> None:
+        if self.cache_dir is None or not stage.cache:
+            return
+        path = self._cache_path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Keep a few recent entries per stage, so toggling back to an
+        # earlier input is still a hit
+        entries = sorted(path.parent.glob("*.pkl"), key=lambda p: p.stat().st_mtime_ns)
+        for stale in entries[:max(0, len(entries) - self.keep_entries + 1)]:
+            stale.unlink()
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump({"outputs": outputs, "hashes": hashes}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every stage and return all artifacts by name.
+        """
+        self.timings = {}
+        self._hashes: Dict[str, str] = {}
+        artifacts: Dict[str, Any] = {}
+        pending = list(self.stages)
+        running: Dict[Any, Tuple[Stage, str, float]] = {}
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+        def finish(stage: Stage, key: str, outputs: Dict[str, Any], seconds: Optional[float]) -> None:
+            hashes = {name: fingerprint(value) for name, value in outputs.items()}
+            if seconds is not None:
+                self._store(stage, key, outputs, hashes)
+            artifacts.update(outputs)
+            self._hashes.update(hashes)
+            self.timings[stage.name] = seconds
+            self.progress(f"{stage.name}: cached" if seconds is None else f"{stage.name}: {seconds:.2f}s")
+
+        try:
+            while pending or running:
+                # Start (or serve from cache) everything runnable; cache hits
+                # and inline runs can unblock further stages immediately.
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for stage in [s for s in pending if all(i in artifacts for i in s.inputs)]:
+                        pending.remove(stage)
+                        progressed = True
+                        key = self._cache_key(stage)
+                        entry = self._load_cached(stage, key)
+                        if entry is not None:
+                            artifacts.update(entry["outputs"])
+                            self._hashes.update(entry["hashes"])
+                            self.timings[stage.name] = None
+                            self.progress(f"{stage.name}: cached")
+                            continue
+                        args = [artifacts[i] for i in stage.inputs]
+                        if pool is None:
+                            started = time.perf_counter()
+                            finish(stage, key, _call_stage(stage, args), time.perf_counter() - started)
+                        else:
+                            running[pool.submit(_call_stage, stage, args)] = (stage, key, time.perf_counter())
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key, started = running.pop(future)
+                    finish(stage, key, future.result(), time.perf_counter() - started)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        return artifacts
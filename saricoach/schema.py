@@ -0,0 +1,174 @@
+"""
+Compact dtype registry for the canonical SariCoach tables.
+
+The column lists follow the canonical schema documented at the top of
+seed_saricoach_data.py, keyed by DataContext field name. Loaders call
+`compact_tables` right after reading so every table uses narrow ids,
+categories for low-cardinality labels and float32 sensor metrics.
+Money columns (price_unit, subtotal, total_amount) stay float64 so
+revenue sums do not lose precision.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class TableSchema:
+    dtypes: Dict[str, str]
+    # Surrogate UUID columns nothing downstream reads
+    unused: Tuple[str, ...] = ()
+
+SCHEMAS: Dict[str, TableSchema] = {
+    "brands": TableSchema({
+        "brand_id": "int32",
+        "brand_name": "category",
+        "category": "category",
+    }),
+    "products": TableSchema({
+        "product_id": "int32",
+        "brand_id": "int32",
+        "category": "category",
+        "pack_size": "category",
+        "pack_type": "category",
+    }),
+    "stores": TableSchema({
+        "store_id": "int32",
+        "region": "category",
+        "city": "category",
+        "barangay": "category",
+        "store_type": "category",
+    }),
+    "transactions": TableSchema({
+        "store_id": "int32",
+        "tx_timestamp": "datetime64[ns]",
+        "total_amount": "float64",
+    }),
+    "transaction_lines": TableSchema({
+        "line_no": "int16",
+        "product_id": "int32",
+        "brand_id": "int32",
+        "quantity": "int32",
+        "price_unit": "float64",
+        "subtotal": "float64",
+    }),
+    "shelf_vision": TableSchema({
+        "store_id": "int32",
+        "event_timestamp": "datetime64[ns]",
+        "brand_id": "int32",
+        "facings": "int16",
+        "share_of_shelf": "float32",
+        "oos_flag": "bool",
+        "confidence": "float32",
+    }, unused=("id",)),
+    "stt_events": TableSchema({
+        "store_id": "int32",
+        "event_timestamp": "datetime64[ns]",
+        "brand_id": "int32",
+        # raw_text is free-text and nearly unique per row, so it stays object
+        "intent_label": "category",
+        "sentiment_score": "float32",
+    }, unused=("id",)),
+    "weather": TableSchema({
+        "store_id": "int32",
+        "date": "datetime64[ns]",
+        "temp_c": "float32",
+        "rainfall_mm": "float32",
+        "condition": "category",
+    }, unused=("id",)),
+    "foot_traffic": TableSchema({
+        "store_id": "int32",
+        "date": "datetime64[ns]",
+        "traffic_index": "float32",
+    }, unused=("id",)),
+}
+
+# Nullable counterparts used when a column has missing values
+_NULLABLE = {"int16": "Int16", "int32": "Int32", "bool": "boolean"}
+
+def _cast(s: pd.Series, dtype: str) -> pd.Series:
+    if dtype.startswith("datetime64"):
+        s = pd.to_datetime(s)
+        if s.dt.tz is not None:
+            # timestamptz columns from Postgres: keep UTC wall time, naive
+            s = s.dt.tz_convert(None)
+        return s.astype(dtype)
+    if dtype in _NULLABLE and s.isna().any():
+        return s.astype(_NULLABLE[dtype])
+    return s.astype(dtype)
+
+def apply_schema(table: str, df: pd.DataFrame, drop_unused: bool = True) -> pd.DataFrame:
+    """
+    Cast a canonical table to its compact dtypes. Columns the registry
+    does not list are left untouched.
+    """
+    schema = SCHEMAS[table]
+    out = df
+    if drop_unused:
+        out = out.drop(columns=[c for c in schema.unused if c in out.columns])
+    out = out.copy()
+    for col, dtype in schema.dtypes.items():
+        if col in out.columns and str(out[col].dtype) != dtype:
+            out[col] = _cast(out[col], dtype)
+    return out
+
+def concat_compacted(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate chunks already cast by apply_schema. Each chunk's category
+    columns only know the labels that chunk saw; they are widened to the
+    sorted union first, as casting the whole table would give, so the
+    result stays categorical instead of falling back to object.
+    """
+    if not chunks:
+        return pd.DataFrame()
+    chunks = list(chunks)
+    for col, dtype in chunks[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        categories = chunks[0][col].cat.categories
+        for chunk in chunks[1:]:
+            categories = categories.union(chunk[col].cat.categories)
+        for i, chunk in enumerate(chunks):
+            if not chunk[col].cat.categories.equals(categories):
+                chunks[i] = chunk.assign(**{col: chunk[col].cat.set_categories(categories)})
+    return pd.concat(chunks, ignore_index=True)
+
+def compact_tables(
+    tables: Dict[str, pd.DataFrame],
+    drop_unused: bool = True,
+    log_report: bool = False,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Apply the registry to every known table. With log_report, the
+    per-table memory before/after is logged at INFO.
+    """
+    out = {
+        name: apply_schema(name, df, drop_unused=drop_unused) if name in SCHEMAS else df
+        for name, df in tables.items()
+    }
+    if log_report and logger.isEnabledFor(logging.INFO):
+        logger.info("DataContext memory:\n%s", memory_report(tables, out).to_string(index=False))
+    return out
+
+def memory_report(
+    before: Dict[str, pd.DataFrame],
+    after: Dict[str, pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Per-table deep memory usage before and after compaction.
+    """
+    rows = []
+    for name, df in before.items():
+        bytes_before = int(df.memory_usage(deep=True).sum())
+        bytes_after = int(after[name].memory_usage(deep=True).sum())
+        rows.append({
+            "table": name,
+            "rows": len(df),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "saved_pct": round(100.0 * (1 - bytes_after / bytes_before), 1) if bytes_before else 0.0,
+        })
+    return pd.DataFrame(rows)
@@ -9,22 +9,34 @@ Seed generator for SariCoach / Sari-Sari Expert.
   - shelf_vision_events, stt_events, weather_daily, foot_traffic_daily
 - Exports:
   - CSVs under data/processed/
-  - Optional Postgres INSERT SQL under data/processed/seed_saricoach.sql
+  - Postgres INSERT SQL under data/processed/seed_saricoach.sql (default,
+    --format sql), or loads Postgres directly with COPY FROM STDIN
+    (--format copy --db-url ...)
+  - optionally, compressed part files per store chunk plus a manifest
+    (--parts-dir ...)
 
 Customize:
 - load_raw_kaggle_data()
 - mappings in build_dim_* functions to match your chosen Kaggle datasets.
 """
 
+import argparse
+import hashlib
 import os
+import time
 from pathlib import Path
-import uuid
 import random
+import zlib
 from datetime import datetime, timedelta
+from typing import Optional
 
 import pandas as pd
 import numpy as np
 
+from saricoach.backends.copy_loader import SEED_SCHEMA, SEED_TABLES, copy_tables, seed_ddl
+from saricoach.backends.parts import PartWriter, clear_parts, split_by_store, write_part
+from saricoach.pipeline import Pipeline, Stage
+
 
 BASE_DIR = Path(__file__).resolve().parent
 RAW_DIR = BASE_DIR / "data" / "raw"
@@ -75,6 +87,9 @@ np.random.seed(RANDOM_SEED)
 # foot_traffic_daily:
 #   id (str), store_id (int), date (date),
 #   traffic_index (float)
+#
+# The event tables' ids are int64 keys from pack_event_ids while in
+# memory; render_ids turns them into UUID text on export.
 # ---------------------------------------------------------------------------
 
 
@@ -309,10 +324,20 @@ def build_transactions_and_lines(
 # 4. Synthetic multimodal features: shelf vision, STT, weather, traffic
 # ---------------------------------------------------------------------------
 
+# Quantity sold -> facings: (lower bound, low, high) drawn as integers in
+# [low, high); days with nothing sold show a single facing.
+FACING_BINS = [
+    (20, 8, 12),
+    (10, 4, 8),
+    (1, 1, 4),
+]
+
+
 def generate_shelf_vision(
     transaction_lines_df: pd.DataFrame,
     transactions_df: pd.DataFrame,
     stores_df: pd.DataFrame,
+    rng: Optional[np.random.Generator] = None,
 ):
     """
     Generate synthetic shelf_vision_events from sales.
@@ -324,16 +349,21 @@ def generate_shelf_vision(
           - Compute share_of_shelf within category per store/day.
           - Randomly mark occasional OOS where sales drop to zero.
 
+    Draws come from `rng` (seeded from RANDOM_SEED when omitted). `id` is
+    an int64 packed from (store, day, brand); see render_ids for the UUID
+    text written at export.
+
     Returns:
         shelf_vision_df
     """
-    tx = transactions_df.copy()
-    tx["date"] = tx["tx_timestamp"].dt.date
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
 
-    tl = transaction_lines_df.merge(
-        tx[["transaction_id", "store_id", "date"]],
-        on="transaction_id",
-        how="left"
+    tx = transactions_df[["transaction_id", "store_id"]].assign(
+        date=pd.to_datetime(transactions_df["tx_timestamp"]).dt.normalize()
+    )
+    tl = transaction_lines_df[["transaction_id", "brand_id", "quantity"]].merge(
+        tx, on="transaction_id", how="left"
     )
 
     daily_brand = (
@@ -344,35 +374,24 @@ def generate_shelf_vision(
     )
 
     # Map qty_sold -> facings
-    def qty_to_facings(q):
-        if q >= 20:
-            return np.random.randint(8, 12)
-        elif q >= 10:
-            return np.random.randint(4, 8)
-        elif q > 0:
-            return np.random.randint(1, 4)
-        else:
-            return 1
-
-    daily_brand["facings"] = daily_brand["qty_sold"].apply(qty_to_facings)
+    q = daily_brand["qty_sold"].to_numpy()
+    n = len(q)
+    daily_brand["facings"] = np.select(
+        [q >= lower for lower, _, _ in FACING_BINS],
+        [rng.integers(low, high, size=n) for _, low, high in FACING_BINS],
+        default=1,
+    )
 
     # Share of shelf per store/day (within all brands)
-    shelf_totals = (
-        daily_brand.groupby(["store_id", "date"])["facings"]
-        .sum()
-        .reset_index()
-        .rename(columns={"facings": "facings_total"})
-    )
-    sv = daily_brand.merge(shelf_totals, on=["store_id", "date"], how="left")
-    sv["share_of_shelf"] = sv["facings"] / sv["facings_total"].replace(0, 1)
+    sv = daily_brand
+    facings_total = sv.groupby(["store_id", "date"])["facings"].transform("sum")
+    sv["share_of_shelf"] = sv["facings"] / facings_total.replace(0, 1)
     sv["oos_flag"] = sv["qty_sold"] == 0
 
     # Add timestamps, ids, confidence
-    sv["event_timestamp"] = sv["date"].apply(
-        lambda d: datetime.combine(d, datetime.min.time()) + timedelta(hours=8)
-    )
-    sv["confidence"] = np.random.uniform(0.8, 0.99, size=len(sv))
-    sv["id"] = [str(uuid.uuid4()) for _ in range(len(sv))]
+    sv["event_timestamp"] = sv["date"] + np.timedelta64(8, "h")
+    sv["confidence"] = rng.uniform(0.8, 0.99, size=n)
+    sv["id"] = pack_event_ids(sv["store_id"], sv["date"], sv["brand_id"])
 
     shelf_vision_df = sv[[
         "id", "store_id", "event_timestamp", "brand_id",
@@ -382,9 +401,95 @@ def generate_shelf_vision(
     return shelf_vision_df
 
 
+# Bit widths of the packed event id fields; 62 bits in total so the id
+# also fits the low half of a UUID next to its variant bits.
+_ID_FIELDS = (("store_id", 20), ("day", 16), ("brand_id", 20), ("seq", 6))
+
+
+def pack_event_ids(store_id, date, brand_id=0, seq=0) -> np.ndarray:
+    """
+    Deterministic int64 ids for events keyed by (store, day, brand, seq),
+    where day counts days since 1970-01-01. The same key always gets the
+    same id, however the data is sharded.
+    """
+    day = np.asarray(date, dtype="datetime64[D]").astype(np.int64)
+    parts = [np.asarray(v, dtype=np.int64) for v in (store_id, day, brand_id, seq)]
+    packed = np.zeros(np.broadcast(*parts).shape, dtype=np.int64)
+    for (name, bits), values in zip(_ID_FIELDS, parts):
+        if values.size and (values.min() < 0 or values.max() >= 1 << bits):
+            raise ValueError(f"{name} out of range for packed event ids (0 <= {name} < {1 << bits})")
+        packed = (packed << bits) | values
+    return packed
+
+
+STT_INTENTS = ["ask_price", "searching", "complaint", "promo_interest"]
+STT_TEMPLATES = {
+    "ask_price": "Magkano po yung {brand}?",
+    "searching": "Meron pa bang {brand}?",
+    "complaint": "Parang tumaas yung {brand} ah.",
+    "promo_interest": "May promo ba sa {brand} ngayon?"
+}
+# Sentiment range per intent, in STT_INTENTS order
+STT_SENTIMENT_RANGE = np.array([
+    [-0.2, 0.4],
+    [-0.2, 0.4],
+    [-0.7, -0.1],
+    [0.1, 0.6],
+])
+
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+# Positions of the 32 hex digits within the 36-char "8-4-4-4-12" form
+_UUID_HEX_POS = np.r_[0:8, 9:13, 14:18, 19:23, 24:36]
+
+
+def _format_uuids(raw: np.ndarray) -> np.ndarray:
+    """
+    Render an (n, 16) uint8 array as "8-4-4-4-12" UUID text with array ops
+    rather than one uuid.UUID per row.
+    """
+    n = len(raw)
+    digits = np.stack([_HEX_DIGITS[raw >> 4], _HEX_DIGITS[raw & 0x0F]], axis=2).reshape(n, 32)
+    chars = np.full((n, 36), ord("-"), dtype=np.uint8)
+    chars[:, _UUID_HEX_POS] = digits
+    return chars.view("S36").ravel().astype("U36")
+
+
+def uuid4_strings(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    n random (version 4) UUID strings drawn from rng, so ids are
+    reproducible under a fixed seed.
+    """
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    return _format_uuids(raw)
+
+
+def render_ids(table: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace a packed int64 `id` column with UUID text for export.
+
+    The UUID's high half is a per-table namespace (version 8, custom) and
+    its low half the packed id plus the variant bits, so ids stay unique
+    per table and render identically on every run.
+    """
+    if "id" not in df.columns or not pd.api.types.is_integer_dtype(df["id"]):
+        return df
+    ids = df["id"].to_numpy(dtype=np.int64)
+    namespace = np.frombuffer(hashlib.blake2b(table.encode(), digest_size=8).digest(), dtype=np.uint8).copy()
+    namespace[6] = (namespace[6] & 0x0F) | 0x80
+    raw = np.empty((len(ids), 16), dtype=np.uint8)
+    raw[:, :8] = namespace
+    raw[:, 8:] = ids.astype(">u8").view(np.uint8).reshape(-1, 8)
+    raw[:, 8] |= 0x80
+    return df.assign(id=_format_uuids(raw)).astype({"id": "str"})
+
+
 def generate_stt_events(
     shelf_vision_df: pd.DataFrame,
     max_events_per_day: int = 5,
+    rng: Optional[np.random.Generator] = None,
 ):
     """
     Generate synthetic STT events per store/brand/day based on facings.
@@ -392,9 +497,15 @@ def generate_stt_events(
     Heuristic:
       - More facings -> higher chance of mentions.
       - Generate Filipino/Taglish templates as raw_text.
+
+    All events are drawn at once from `rng` (seeded from RANDOM_SEED when
+    omitted), so the output is reproducible.
     """
-    sv = shelf_vision_df.copy()
-    sv["date"] = sv["event_timestamp"].dt.date
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
+
+    sv = shelf_vision_df[["store_id", "event_timestamp", "brand_id", "facings"]].copy()
+    sv["date"] = pd.to_datetime(sv["event_timestamp"]).dt.normalize()
 
     # Aggregate to daily brand shelf presence
     daily = (
@@ -403,121 +514,110 @@ def generate_stt_events(
         .reset_index()
     )
 
-    stt_rows = []
-    intents = ["ask_price", "searching", "complaint", "promo_interest"]
-    templates = {
-        "ask_price": "Magkano po yung {brand}?",
-        "searching": "Meron pa bang {brand}?",
-        "complaint": "Parang tumaas yung {brand} ah.",
-        "promo_interest": "May promo ba sa {brand} ngayon?"
-    }
-
-    for _, row in daily.iterrows():
-        store_id = row["store_id"]
-        brand_id = row["brand_id"]
-        date = row["date"]
-        facings = row["facings"]
-
-        # Expected mentions ~ facings / scale
-        lam = max(0.5, facings / 6.0)
-        n_events = np.random.poisson(lam)
-        n_events = min(n_events, max_events_per_day)
-
-        for _ in range(n_events):
-            intent = random.choice(intents)
-            # placeholder, resolved later if you want brand_name
-            brand_placeholder = f"Brand {brand_id}"
-            raw_text = templates[intent].format(brand=brand_placeholder)
-
-            # Sentiment heuristic
-            if intent == "complaint":
-                sentiment = np.random.uniform(-0.7, -0.1)
-            elif intent == "promo_interest":
-                sentiment = np.random.uniform(0.1, 0.6)
-            else:
-                sentiment = np.random.uniform(-0.2, 0.4)
-
-            ts = datetime.combine(date, datetime.min.time()) + timedelta(
-                hours=np.random.randint(8, 20),
-                minutes=np.random.randint(0, 60)
-            )
-
-            stt_rows.append({
-                "id": str(uuid.uuid4()),
-                "store_id": store_id,
-                "event_timestamp": ts,
-                "brand_id": brand_id,
-                "raw_text": raw_text,
-                "intent_label": intent,
-                "sentiment_score": sentiment,
-            })
-
-    if not stt_rows:
-        # Ensure header exists even if no events generated
-        stt_df = pd.DataFrame(columns=[
-            "id", "store_id", "event_timestamp", "brand_id",
-            "raw_text", "intent_label", "sentiment_score"
-        ])
-    else:
-        stt_df = pd.DataFrame(stt_rows)
-    
+    # Expected mentions ~ facings / scale, capped per store/brand/day
+    lam = np.maximum(0.5, daily["facings"].to_numpy(dtype=float) / 6.0)
+    counts = np.minimum(rng.poisson(lam), max_events_per_day)
+    src = np.repeat(np.arange(len(daily)), counts)
+    n = len(src)
+    seq = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    intent_code = rng.integers(0, len(STT_INTENTS), size=n)
+    low, high = STT_SENTIMENT_RANGE[intent_code].T
+    sentiment = rng.uniform(low, high)
+    offset = (
+        rng.integers(8, 20, size=n).astype("timedelta64[h]")
+        + rng.integers(0, 60, size=n).astype("timedelta64[m]")
+    )
+
+    store_id = daily["store_id"].to_numpy()[src]
+    brand_id = daily["brand_id"].to_numpy()[src]
+    intent = np.array(STT_INTENTS, dtype=object)[intent_code]
+
+    # Render each (intent, brand) text once, then gather per event;
+    # brand placeholder, resolved later if you want brand_name
+    brands, brand_pos = np.unique(brand_id, return_inverse=True)
+    texts = np.array([
+        [STT_TEMPLATES[i].format(brand=f"Brand {b}") for b in brands]
+        for i in STT_INTENTS
+    ], dtype=object).reshape(len(STT_INTENTS), len(brands))
+    raw_text = texts[intent_code, brand_pos]
+
+    date = daily["date"].to_numpy()[src]
+
+    stt_df = pd.DataFrame({
+        "id": pack_event_ids(store_id, date, brand_id, seq),
+        "store_id": store_id,
+        "event_timestamp": date + offset,
+        "brand_id": brand_id,
+        "raw_text": raw_text,
+        "intent_label": intent,
+        "sentiment_score": sentiment,
+    }).astype({"raw_text": "str", "intent_label": "str"})
     return stt_df
 
 
 def generate_weather_and_traffic(
     stores_df: pd.DataFrame,
     transactions_df: pd.DataFrame,
+    rng: Optional[np.random.Generator] = None,
+    correlated: bool = False,
 ):
     """
     Generate synthetic daily weather and foot traffic per store
     over the observed transaction date range.
+
+    Draws cover the whole store x date grid at once from `rng` (seeded
+    from RANDOM_SEED when omitted). With correlated=True, stores in the
+    same city share one weather draw per day (stores without a city draw
+    their own); foot traffic noise stays per store.
     """
-    tx = transactions_df.copy()
-    tx["date"] = tx["tx_timestamp"].dt.date
-
-    date_range = pd.date_range(tx["date"].min(), tx["date"].max(), freq="D")
-    records_weather = []
-    records_traffic = []
-
-    for _, store in stores_df.iterrows():
-        store_id = store["store_id"]
-
-        for d in date_range:
-            # Weather
-            temp_c = np.random.normal(30, 1.5)
-            is_rainy = np.random.rand() < 0.3
-            rainfall_mm = np.random.exponential(8) if is_rainy else 0.0
-            condition = "Rainy" if is_rainy else "Cloudy"
-
-            records_weather.append({
-                "id": str(uuid.uuid4()),
-                "store_id": store_id,
-                "date": d.date(),
-                "temp_c": round(temp_c, 1),
-                "rainfall_mm": round(rainfall_mm, 1),
-                "condition": condition,
-            })
-
-            # Foot traffic index
-            dow = d.weekday()  # 0=Mon
-            base = 100.0
-            if dow >= 5:  # weekend
-                base *= 1.2
-            if is_rainy:
-                base *= 0.85
-
-            noise = np.random.normal(0, 10)
-            traffic_index = max(20.0, base + noise)
-
-            records_traffic.append({
-                "id": str(uuid.uuid4()),
-                "store_id": store_id,
-                "date": d.date(),
-                "traffic_index": round(traffic_index, 1),
-            })
-
-    weather_df = pd.DataFrame(records_weather)
-    traffic_df = pd.DataFrame(records_traffic)
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
+
+    tx_dates = pd.to_datetime(transactions_df["tx_timestamp"]).dt.normalize()
+    date_range = pd.date_range(tx_dates.min(), tx_dates.max(), freq="D")
+    store_ids = stores_df["store_id"].to_numpy()
+    n_stores, n_days = len(store_ids), len(date_range)
+
+    # Weather is drawn per unit (store, or city when correlated) and day,
+    # then broadcast to stores through unit_of_store.
+    if correlated:
+        unit_of_store, units = pd.factorize(stores_df["city"])
+        # Stores without a city (-1) get a unit each instead of wrapping
+        # around to the last city's draws
+        no_city = unit_of_store < 0
+        unit_of_store[no_city] = len(units) + np.arange(no_city.sum())
+        n_units = len(units) + int(no_city.sum())
+    else:
+        unit_of_store, n_units = np.arange(n_stores), n_stores
+    temp_c = rng.normal(30, 1.5, size=(n_units, n_days))[unit_of_store]
+    is_rainy = (rng.random((n_units, n_days)) < 0.3)[unit_of_store]
+    rainfall_mm = np.where(is_rainy, rng.exponential(8, size=(n_units, n_days))[unit_of_store], 0.0)
+
+    # Foot traffic index: weekend and rain multipliers on a base of 100
+    weekend = (date_range.dayofweek >= 5)[np.newaxis, :]
+    base = 100.0 * np.where(weekend, 1.2, 1.0) * np.where(is_rainy, 0.85, 1.0)
+    traffic_index = np.maximum(20.0, base + rng.normal(0, 10, size=(n_stores, n_days)))
+
+    # Grid cells in store-major order: every date of store 1, then store 2...
+    store_col = np.repeat(store_ids, n_days)
+    date_col = np.tile(date_range.date, n_stores)
+    ids = pack_event_ids(store_col, np.tile(date_range.to_numpy(), n_stores))
+
+    weather_df = pd.DataFrame({
+        "id": ids,
+        "store_id": store_col,
+        "date": date_col,
+        "temp_c": np.round(temp_c.ravel(), 1),
+        "rainfall_mm": np.round(rainfall_mm.ravel(), 1),
+        "condition": np.where(is_rainy.ravel(), "Rainy", "Cloudy"),
+    }).astype({"condition": "str"})
+    traffic_df = pd.DataFrame({
+        "id": ids,
+        "store_id": store_col,
+        "date": date_col,
+        "traffic_index": np.round(traffic_index.ravel(), 1),
+    })
 
     return weather_df, traffic_df
 
@@ -528,203 +628,314 @@ def generate_weather_and_traffic(
 
 def export_csv(name: str, df: pd.DataFrame) -> Path:
     path = OUT_DIR / f"{name}.csv"
-    df.to_csv(path, index=False)
+    render_ids(name, df).to_csv(path, index=False)
     print(f"[OK] wrote {path}")
     return path
 
 
-def export_sql_insert(
+def sql_insert_statements(
     table_name: str,
     df: pd.DataFrame,
-    sql_file: Path,
     batch_size: int = 1000,
-):
+) -> str:
     """
     Very simple Postgres INSERT generator for seeding.
 
-    NOTE: For large data, you'd prefer COPY FROM STDIN; this is enough
-    for a small eval dataset.
+    NOTE: This is the offline artifact (--format sql); to load a database
+    directly use --format copy, which streams COPY FROM STDIN instead.
     """
     cols = list(df.columns)
     col_list = ", ".join(cols)
 
+    out = []
+    for i in range(0, len(df), batch_size):
+        chunk = df.iloc[i:i+batch_size]
+        values_sql = []
+        for _, row in chunk.iterrows():
+            vals = []
+            for c in cols:
+                v = row[c]
+                if pd.isna(v):
+                    vals.append("NULL")
+                elif isinstance(v, (int, float)):
+                    vals.append(str(v))
+                elif isinstance(v, (datetime, pd.Timestamp)):
+                    vals.append(f"'{v.isoformat()}'")
+                else:
+                    # escape single quotes
+                    s = str(v).replace("'", "''")
+                    vals.append(f"'{s}'")
+            values_sql.append(f"({', '.join(vals)})")
+        if not values_sql:
+            continue
+        out.append(f"INSERT INTO {table_name} ({col_list}) VALUES\n")
+        out.append(",\n".join(values_sql))
+        out.append(";\n\n")
+    return "".join(out)
+
+
+def export_sql_insert(
+    table_name: str,
+    df: pd.DataFrame,
+    sql_file: Path,
+    batch_size: int = 1000,
+):
     with sql_file.open("a", encoding="utf-8") as f:
-        for i in range(0, len(df), batch_size):
-            chunk = df.iloc[i:i+batch_size]
-            values_sql = []
-            for _, row in chunk.iterrows():
-                vals = []
-                for c in cols:
-                    v = row[c]
-                    if pd.isna(v):
-                        vals.append("NULL")
-                    elif isinstance(v, (int, float)):
-                        vals.append(str(v))
-                    elif isinstance(v, (datetime, pd.Timestamp)):
-                        vals.append(f"'{v.isoformat()}'")
-                    else:
-                        # escape single quotes
-                        s = str(v).replace("'", "''")
-                        vals.append(f"'{s}'")
-                values_sql.append(f"({', '.join(vals)})")
-            if not values_sql:
-                continue
-            f.write(f"INSERT INTO {table_name} ({col_list}) VALUES\n")
-            f.write(",\n".join(values_sql))
-            f.write(";\n\n")
+        f.write(sql_insert_statements(table_name, df, batch_size))
 
 
 # ---------------------------------------------------------------------------
-# 6. Main
+# 6. Pipeline stages
 # ---------------------------------------------------------------------------
+# Each stage is a module-level function of its input tables, so the
+# pipeline can run it in a worker process and cache it by input hash.
+# Stages that draw random numbers take an explicit seed, which keeps
+# their output independent of which process runs them.
 
-def main():
-    print("[*] Loading raw Kaggle-style data...")
-    dfs = load_raw_kaggle_data()
+def _stage_seed(stage_name: str) -> int:
+    """
+    Independent per-stage seed derived from RANDOM_SEED, so stages never
+    replay each other's random streams.
+    """
+    entropy = [RANDOM_SEED, zlib.crc32(stage_name.encode())]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
 
-    print("[*] Building dims: brands, products, stores...")
-    brands_df, products_df = build_dim_brands_products(dfs["products_raw"])
-    stores_df = build_dim_stores(dfs["stores_raw"])
 
-    print("[*] Building transactions + transaction_lines...")
-    transactions_df, transaction_lines_df = build_transactions_and_lines(
-        dfs["orders"],
-        dfs["order_products"],
+def _seed_global_rngs(seed: int) -> None:
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def stage_dims(raw):
+    brands_df, products_df = build_dim_brands_products(raw["products_raw"])
+    stores_df = build_dim_stores(raw["stores_raw"])
+    return brands_df, products_df, stores_df
+
+
+def stage_transactions(raw, products_df, stores_df, seed: int):
+    _seed_global_rngs(seed)
+    return build_transactions_and_lines(
+        raw["orders"],
+        raw["order_products"],
         products_df,
         stores_df,
         max_days=90,
     )
 
-    print("[*] Generating shelf_vision_events...")
-    shelf_vision_df = generate_shelf_vision(transaction_lines_df, transactions_df, stores_df)
 
-    print("[*] Generating stt_events...")
-    stt_df = generate_stt_events(shelf_vision_df)
+def stage_shelf_vision(transaction_lines_df, transactions_df, stores_df, seed: int):
+    return generate_shelf_vision(
+        transaction_lines_df, transactions_df, stores_df, rng=np.random.default_rng(seed),
+    )
+
+
+def stage_stt_events(shelf_vision_df, seed: int):
+    return generate_stt_events(shelf_vision_df, rng=np.random.default_rng(seed))
+
+
+def stage_weather_and_traffic(stores_df, transactions_df, seed: int, correlated: bool):
+    return generate_weather_and_traffic(
+        stores_df, transactions_df, rng=np.random.default_rng(seed), correlated=correlated,
+    )
+
 
-    print("[*] Generating weather_daily + foot_traffic_daily...")
-    weather_df, traffic_df = generate_weather_and_traffic(stores_df, transactions_df)
+def stage_export_csv(df, name: str) -> Path:
+    return export_csv(name, df)
 
-    # Export CSVs
-    print("[*] Exporting CSVs...")
-    export_csv("brands", brands_df)
-    export_csv("products", products_df)
-    export_csv("stores", stores_df)
-    export_csv("transactions", transactions_df)
-    export_csv("transaction_lines", transaction_lines_df)
-    export_csv("shelf_vision_events", shelf_vision_df)
-    export_csv("stt_events", stt_df)
-    export_csv("weather_daily", weather_df)
-    export_csv("foot_traffic_daily", traffic_df)
 
-    # Optional SQL export
+def stage_sql_inserts(df, table: str) -> str:
+    return sql_insert_statements(f"{SEED_SCHEMA}.{table}", render_ids(table, df))
+
+
+def stage_write_sql(*inserts: str) -> Path:
     sql_path = OUT_DIR / "seed_saricoach.sql"
-    if sql_path.exists():
-        sql_path.unlink()
     print(f"[*] Exporting Postgres INSERTs to {sql_path}...")
-
     with sql_path.open("w", encoding="utf-8") as f:
-        f.write("CREATE SCHEMA IF NOT EXISTS saricoach;\n\n")
-        
-        # Define tables
-        f.write("""
-        CREATE TABLE IF NOT EXISTS saricoach.brands (
-            brand_id INT PRIMARY KEY,
-            brand_name TEXT,
-            category TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.products (
-            product_id INT PRIMARY KEY,
-            sku TEXT,
-            barcode TEXT,
-            brand_id INT,
-            product_name TEXT,
-            category TEXT,
-            pack_size TEXT,
-            pack_type TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.stores (
-            product_name TEXT,
-            category TEXT,
-            pack_size TEXT,
-            pack_type TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.stores (
-            store_id INT PRIMARY KEY,
-            store_name TEXT,
-            region TEXT,
-            city TEXT,
-            barangay TEXT,
-            store_type TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.transactions (
-            transaction_id TEXT PRIMARY KEY,
-            store_id INT,
-            tx_timestamp TIMESTAMP,
-            total_amount FLOAT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.transaction_lines (
-            transaction_id TEXT,
-            line_no INT,
-            product_id INT,
-            brand_id INT,
-            quantity INT,
-            price_unit FLOAT,
-            subtotal FLOAT,
-            PRIMARY KEY (transaction_id, line_no)
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.shelf_vision_events (
-            id TEXT PRIMARY KEY,
-            store_id INT,
-            event_timestamp TIMESTAMP,
-            brand_id INT,
-            facings INT,
-            share_of_shelf FLOAT,
-            oos_flag BOOLEAN,
-            confidence FLOAT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.stt_events (
-            id TEXT PRIMARY KEY,
-            store_id INT,
-            event_timestamp TIMESTAMP,
-            brand_id INT,
-            raw_text TEXT,
-            intent_label TEXT,
-            sentiment_score FLOAT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.weather_daily (
-            id TEXT PRIMARY KEY,
-            store_id INT,
-            date DATE,
-            temp_c FLOAT,
-            rainfall_mm FLOAT,
-            condition TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS saricoach.foot_traffic_daily (
-            id TEXT PRIMARY KEY,
-            store_id INT,
-            date DATE,
-            traffic_index FLOAT
-        );
-        \n""")
-
-    export_sql_insert("saricoach.brands", brands_df, sql_path)
-    export_sql_insert("saricoach.products", products_df, sql_path)
-    export_sql_insert("saricoach.stores", stores_df, sql_path)
-    export_sql_insert("saricoach.transactions", transactions_df, sql_path)
-    export_sql_insert("saricoach.transaction_lines", transaction_lines_df, sql_path)
-    export_sql_insert("saricoach.shelf_vision_events", shelf_vision_df, sql_path)
-    export_sql_insert("saricoach.stt_events", stt_df, sql_path)
-    export_sql_insert("saricoach.weather_daily", weather_df, sql_path)
-    export_sql_insert("saricoach.foot_traffic_daily", traffic_df, sql_path)
+        f.write(seed_ddl())
+        f.write("\n")
+        for sql in inserts:
+            f.write(sql)
+    return sql_path
+
+
+def stage_copy(*dfs: pd.DataFrame, db_url: str, workers: int) -> None:
+    tables = {table: render_ids(table, df) for table, df in zip(SEED_TABLES, dfs)}
+    print(f"[*] Loading {len(tables)} tables with COPY ({workers} workers)...")
+    for stats in copy_tables(tables, db_url, workers=workers):
+        print(f"[OK] {SEED_SCHEMA}.{stats.table}: {stats.rows} rows in "
+              f"{stats.seconds:.2f}s ({stats.rows_per_s:,.0f} rows/s)")
+
+
+def stage_write_parts(df, transactions_df=None, *, out_dir: Path, table: str, fmt: str, stores_per_part: int):
+    """
+    Write one table as part files of `stores_per_part` stores each.
+    Transaction lines are split by their transaction's store, over the
+    transactions' stores, so lines part i pairs with transactions part i
+    even when a store has no lines.
+    """
+    store_ids = stores = None
+    if transactions_df is not None:
+        store_ids = df["transaction_id"].map(transactions_df.set_index("transaction_id")["store_id"])
+        stores = np.unique(transactions_df["store_id"].to_numpy())
+    clear_parts(out_dir, table)
+    df = render_ids(table, df)
+    if store_ids is None:
+        chunks = [(chunk, None) for chunk in split_by_store(df, stores_per_part)]
+    else:
+        keyed = df.assign(_store_id=store_ids.to_numpy())
+        chunks = [
+            (chunk[df.columns], chunk["_store_id"])
+            for chunk in split_by_store(keyed, stores_per_part, keyed["_store_id"], stores)
+        ]
+    parts = [
+        write_part(out_dir, table, i, chunk, fmt, store_ids=chunk_stores)
+        for i, (chunk, chunk_stores) in enumerate(chunks)
+    ]
+    # The Paths let a cache hit check the files are still there
+    return {"columns": list(df.columns), "parts": parts, "files": [out_dir / p["file"] for p in parts]}
+
+
+def stage_parts_manifest(*written, out_dir: Path, fmt: str) -> Path:
+    writer = PartWriter(out_dir, fmt)
+    for table, info in zip(SEED_TABLES, written):
+        for entry in info["parts"]:
+            writer.add(table, entry, info["columns"])
+    print(f"[*] Wrote {sum(writer.rows.values())} rows as part files under {out_dir}")
+    return writer.write_manifest()
+
+
+def build_seed_pipeline(args, cache_dir: Optional[Path] = None) -> Pipeline:
+    """
+    load -> dims -> transactions -> shelf vision -> STT, with weather and
+    traffic beside shelf vision, and one export stage per table output.
+    """
+    stages = [
+        # Always re-read; its output hash decides what downstream reruns
+        Stage("load_raw", load_raw_kaggle_data, outputs=("raw",), cache=False),
+        Stage("dims", stage_dims, inputs=("raw",), outputs=("brands", "products", "stores")),
+        Stage(
+            "transactions", stage_transactions,
+            inputs=("raw", "products", "stores"),
+            outputs=("transactions", "transaction_lines"),
+            params={"seed": _stage_seed("transactions")},
+        ),
+        Stage(
+            "shelf_vision", stage_shelf_vision,
+            inputs=("transaction_lines", "transactions", "stores"),
+            outputs=("shelf_vision_events",),
+            params={"seed": _stage_seed("shelf_vision")},
+        ),
+        Stage(
+            "stt_events", stage_stt_events,
+            inputs=("shelf_vision_events",),
+            outputs=("stt_events",),
+            params={"seed": _stage_seed("stt_events")},
+        ),
+        Stage(
+            "weather_and_traffic", stage_weather_and_traffic,
+            inputs=("stores", "transactions"),
+            outputs=("weather_daily", "foot_traffic_daily"),
+            params={"seed": _stage_seed("weather_and_traffic"), "correlated": args.correlated_weather},
+        ),
+    ]
+    for table in SEED_TABLES:
+        stages.append(Stage(
+            f"csv_{table}", stage_export_csv,
+            inputs=(table,), outputs=(f"{table}_csv",), params={"name": table},
+        ))
+
+    if args.parts_dir is not None:
+        for table in SEED_TABLES:
+            stages.append(Stage(
+                f"parts_{table}", stage_write_parts,
+                inputs=(table, "transactions") if table == "transaction_lines" else (table,),
+                outputs=(f"{table}_parts",),
+                params={
+                    "out_dir": args.parts_dir, "table": table,
+                    "fmt": args.parts_format, "stores_per_part": args.stores_per_part,
+                },
+            ))
+        stages.append(Stage(
+            "parts_manifest", stage_parts_manifest,
+            inputs=tuple(f"{table}_parts" for table in SEED_TABLES), outputs=("parts_manifest",),
+            params={"out_dir": args.parts_dir, "fmt": args.parts_format},
+        ))
+
+    if args.format == "copy":
+        db_url = args.db_url or os.getenv("DATABASE_URL")
+        if not db_url:
+            raise SystemExit("--format copy needs --db-url or DATABASE_URL")
+        stages.append(Stage(
+            "copy", stage_copy, inputs=tuple(SEED_TABLES),
+            params={"db_url": db_url, "workers": args.workers}, cache=False,
+        ))
+    else:
+        for table in SEED_TABLES:
+            stages.append(Stage(
+                f"sql_{table}", stage_sql_inserts,
+                inputs=(table,), outputs=(f"{table}_sql",), params={"table": table},
+            ))
+        stages.append(Stage(
+            "sql", stage_write_sql,
+            inputs=tuple(f"{table}_sql" for table in SEED_TABLES), outputs=("seed_sql",),
+        ))
+
+    return Pipeline(stages, cache_dir=cache_dir, workers=args.jobs, progress=lambda msg: print(f"[*] {msg}"))
+
+
+# ---------------------------------------------------------------------------
+# 7. Main
+# ---------------------------------------------------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--format",
+        choices=("sql", "copy"),
+        default="sql",
+        help="sql: write INSERTs to data/processed/seed_saricoach.sql (offline artifact); "
+             "copy: stream tables into Postgres with COPY FROM STDIN",
+    )
+    parser.add_argument("--db-url", default=None, help="Postgres URL for --format copy (default: $DATABASE_URL)")
+    parser.add_argument("--workers", type=int, default=4, help="tables copied in parallel per stage")
+    parser.add_argument(
+        "--correlated-weather",
+        action="store_true",
+        help="stores in the same city share daily weather draws",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes for independent pipeline stages (default: CPU count)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=OUT_DIR / ".seed_cache",
+        help="stage output cache; stages whose code and inputs are unchanged are skipped",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    parser.add_argument(
+        "--parts-dir",
+        type=Path,
+        default=None,
+        help="also write every table as compressed part files plus manifest.json under this directory",
+    )
+    parser.add_argument("--parts-format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--stores-per-part", type=int, default=50, help="stores per fact-table part file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    pipeline = build_seed_pipeline(args, cache_dir=None if args.no_cache else args.cache_dir)
+    started = time.perf_counter()
+    pipeline.run()
+    ran = [name for name, secs in pipeline.timings.items() if secs is not None]
+    print(f"[*] {len(ran)}/{len(pipeline.timings)} stages ran, "
+          f"the rest were cached ({time.perf_counter() - started:.1f}s)")
 
     print("[✓] SariCoach seed data generation complete.")
 
@@ -1,8 +1,73 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, Optional, Sequence
 from ..models import StoreSummary
 
 class DataBackend(ABC):
     @abstractmethod
     def fetch_store_summary(self, store_id: int) -> Optional[StoreSummary]:
         pass
+
+    def fetch_store_summaries(self, store_ids: Sequence[int]) -> Dict[int, StoreSummary]:
+        """
+        Summaries for many stores, keyed by store_id; missing stores are
+        left out. Backends that can batch should override this.
+        """
+        out: Dict[int, StoreSummary] = {}
+        for store_id in store_ids:
+            summary = self.fetch_store_summary(store_id)
+            if summary is not None:
+                out[store_id] = summary
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Backend-specific runtime stats (e.g. connection pool usage).
+        """
+        return {}
+
+    def close(self) -> None:
+        pass
+
+class AsyncDataBackend(ABC):
+    """
+    DataBackend for async handlers: the same calls, awaited.
+    """
+
+    @abstractmethod
+    async def fetch_store_summary(self, store_id: int) -> Optional[StoreSummary]:
+        pass
+
+    async def fetch_store_summaries(self, store_ids: Sequence[int]) -> Dict[int, StoreSummary]:
+        out: Dict[int, StoreSummary] = {}
+        for store_id in store_ids:
+            summary = await self.fetch_store_summary(store_id)
+            if summary is not None:
+                out[store_id] = summary
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def close(self) -> None:
+        pass
+
+class ThreadedBackend(AsyncDataBackend):
+    """
+    Async facade over a sync DataBackend; each call runs in a worker thread.
+    """
+
+    def __init__(self, backend: DataBackend):
+        self.backend = backend
+
+    async def fetch_store_summary(self, store_id: int) -> Optional[StoreSummary]:
+        return await asyncio.to_thread(self.backend.fetch_store_summary, store_id)
+
+    async def fetch_store_summaries(self, store_ids: Sequence[int]) -> Dict[int, StoreSummary]:
+        return await asyncio.to_thread(self.backend.fetch_store_summaries, store_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+    async def close(self) -> None:
+        self.backend.close()
@@ -1,140 +1,252 @@
-import psycopg
-from typing import Optional
-from .base import DataBackend
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+from .base import AsyncDataBackend, DataBackend
 from ..models import StoreSummary, Kpi
 
+# Everything a store summary needs, for any number of stores, in one round
+# trip: the latest two daily_metrics rows, that day's hourly traffic and
+# insights. Missing pieces come back as NULLs via the LEFT JOINs.
+STORE_SUMMARY_SQL = """
+SELECT
+    s.id, s.name,
+    cur.date, cur.volume, cur.revenue, cur.avg_basket_size, cur.avg_duration_seconds,
+    prev.volume, prev.revenue, prev.avg_basket_size, prev.avg_duration_seconds,
+    chart.hours, chart.volumes,
+    ins.found, ins.insights, ins.coach_message
+FROM stores s
+LEFT JOIN LATERAL (
+    SELECT date, volume, revenue, avg_basket_size, avg_duration_seconds
+    FROM daily_metrics
+    WHERE store_id = s.id
+    ORDER BY date DESC
+    LIMIT 1
+) cur ON true
+LEFT JOIN LATERAL (
+    SELECT volume, revenue, avg_basket_size, avg_duration_seconds
+    FROM daily_metrics
+    WHERE store_id = s.id
+    ORDER BY date DESC
+    OFFSET 1 LIMIT 1
+) prev ON true
+LEFT JOIN LATERAL (
+    SELECT
+        array_agg(hour_of_day ORDER BY hour_of_day) AS hours,
+        array_agg(volume ORDER BY hour_of_day) AS volumes
+    FROM hourly_traffic
+    WHERE store_id = s.id AND date = cur.date
+) chart ON true
+LEFT JOIN LATERAL (
+    SELECT true AS found, insights, coach_message
+    FROM daily_insights
+    WHERE store_id = s.id AND date = cur.date
+    LIMIT 1
+) ins ON true
+WHERE s.id = ANY(%s)
+"""
+
+def _calc_delta(curr, prev) -> float:
+    if not prev or prev == 0: return 0.0
+    return ((float(curr) - float(prev)) / float(prev)) * 100.0
+
+def summary_from_row(row: Sequence[Any]) -> StoreSummary:
+    """
+    Build a StoreSummary from one STORE_SUMMARY_SQL row.
+    """
+    (
+        store_id, store_name,
+        latest_date, curr_vol, curr_rev, curr_basket, curr_dur,
+        prev_vol, prev_rev, prev_basket, prev_dur,
+        hours, volumes,
+        insight_found, insights, coach_message,
+    ) = row
+
+    if latest_date is None:
+        # Fallback empty state if no data exists yet
+        return StoreSummary(
+            store_id=store_id,
+            store_name=store_name,
+            period="No Data",
+            kpis=[],
+            chart=[],
+            insights=[],
+            coach_message="No data recorded yet."
+        )
+
+    # Deltas vs the previous day; 0 when there is none
+    d_vol = _calc_delta(curr_vol, prev_vol)
+    d_rev = _calc_delta(curr_rev, prev_rev)
+    d_basket = _calc_delta(curr_basket, prev_basket)
+    d_dur = _calc_delta(curr_dur, prev_dur)
+
+    chart_data = [
+        {"date": f"{hour:02d}:00", "volume": volume}
+        for hour, volume in zip(hours or [], volumes or [])
+    ]
+
+    insights_list = insights if insight_found else []
+    coach_msg = coach_message if insight_found else "Analysis pending..."
+
+    period_label = latest_date.strftime("%Y-%m-%d")
+
+    return StoreSummary(
+        store_id=store_id,
+        store_name=store_name,
+        period=f"Latest ({period_label})",
+        kpis=[
+            Kpi(label="Daily Volume", value=curr_vol, delta_pct=round(d_vol, 1), trend="up" if d_vol >= 0 else "down"),
+            Kpi(label="Daily Revenue", value=f"₱{curr_rev:,.0f}", delta_pct=round(d_rev, 1), trend="up" if d_rev >= 0 else "down"),
+            Kpi(label="Avg Basket", value=float(curr_basket), delta_pct=round(d_basket, 1), trend="up" if d_basket >= 0 else "down"),
+            Kpi(label="Avg Duration", value=f"{curr_dur}s", delta_pct=round(d_dur, 1), trend="up" if d_dur >= 0 else "down"),
+        ],
+        chart=chart_data,
+        insights=insights_list,
+        coach_message=coach_msg
+    )
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    raw = pool.get_stats()
+    is_open = not pool.closed
+    requests = raw.get("requests_num", 0)
+    wait_ms = raw.get("requests_wait_ms", 0)
+    return {
+        "open": is_open,
+        "min_size": raw["pool_min"],
+        "max_size": raw["pool_max"],
+        "size": raw["pool_size"] if is_open else 0,
+        "available": raw["pool_available"],
+        "in_use": raw["pool_size"] - raw["pool_available"] if is_open else 0,
+        "waiting": raw["requests_waiting"],
+        "requests": requests,
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": wait_ms / requests if requests else 0.0,
+        "errors": raw.get("requests_errors", 0) + raw.get("connections_errors", 0),
+    }
+
+def _unique_ids(store_ids: Sequence[int]) -> List[int]:
+    return list(dict.fromkeys(int(i) for i in store_ids))
+
+def _summaries_by_id(ids: List[int], rows) -> Dict[int, StoreSummary]:
+    by_id = {row[0]: summary_from_row(row) for row in rows}
+    return {i: by_id[i] for i in ids if i in by_id}
+
 class SupabaseBackend(DataBackend):
-    def __init__(self, db_url: str):
+    """
+    Postgres-backed store summaries over an app-lifetime connection pool.
+    The pool opens on first use and health-checks connections on checkout.
+
+    prepare_threshold defaults to None (never prepare): the Supabase
+    transaction pooler (port 6543) does not keep a client's prepared
+    statements, so psycopg's auto-prepare of the repeated summary query
+    would fail with "prepared statement ... does not exist". Set it only
+    for direct or session-mode connections.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle: float = 300.0,
+        timeout: float = 10.0,
+        prepare_threshold: Optional[int] = None,
+    ):
         self.db_url = db_url
+        self.pool = ConnectionPool(
+            db_url,
+            min_size=min_size,
+            max_size=max_size,
+            max_idle=max_idle,
+            timeout=timeout,
+            check=ConnectionPool.check_connection,
+            kwargs={"prepare_threshold": prepare_threshold},
+            name="saricoach",
+            open=False,
+        )
+        self._open_lock = threading.Lock()
+
+    def connection(self):
+        if self.pool.closed:
+            with self._open_lock:
+                if self.pool.closed:
+                    self.pool.open()
+        return self.pool.connection()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return _pool_stats(self.pool)
 
     def fetch_store_summary(self, store_id: int) -> Optional[StoreSummary]:
-        # Connect to Supabase
-        with psycopg.connect(self.db_url) as conn:
+        return self.fetch_store_summaries([store_id]).get(store_id)
+
+    def fetch_store_summaries(self, store_ids: Sequence[int]) -> Dict[int, StoreSummary]:
+        """
+        Summaries for many stores in a single query; stores that do not
+        exist are left out.
+        """
+        ids = _unique_ids(store_ids)
+        if not ids:
+            return {}
+        with self.connection() as conn:
             with conn.cursor() as cur:
-
-                # 1. Fetch Store Info
-                cur.execute("SELECT name FROM stores WHERE id = %s", (store_id,))
-                store_res = cur.fetchone()
-                if not store_res:
-                    return None
-                store_name = store_res[0]
-
-                # 2. Determine Latest Available Date (most recent data point)
-                cur.execute(
-                    """
-                    SELECT date
-                    FROM daily_metrics
-                    WHERE store_id = %s
-                    ORDER BY date DESC
-                    LIMIT 1
-                    """,
-                    (store_id,),
-                )
-                latest_date_res = cur.fetchone()
-
-                if not latest_date_res:
-                    # Fallback empty state if no data exists yet
-                    return StoreSummary(
-                        store_id=store_id,
-                        store_name=store_name,
-                        period="No Data",
-                        kpis=[],
-                        chart=[],
-                        insights=[],
-                        coach_message="No data recorded yet."
-                    )
-
-                latest_date = latest_date_res[0]
-
-                # 3. Fetch Daily Metrics for the Latest 2 Days (for Deltas)
-                cur.execute(
-                    """
-                    SELECT date, volume, revenue, avg_basket_size, avg_duration_seconds
-                    FROM daily_metrics
-                    WHERE store_id = %s
-                    ORDER BY date DESC
-                    LIMIT 2
-                    """,
-                    (store_id,),
-                )
+                cur.execute(STORE_SUMMARY_SQL, (ids,))
                 rows = cur.fetchall()
-
-                if not rows:
-                    return StoreSummary(
-                        store_id=store_id,
-                        store_name=store_name,
-                        period="No Data",
-                        kpis=[],
-                        chart=[],
-                        insights=[],
-                        coach_message="No data recorded yet."
-                    )
-
-                # Current Day (Latest)
-                curr = rows[0]
-                curr_vol, curr_rev, curr_basket, curr_dur = curr[1], curr[2], curr[3], curr[4]
-
-                # Previous Day (for Deltas)
-                if len(rows) > 1:
-                    prev = rows[1]
-                    prev_vol, prev_rev, prev_basket, prev_dur = prev[1], prev[2], prev[3], prev[4]
-                    
-                    def calc_delta(curr, prev):
-                        if not prev or prev == 0: return 0.0
-                        return ((float(curr) - float(prev)) / float(prev)) * 100.0
-
-                    d_vol = calc_delta(curr_vol, prev_vol)
-                    d_rev = calc_delta(curr_rev, prev_rev)
-                    d_basket = calc_delta(curr_basket, prev_basket)
-                    d_dur = calc_delta(curr_dur, prev_dur)
-                else:
-                    d_vol = d_rev = d_basket = d_dur = 0.0
-
-                # 4. Fetch Chart Data
-                cur.execute(
-                    """
-                    SELECT hour_of_day, volume
-                    FROM hourly_traffic
-                    WHERE store_id = %s AND date = %s
-                    ORDER BY hour_of_day ASC
-                    """,
-                    (store_id, latest_date),
-                )
-                chart_rows = cur.fetchall()
-
-                chart_data = [
-                    {"date": f"{row[0]:02d}:00", "volume": row[1]}
-                    for row in chart_rows
-                ]
-
-                # 5. Fetch Insights
-                cur.execute(
-                    """
-                    SELECT insights, coach_message
-                    FROM daily_insights
-                    WHERE store_id = %s AND date = %s
-                    """,
-                    (store_id, latest_date),
-                )
-                insight_res = cur.fetchone()
-
-                insights_list = insight_res[0] if insight_res else []
-                coach_msg = insight_res[1] if insight_res else "Analysis pending..."
-
-                period_label = latest_date.strftime("%Y-%m-%d")
-
-                # 6. Construct Response
-                return StoreSummary(
-                    store_id=store_id,
-                    store_name=store_name,
-                    period=f"Latest ({period_label})",
-                    kpis=[
-                        Kpi(label="Daily Volume", value=curr_vol, delta_pct=round(d_vol, 1), trend="up" if d_vol >= 0 else "down"),
-                        Kpi(label="Daily Revenue", value=f"₱{curr_rev:,.0f}", delta_pct=round(d_rev, 1), trend="up" if d_rev >= 0 else "down"),
-                        Kpi(label="Avg Basket", value=float(curr_basket), delta_pct=round(d_basket, 1), trend="up" if d_basket >= 0 else "down"),
-                        Kpi(label="Avg Duration", value=f"{curr_dur}s", delta_pct=round(d_dur, 1), trend="up" if d_dur >= 0 else "down"),
-                    ],
-                    chart=chart_data,
-                    insights=insights_list,
-                    coach_message=coach_msg
-                )
+        return _summaries_by_id(ids, rows)
+
+class AsyncSupabaseBackend(AsyncDataBackend):
+    """
+    SupabaseBackend on psycopg.AsyncConnection: same query, awaited, over
+    an AsyncConnectionPool opened on first use.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle: float = 300.0,
+        timeout: float = 10.0,
+        prepare_threshold: Optional[int] = None,
+    ):
+        self.db_url = db_url
+        self.pool = AsyncConnectionPool(
+            db_url,
+            min_size=min_size,
+            max_size=max_size,
+            max_idle=max_idle,
+            timeout=timeout,
+            check=AsyncConnectionPool.check_connection,
+            kwargs={"prepare_threshold": prepare_threshold},
+            name="saricoach-async",
+            open=False,
+        )
+        self._open_lock = asyncio.Lock()
+
+    async def connection(self):
+        if self.pool.closed:
+            async with self._open_lock:
+                if self.pool.closed:
+                    await self.pool.open()
+        return self.pool.connection()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return _pool_stats(self.pool)
+
+    async def fetch_store_summary(self, store_id: int) -> Optional[StoreSummary]:
+        return (await self.fetch_store_summaries([store_id])).get(store_id)
+
+    async def fetch_store_summaries(self, store_ids: Sequence[int]) -> Dict[int, StoreSummary]:
+        ids = _unique_ids(store_ids)
+        if not ids:
+            return {}
+        async with await self.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(STORE_SUMMARY_SQL, (ids,))
+                rows = await cur.fetchall()
+        return _summaries_by_id(ids, rows)
@@ -0,0 +1,143 @@
+"""
+In-process response cache for the store summary and coach routes.
+
+Entries hold the serialized JSON body and its ETag, keyed by
+(route, store_id, flow, filters, data_version). Because data_version is
+part of the key, a reload or ingest makes old entries unreachable; they
+then age out through the TTL and the LRU size bound. The store summary
+comes straight from the backend database, which data_version does not
+track, so its key carries no version and only the TTL refreshes it.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from .config import settings
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache bounded by total body size in MB, with a TTL per
+    entry and hit/miss/eviction counters.
+    """
+
+    def __init__(
+        self,
+        max_mb: float = 64.0,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResponse:
+        entry = CachedResponse(
+            body=body,
+            etag='"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Bodies larger than the whole budget are served but not kept
+            if entry.size > self.max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+response_cache = ResponseCache(
+    max_mb=settings.response_cache_mb,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+async def cached_json_response(
+    request: Request,
+    key: Hashable,
+    compute: Callable[[], Awaitable[BaseModel]],
+    cache: ResponseCache = response_cache,
+) -> Response:
+    """
+    Serve `key` from the cache, awaiting compute() and storing its JSON on
+    a miss. Answers 304 when the client's If-None-Match already has this
+    body.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        entry = cache.put(key, (await compute()).model_dump_json().encode("utf-8"))
+    return _respond(request, entry)
+
+def _respond(request: Request, entry: CachedResponse) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
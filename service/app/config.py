@@ -2,9 +2,22 @@ from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    data_backend: str = "csv"  # or "supabase"
+    data_backend: str = "csv"  # or "supabase", "parts"
     database_url: Optional[str] = None
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_max_idle_seconds: float = 300.0
+    db_pool_timeout_seconds: float = 10.0
+    db_prepare_threshold: Optional[int] = None  # None never prepares; required behind the 6543 transaction pooler
     google_api_key: Optional[str] = None
+    admin_token: Optional[str] = None  # X-Admin-Token for /api/admin/*; unset disables them
+    response_cache_mb: float = 64.0
+    response_cache_ttl_seconds: float = 300.0
+    analytics_workers: int = 4  # threads for pandas work off the event loop
+    reload_interval_seconds: float = 0.0  # 0 disables periodic reloads
+    parts_dir: Optional[str] = None  # part-file directory for data_backend="parts"
+    region: Optional[str] = None  # load only this region's stores (parts backend)
+    db_chunksize: int = 100_000  # rows per streamed chunk when loading from Postgres; 0 reads whole tables
     
     class Config:
         env_prefix = "SARICOACH_"
@@ -1,14 +1,22 @@
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from saricoach.data_context import DataContext
-from saricoach.backends.csv_backend import build_context_from_csv
+from saricoach.backends.parts import build_context_from_parts
+from saricoach.backends.snapshot import build_context_from_snapshot
 from saricoach.backends.supabase_backend import build_context_from_supabase
 from saricoach.agents.planner import PlannerAgent
 from saricoach.agents.data_analyst import DataAnalystAgent
 from saricoach.agents.coach import CoachAgent
+from .config import settings
+from .reloader import ContextReloader
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = BASE_DIR / "data" / "processed"
+SNAPSHOT_DIR = BASE_DIR / "data" / "snapshot"
 
 from typing import Optional
 
@@ -18,14 +26,72 @@ _ctx: Optional[DataContext] = None
 _planner: Optional[PlannerAgent] = None
 _analyst: Optional[DataAnalystAgent] = None
 _coach: Optional[CoachAgent] = None
+# Bumped whenever the data behind the agents changes; part of cache keys
+_data_version = 0
+
+def get_data_version() -> int:
+    return _data_version
+
+def bump_data_version() -> int:
+    global _data_version
+    _data_version += 1
+    return _data_version
+
+def _load_context() -> DataContext:
+    if _backend == "supabase":
+        # Fact tables stream through a server-side cursor, compacted per chunk
+        return build_context_from_supabase(chunksize=settings.db_chunksize or None)
+    if _backend == "parts":
+        # Only this worker's region is read from the partitioned tables
+        return build_context_from_parts(settings.parts_dir or DATA_DIR, region=settings.region)
+    # Arrow snapshot if fresh, otherwise the CSVs themselves
+    return build_context_from_snapshot(SNAPSHOT_DIR, data_dir=DATA_DIR)
+
+def _build_data() -> tuple[DataContext, DataAnalystAgent]:
+    """
+    Load a context and an analyst with its frames already built, so the
+    swap that follows is cheap.
+    """
+    ctx = _load_context()
+    analyst = DataAnalystAgent(ctx=ctx)
+    analyst.frames
+    return ctx, analyst
+
+def _swap_data(data: tuple[DataContext, DataAnalystAgent]) -> None:
+    global _ctx, _analyst
+    with _swap_lock:
+        # Swap before bumping: a request that sees the new version is
+        # guaranteed to also see the new analyst.
+        _ctx, _analyst = data
+        bump_data_version()
+
+_swap_lock = threading.Lock()
+reloader: ContextReloader[tuple[DataContext, DataAnalystAgent]] = ContextReloader(_build_data, _swap_data)
+
+# Bounded pool for CPU-heavy pandas work, so async handlers never run it
+# on the event loop and at most analytics_workers run at once.
+_analytics_executor = ThreadPoolExecutor(
+    max_workers=settings.analytics_workers,
+    thread_name_prefix="analytics",
+)
+
+async def run_analytics(fn, *args):
+    """
+    Await fn(*args) on the analytics executor.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_analytics_executor, fn, *args)
 
 def get_context() -> DataContext:
     global _ctx
     if _ctx is None:
-        if _backend == "supabase":
-            _ctx = build_context_from_supabase()
-        else:
-            _ctx = build_context_from_csv(DATA_DIR)
+        with _swap_lock:
+            if _ctx is None:
+                started = time.perf_counter()
+                _ctx = _load_context()
+                bump_data_version()
+                reloader.mark_loaded(time.perf_counter() - started)
+                if settings.reload_interval_seconds > 0:
+                    reloader.start_periodic(settings.reload_interval_seconds)
     return _ctx
 
 def get_agents() -> tuple[PlannerAgent, DataAnalystAgent, CoachAgent]:
@@ -41,3 +107,22 @@ def get_agents() -> tuple[PlannerAgent, DataAnalystAgent, CoachAgent]:
         _coach = CoachAgent(model_name="gemini" if use_gemini else "heuristic",
                             use_gemini=use_gemini)
     return _planner, _analyst, _coach
+
+def get_versioned_agents() -> tuple[int, PlannerAgent, DataAnalystAgent, CoachAgent]:
+    """
+    Data version plus agents, read in that order after the first load so
+    a response is never cached under a newer version than its data.
+    """
+    get_context()
+    version = get_data_version()
+    return (version, *get_agents())
+
+def ingest(**batches) -> int:
+    """
+    Append new rows to the analyst's frames and bump the data version.
+    The rows live only in this process: a reload replaces the analyst
+    with one built from the configured source.
+    """
+    _, analyst, _ = get_agents()
+    analyst.ingest(**batches)
+    return bump_data_version()
@@ -1,12 +1,79 @@
+import threading
+from typing import Optional
 from .config import settings
+from .backend.base import AsyncDataBackend, DataBackend, ThreadedBackend
 from .backend.csv_backend import CSVBackend
-from .backend.supabase_backend import SupabaseBackend
+from .backend.supabase_backend import AsyncSupabaseBackend, SupabaseBackend
 
-def get_backend():
+_backend: Optional[DataBackend] = None
+_backend_lock = threading.Lock()
+_async_backend: Optional[AsyncDataBackend] = None
+
+def _require_database_url() -> str:
+    if not settings.database_url:
+        raise ValueError("SARICOACH_DATA_BACKEND is 'supabase' but SARICOACH_DATABASE_URL is missing.")
+    return settings.database_url
+
+def _create_backend() -> DataBackend:
     if settings.data_backend == "supabase":
-        if not settings.database_url:
-            raise ValueError("SARICOACH_DATA_BACKEND is 'supabase' but SARICOACH_DATABASE_URL is missing.")
-        return SupabaseBackend(settings.database_url)
+        return SupabaseBackend(
+            _require_database_url(),
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            max_idle=settings.db_pool_max_idle_seconds,
+            timeout=settings.db_pool_timeout_seconds,
+            prepare_threshold=settings.db_prepare_threshold,
+        )
     
     # Default to CSV/Mock
     return CSVBackend(base_path="data/processed")
+
+def get_backend() -> DataBackend:
+    """
+    App-lifetime backend shared by all requests.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend()
+    return _backend
+
+def backend_stats() -> Optional[dict]:
+    return _backend.stats() if _backend is not None else None
+
+def close_backend() -> None:
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+
+def get_async_backend() -> AsyncDataBackend:
+    """
+    App-lifetime backend for async handlers. Created on the event loop
+    thread, so no lock is needed.
+    """
+    global _async_backend
+    if _async_backend is None:
+        if settings.data_backend == "supabase":
+            _async_backend = AsyncSupabaseBackend(
+                _require_database_url(),
+                min_size=settings.db_pool_min_size,
+                max_size=settings.db_pool_max_size,
+                max_idle=settings.db_pool_max_idle_seconds,
+                timeout=settings.db_pool_timeout_seconds,
+                prepare_threshold=settings.db_prepare_threshold,
+            )
+        else:
+            _async_backend = ThreadedBackend(CSVBackend(base_path="data/processed"))
+    return _async_backend
+
+def async_backend_stats() -> Optional[dict]:
+    return _async_backend.stats() if _async_backend is not None else None
+
+async def close_async_backend() -> None:
+    global _async_backend
+    if _async_backend is not None:
+        await _async_backend.close()
+        _async_backend = None
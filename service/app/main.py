@@ -1,8 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import store, coach
+from .routes import admin, coach as coach_routes
+from .cache import response_cache
+from .dependencies import get_data_version, reloader
+from .deps import async_backend_stats, backend_stats, close_async_backend, close_backend
 
-app = FastAPI(title="SariCoach API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled DB connections on shutdown
+    close_backend()
+    await close_async_backend()
+
+app = FastAPI(title="SariCoach API", lifespan=lifespan)
 
 # CRITICAL: Allow your Vercel frontend to talk to this backend
 origins = [
@@ -22,7 +34,20 @@ app.add_middleware(
 
 app.include_router(store.router, prefix="/api")
 app.include_router(coach.router, prefix="/api")
+# Agent-pipeline routes carry their full /api/... paths
+app.include_router(coach_routes.router)
+app.include_router(admin.router)
 
 @app.get("/api/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/api/metrics")
+def metrics():
+    return {
+        "data_version": get_data_version(),
+        "last_loaded_at": reloader.status()["last_loaded_at"],
+        "response_cache": response_cache.stats(),
+        "db_pool": backend_stats(),
+        "async_db_pool": async_backend_stats(),
+    }
@@ -15,3 +15,31 @@ class StoreSummary(BaseModel):
     chart: List[Dict[str, Any]]   # [{date, volume}, ...]
     insights: List[str]
     coach_message: str
+
+class CoachRequest(BaseModel):
+    type: str = "seven_day_plan"
+    store_id: int
+    brand_id: Optional[int] = None
+    category: Optional[str] = None
+    days: int = 30
+    persona: str = "store_owner"
+
+class CoachBatchRequest(BaseModel):
+    type: str = "seven_day_plan"
+    store_ids: List[int]
+    brand_id: Optional[int] = None
+    category: Optional[str] = None
+    days: int = 30
+    persona: str = "store_owner"
+
+class CoachResponse(BaseModel):
+    actions: List[str]
+    risks: List[str]
+    opportunities: List[str]
+    debug_notes: Dict[str, Any]
+
+class StoreSummaryResponse(BaseModel):
+    store_id: int
+    date: str
+    kpis: Dict[str, Any]
+    coach: CoachResponse
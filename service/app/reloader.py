@@ -0,0 +1,105 @@
+"""
+Background reload of the service's data.
+
+A ContextReloader runs `load` on a daemon thread and hands the result to
+`swap`, so request threads keep serving the current data while the new
+one is built. Triggers that arrive during a reload are coalesced into a
+single follow-up run.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class ContextReloader(Generic[T]):
+    def __init__(self, load: Callable[[], T], swap: Callable[[T], None]):
+        self._load = load
+        self._swap = swap
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pending = False
+        self._stop = threading.Event()
+        self.last_loaded_at: Optional[datetime] = None
+        self.last_duration_s: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+
+    @property
+    def loading(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def trigger(self) -> bool:
+        """
+        Start a reload in the background. Returns False when one is
+        already running; a follow-up reload is then queued instead.
+        """
+        with self._lock:
+            if self._thread is not None:
+                self._pending = True
+                return False
+            self._thread = threading.Thread(target=self._run, name="context-reloader", daemon=True)
+            self._thread.start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the current reload (if any) finishes. For scripts/tests.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def mark_loaded(self, duration_s: Optional[float] = None) -> None:
+        self.last_loaded_at = datetime.now(timezone.utc)
+        self.last_duration_s = duration_s
+
+    def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            try:
+                self._swap(self._load())
+            except Exception as e:
+                logger.exception("Context reload failed")
+                self.last_error = repr(e)
+            else:
+                self.mark_loaded(time.perf_counter() - started)
+                self.last_error = None
+                self.reloads += 1
+                logger.info("Context reloaded in %.2fs", self.last_duration_s)
+
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._pending = False
+
+    def start_periodic(self, interval_s: float) -> None:
+        """
+        Trigger a reload every interval_s seconds until stop() is called.
+        """
+        def loop():
+            while not self._stop.wait(interval_s):
+                self.trigger()
+
+        threading.Thread(target=loop, name="context-reloader-timer", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "loading": self.loading,
+            "last_loaded_at": self.last_loaded_at.isoformat() if self.last_loaded_at else None,
+            "last_duration_s": self.last_duration_s,
+            "last_error": self.last_error,
+            "reloads": self.reloads,
+        }
@@ -2,8 +2,8 @@ import os
 import google.generativeai as genai
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from ..deps import get_backend
-from ..backend.base import DataBackend
+from ..deps import get_async_backend
+from ..backend.base import AsyncDataBackend
 from ..config import settings
 
 router = APIRouter(tags=["coach"])
@@ -16,9 +16,9 @@ class CoachRequest(BaseModel):
 genai.configure(api_key=settings.google_api_key)
 
 @router.post("/coach/ask")
-def ask_coach(payload: CoachRequest, backend: DataBackend = Depends(get_backend)):
+async def ask_coach(payload: CoachRequest, backend: AsyncDataBackend = Depends(get_async_backend)):
     # 1. Fetch Real Data
-    summary = backend.fetch_store_summary(payload.store_id)
+    summary = await backend.fetch_store_summary(payload.store_id)
     if not summary:
         raise HTTPException(status_code=404, detail="Store data not available for context.")
 
@@ -48,7 +48,7 @@ def ask_coach(payload: CoachRequest, backend: DataBackend = Depends(get_backend)
         # using gemini-flash-latest as verified by list_models.py
         model = genai.GenerativeModel("gemini-flash-latest", system_instruction=system_instruction)
         
-        response = model.generate_content(payload.question)
+        response = await model.generate_content_async(payload.question)
         return {"answer": response.text}
 
     except Exception as e:
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from ..deps import get_backend
-from ..backend.base import DataBackend
+from fastapi import APIRouter, Depends, HTTPException, Request
+from ..cache import cached_json_response
+from ..deps import get_async_backend
+from ..backend.base import AsyncDataBackend
 from ..models import StoreSummary
 
 router = APIRouter(tags=["store"])
 
 @router.get("/store/{store_id}/summary", response_model=StoreSummary)
-def get_store_summary(store_id: int, backend: DataBackend = Depends(get_backend)):
-    summary = backend.fetch_store_summary(store_id)
-    if not summary:
-        raise HTTPException(status_code=404, detail="Store not found")
-    return summary
+async def get_store_summary(
+    store_id: int,
+    request: Request,
+    backend: AsyncDataBackend = Depends(get_async_backend),
+):
+    async def fetch() -> StoreSummary:
+        summary = await backend.fetch_store_summary(store_id)
+        if not summary:
+            # Raised before anything is stored, so misses are not cached
+            raise HTTPException(status_code=404, detail="Store not found")
+        return summary
+
+    # The summary is read from the backend (Postgres in production), which
+    # data_version does not track, so this entry is TTL-only: a reload or
+    # ingest does not invalidate it, and new rows show up once it expires.
+    key = ("store_summary", store_id, "backend_summary", None, None)
+    return await cached_json_response(request, key, fetch)
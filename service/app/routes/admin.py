@@ -0,0 +1,42 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from .. import dependencies
+from ..config import settings
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Admin routes need SARICOACH_ADMIN_TOKEN in the X-Admin-Token header.
+    With no token configured they are disabled.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (SARICOACH_ADMIN_TOKEN is not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+router = APIRouter(tags=["admin"], dependencies=[Depends(require_admin)])
+
+def _reload_status() -> dict:
+    return {
+        "data_version": dependencies.get_data_version(),
+        **dependencies.reloader.status(),
+    }
+
+@router.post("/api/admin/reload", status_code=202)
+def trigger_reload():
+    """
+    Rebuild the DataContext and analyst in the background. Requests keep
+    using the current data until the new one is swapped in.
+
+    The new data is read from the configured source only: rows folded in
+    through ingest() since the last load are dropped by the swap unless
+    the source has them by then.
+    """
+    started = dependencies.reloader.trigger()
+    return {"status": "started" if started else "queued", **_reload_status()}
+
+@router.get("/api/admin/reload")
+def reload_status():
+    return _reload_status()
@@ -1,13 +1,31 @@
-from fastapi import APIRouter, Depends
-from ..dependencies import get_agents
-from ..models import CoachRequest, CoachResponse
+from datetime import date
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from saricoach.analytics import compute_store_kpis
+from ..cache import cached_json_response
+from ..dependencies import get_agents, get_versioned_agents, run_analytics
+from ..models import CoachBatchRequest, CoachRequest, CoachResponse, StoreSummaryResponse
 
 router = APIRouter(tags=["coach"])
 
 @router.post("/api/coach/recommendations", response_model=CoachResponse)
-def coach_recommendations(req: CoachRequest):
-    planner, analyst, coach = get_agents()
+async def coach_recommendations(req: CoachRequest, request: Request):
+    version, planner, analyst, coach = await run_analytics(get_versioned_agents)
+    key = (
+        "coach_recommendations",
+        req.store_id,
+        req.type,
+        (req.brand_id, req.category, req.days, req.persona),
+        version,
+    )
+    return await cached_json_response(
+        request, key, lambda: run_analytics(_coach_recommendations, req, planner, analyst, coach)
+    )
 
+def _coach_recommendations(req: CoachRequest, planner, analyst, coach) -> CoachResponse:
     decision = planner.plan({
         "type": req.type,
         "store_id": req.store_id,
@@ -24,3 +42,43 @@ def coach_recommendations(req: CoachRequest):
         opportunities=coach_output.opportunities,
         debug_notes=coach_output.debug_notes,
     )
+
+@router.post("/api/coach/batch")
+async def coach_batch(req: CoachBatchRequest):
+    """
+    Coach many stores with shared filters. Analytics for all stores are
+    computed in one pass; each store is then streamed back as one NDJSON
+    line (a StoreSummaryResponse) as soon as its coaching is rendered.
+    """
+    planner, analyst, coach = await run_analytics(get_agents)
+
+    decision = planner.plan({
+        "type": req.type,
+        "store_id": req.store_ids[0] if req.store_ids else 0,
+        "brand_id": req.brand_id,
+        "category": req.category,
+        "days": req.days,
+    })
+    results = await run_analytics(analyst.analyze_stores, decision, req.store_ids)
+    today = str(date.today())
+
+    def render(store_id, analytics) -> str:
+        coach_output = coach.coach(analytics, persona=req.persona)
+        summary = StoreSummaryResponse(
+            store_id=store_id,
+            date=today,
+            kpis=compute_store_kpis(analytics, store_id),
+            coach=CoachResponse(
+                actions=coach_output.actions,
+                risks=coach_output.risks,
+                opportunities=coach_output.opportunities,
+                debug_notes=coach_output.debug_notes,
+            ),
+        )
+        return summary.model_dump_json() + "\n"
+
+    async def lines() -> AsyncIterator[str]:
+        for store_id, analytics in results.items():
+            yield await run_analytics(render, store_id, analytics)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,136 @@
+import importlib.util
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+TABLE_NAMES = {
+    "brands": "brands",
+    "products": "products",
+    "stores": "stores",
+    "transactions": "transactions",
+    "transaction_lines": "transaction_lines",
+    "shelf_vision": "shelf_vision_events",
+    "stt_events": "stt_events",
+    "weather": "weather_daily",
+    "foot_traffic": "foot_traffic_daily",
+}
+
+
+def make_tables(seed=7, stores=3, brands=4, days=6, n=600):
+    """Small random canonical tables, consistent across stores, brands and days."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01")
+
+    def stamps(k):
+        return start + pd.to_timedelta(np.sort(rng.integers(0, days * 86400, k)), unit="s")
+
+    tx = pd.DataFrame({
+        "transaction_id": [f"t{i}" for i in range(n)],
+        "store_id": rng.integers(1, stores + 1, n),
+        "tx_timestamp": stamps(n),
+        "total_amount": 0.0,
+    })
+    tl = pd.DataFrame({
+        "transaction_id": tx["transaction_id"].to_numpy()[np.sort(rng.integers(0, n, 2 * n))],
+        "line_no": 1,
+        "product_id": 1,
+        "brand_id": rng.integers(1, brands + 1, 2 * n),
+        "quantity": rng.integers(1, 5, 2 * n),
+        "price_unit": 1.0,
+        "subtotal": rng.random(2 * n) * 37.3,
+    })
+    sv = pd.DataFrame({
+        "id": [f"s{i}" for i in range(n)],
+        "store_id": rng.integers(1, stores + 1, n),
+        "event_timestamp": stamps(n),
+        "brand_id": rng.integers(1, brands + 1, n),
+        "facings": rng.integers(0, 9, n),
+        "share_of_shelf": rng.random(n),
+        "oos_flag": rng.random(n) < 0.2,
+        "confidence": rng.random(n),
+    })
+    stt = pd.DataFrame({
+        "id": [f"e{i}" for i in range(n)],
+        "store_id": rng.integers(1, stores + 1, n),
+        "event_timestamp": stamps(n),
+        "brand_id": rng.integers(1, brands + 1, n),
+        "raw_text": "Meron pa ba?",
+        "intent_label": rng.choice(["ask_price", "searching", "complaint"], n),
+        "sentiment_score": rng.normal(size=n),
+    })
+    grid = pd.MultiIndex.from_product(
+        [range(1, stores + 1), pd.date_range(start, periods=days)], names=["store_id", "date"]
+    ).to_frame(index=False)
+    weather = grid.assign(id="w", temp_c=rng.normal(30, 1, len(grid)), rainfall_mm=0.0, condition="Cloudy")
+    traffic = grid.assign(id="f", traffic_index=rng.normal(100, 5, len(grid)))
+    brands_df = pd.DataFrame({
+        "brand_id": range(1, brands + 1),
+        "brand_name": [f"Brand {i}" for i in range(1, brands + 1)],
+        "category": ["Snacks", "Beverages"] * (brands // 2),
+    })
+    return dict(
+        brands=brands_df, products=pd.DataFrame(), stores=pd.DataFrame({"store_id": range(1, stores + 1)}),
+        transactions=tx, transaction_lines=tl, shelf_vision=sv, stt_events=stt,
+        weather=weather, foot_traffic=traffic,
+    )
+
+
+def split_tables(tables, keep):
+    """
+    Fact tables filtered by keep(df, time_column); lines follow their
+    transactions.
+    """
+    times = {
+        "transactions": "tx_timestamp", "shelf_vision": "event_timestamp", "stt_events": "event_timestamp",
+        "weather": "date", "foot_traffic": "date",
+    }
+    out = {name: tables[name][keep(tables[name], col)] for name, col in times.items()}
+    out["transaction_lines"] = tables["transaction_lines"][
+        tables["transaction_lines"]["transaction_id"].isin(out["transactions"]["transaction_id"])
+    ]
+    return out
+
+
+def _db_urls():
+    urls = []
+    if os.getenv("SARICOACH_TEST_DATABASE_URL"):
+        urls.append(os.environ["SARICOACH_TEST_DATABASE_URL"])
+    # DuckDB speaks the same SQL and needs no server, when installed
+    if importlib.util.find_spec("duckdb_engine"):
+        urls.append("duckdb:///:memory:")
+    return urls
+
+
+# Canonical test tables loaded into a scratch schema; yields
+# (db_url, schema, tables).
+@pytest.fixture(params=_db_urls() or [None])
+def seeded_db(request, tmp_path):
+    url = request.param
+    if url is None:
+        pytest.skip("no SARICOACH_TEST_DATABASE_URL and duckdb-engine not installed")
+    if url.startswith("duckdb"):
+        url = f"duckdb:///{tmp_path / 'saricoach.duckdb'}"
+
+    tables = make_tables(stores=3, brands=4, days=8, n=1500)
+    tables["products"] = pd.DataFrame({"product_id": [1], "brand_id": [1], "category": ["Snacks"]})
+    schema = f"saricoach_test_{uuid.uuid4().hex[:8]}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE SCHEMA {schema}")
+    for name, table in TABLE_NAMES.items():
+        df = tables[name]
+        if name in ("weather", "foot_traffic"):
+            df = df.assign(date=df["date"].dt.date)
+        df.to_sql(table, engine, schema=schema, index=False)
+    engine.dispose()
+
+    yield url, schema, tables
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP SCHEMA {schema} CASCADE")
+    engine.dispose()
@@ -4,8 +4,9 @@ import pytest
 
 from saricoach.agents.planner import PlannerAgent
 from saricoach.agents.data_analyst import DataAnalystAgent
-from saricoach.agents.coach import CoachAgent
+from saricoach.agents.coach import CoachAgent, evaluate_rules
 from saricoach.data_context import DataContext
+from saricoach.feature_frame import build_brand_day_frames_all_stores
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data" / "processed"
@@ -40,3 +41,58 @@ def test_agent_pipeline_runs_for_demo_store():
     assert output.actions, "Coach should return at least one action"
     assert isinstance(output.actions[0], str)
     assert isinstance(output.debug_notes, dict)
+
+def test_analyze_stores_matches_per_store_analyze():
+    from conftest import make_tables
+
+    ctx = DataContext(**make_tables(stores=4, brands=6, days=20, n=2000))
+    planner = PlannerAgent()
+    analyst = DataAnalystAgent(ctx=ctx)
+    coach = CoachAgent(model_name="heuristic", use_gemini=False)
+
+    query = {"type": "seven_day_plan", "days": 7, "category": "Beverages"}
+    store_ids = [3, 1, 99, 2]
+    results = analyst.analyze_stores(planner.plan({**query, "store_id": 0}), store_ids)
+    assert list(results) == store_ids
+
+    for store_id in store_ids:
+        expected = analyst.analyze(planner.plan({**query, "store_id": store_id}))
+        actual = results[store_id]
+        assert actual.decision.store_id == store_id
+        pd.testing.assert_frame_equal(actual.brand_summary, expected.brand_summary, check_categorical=False)
+        assert coach.coach(actual) == coach.coach(expected)
+
+def test_concurrent_ingests_match_full_rebuild():
+    from concurrent.futures import ThreadPoolExecutor
+    from conftest import make_tables, split_tables
+
+    tables = make_tables(stores=4)
+    cut = pd.Timestamp("2024-01-04")
+    analyst = DataAnalystAgent(ctx=DataContext(**{**tables, **split_tables(tables, lambda df, col: df[col] < cut)}))
+    analyst.frames
+
+    def ingest(store_id):
+        analyst.ingest(**split_tables(tables, lambda df, col: (df[col] >= cut) & (df["store_id"] == store_id)))
+        return analyst.frames.for_store(store_id)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(ingest, range(1, 5)))
+
+    expected = build_brand_day_frames_all_stores(DataContext(**tables)).frame
+    pd.testing.assert_frame_equal(analyst.frames.frame, expected, check_exact=True)
+
+def test_evaluate_rules_dedupes_on_rendered_fields():
+    bs = pd.DataFrame({
+        "brand_name": ["Coke", "Coke", "Piattos"],
+        "category": ["Beverages", "Snacks", "Snacks"],
+        "risk_stockout_score": [1.0, 1.0, 0.0],
+        "opp_high_demand_score": [0.0, 0.0, 2.0],
+    })
+    fired = evaluate_rules(bs)
+    # stockout_action renders only {brand}, so Coke's second row adds no action
+    assert fired["rule_id"].tolist() == [
+        "stockout_risk", "stockout_action", "stockout_risk", "high_demand_opportunity", "high_demand_action",
+    ]
+    assert fired["row"].tolist() == [0, 0, 1, 2, 2]
+    assert fired.loc[2, "text"].startswith("Coke (Snacks) is at risk of stockout")
+    assert evaluate_rules(bs.iloc[:0]).empty
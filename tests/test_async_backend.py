@@ -0,0 +1,101 @@
+import asyncio
+import os
+import datetime as dt
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from service.app.backend.base import ThreadedBackend
+from service.app.backend.csv_backend import CSVBackend
+from service.app.backend.supabase_backend import AsyncSupabaseBackend
+from service.app.deps import get_async_backend
+from service.app.main import app
+
+TEST_DB_URL = os.getenv("SARICOACH_TEST_DATABASE_URL")
+
+
+def test_threaded_backend_matches_sync_backend():
+    sync = CSVBackend(base_path="data/processed")
+    backend = ThreadedBackend(sync)
+    assert asyncio.run(backend.fetch_store_summary(3)) == sync.fetch_store_summary(3)
+    assert list(asyncio.run(backend.fetch_store_summaries([2, 1]))) == [2, 1]
+
+
+def test_concurrent_requests_share_one_event_loop():
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            summaries = [client.get(f"/api/store/{i % 5 + 1}/summary") for i in range(100)]
+            coaching = [client.post("/api/coach/recommendations", json={"store_id": 1, "days": d}) for d in (7, 30)]
+            return await asyncio.gather(*summaries, *coaching)
+
+    responses = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+
+
+@pytest.mark.skipif(not TEST_DB_URL, reason="SARICOACH_TEST_DATABASE_URL not set")
+def test_async_supabase_backend_fetches_summaries():
+    async def run():
+        backend = AsyncSupabaseBackend(TEST_DB_URL, min_size=1, max_size=1)
+        try:
+            async with await backend.connection() as conn:
+                await conn.execute("CREATE TEMP TABLE stores (id int, name text)")
+                await conn.execute(
+                    "CREATE TEMP TABLE daily_metrics (store_id int, date date, volume int, "
+                    "revenue numeric, avg_basket_size numeric, avg_duration_seconds int)"
+                )
+                await conn.execute("CREATE TEMP TABLE hourly_traffic (store_id int, date date, hour_of_day int, volume int)")
+                await conn.execute(
+                    "CREATE TEMP TABLE daily_insights (store_id int, date date, insights text[], coach_message text)"
+                )
+                await conn.execute("INSERT INTO stores VALUES (1, 'Test Store'), (2, 'Empty Store')")
+                await conn.execute(
+                    "INSERT INTO daily_metrics VALUES (1, %s, 100, 1000, 2.5, 40)", (dt.date(2024, 1, 2),)
+                )
+            summaries = await backend.fetch_store_summaries([2, 1, 3])
+            return summaries, backend.stats()
+        finally:
+            await backend.close()
+
+    summaries, stats = asyncio.run(run())
+    assert list(summaries) == [2, 1]
+    assert summaries[1].kpis[0].value == 100
+    assert summaries[2].period == "No Data"
+    assert stats["in_use"] == 0
+
+
+class SlowBackend(ThreadedBackend):
+    """Answers after an async sleep; store ids below 1000 are unknown."""
+
+    def __init__(self, delay):
+        super().__init__(CSVBackend(base_path="data/processed"))
+        self.delay = delay
+
+    async def fetch_store_summary(self, store_id):
+        await asyncio.sleep(self.delay)
+        if store_id < 1000:
+            return None
+        return self.backend.fetch_store_summary(1).model_copy(update={"store_id": store_id})
+
+
+def test_store_summary_route_awaits_backend_without_blocking():
+    app.dependency_overrides[get_async_backend] = lambda: SlowBackend(delay=0.2)
+    try:
+        client = TestClient(app)
+        assert client.get("/api/store/1000/summary").json()["store_id"] == 1000
+        assert client.get("/api/store/7/summary").status_code == 404
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                return await asyncio.gather(*(ac.get(f"/api/store/{1001 + i}/summary") for i in range(20)))
+
+        started = time.perf_counter()
+        responses = asyncio.run(run())
+        # 20 sleeps of 0.2s overlap on the event loop instead of queueing
+        assert time.perf_counter() - started < 2.0
+        assert [r.json()["store_id"] for r in responses] == list(range(1001, 1021))
+    finally:
+        app.dependency_overrides.pop(get_async_backend, None)
@@ -26,3 +26,34 @@ def test_coach_agent_heuristic():
     assert len(output.actions) > 0
     assert len(output.risks) > 0
     assert "stockout" in output.risks[0]
+
+
+def test_coach_rules_order_and_dedupe():
+    # Same brand twice: stockout action does not use {cat}, so it is
+    # emitted once; the risk text differs per category.
+    summary = pd.DataFrame({
+        "brand_name": ["BrandA", "BrandA", "BrandB"],
+        "category": ["Cat1", "Cat2", "Cat1"],
+        "risk_stockout_score": [1.0, 1.0, 0.0],
+        "risk_visibility_score": [0.0, 0.0, 0.0],
+        "opp_high_demand_score": [0.0, 0.0, 2.0],
+    })
+    analytics = AnalyticsResult(
+        store_id=1,
+        decision=PlannerDecision("seven_day_plan", 1),
+        feature_frame=pd.DataFrame(),
+        brand_summary=summary,
+    )
+
+    output = CoachAgent().coach(analytics)
+
+    assert output.risks == [
+        "BrandA (Cat1) is at risk of stockout: low facings and some days out-of-stock despite demand.",
+        "BrandA (Cat2) is at risk of stockout: low facings and some days out-of-stock despite demand.",
+    ]
+    assert len(output.actions) == 2
+    assert output.actions[0].startswith("Increase BrandA facings")
+    assert output.actions[1].startswith("Highlight BrandB")
+    assert output.opportunities == [
+        "BrandB (Cat1) shows strong demand and positive sentiment when traffic is high.",
+    ]
@@ -1,7 +1,14 @@
+import datetime as dt
+
 import pytest
 import pandas as pd
-from saricoach.feature_frame import build_brand_day_frame, summarize_brand_window
-from saricoach.data_context import DataContext
+from saricoach.feature_frame import (
+    build_brand_day_frame,
+    build_brand_day_frames_all_stores,
+    summarize_brand_window,
+    summarize_brand_windows,
+)
+from saricoach.data_context import DataContext, day_dates, day_keys
 
 # Mock DataContext fixture
 @pytest.fixture
@@ -52,3 +59,102 @@ def test_summarize_brand_window(mock_ctx):
     assert not summary.empty
     assert "brand_name" in summary.columns
     assert len(summary) == 2 # 2 brands
+
+def test_summarize_brand_window_uses_trailing_days(mock_ctx):
+    ff = build_brand_day_frame(mock_ctx, store_id=1)
+    windows = summarize_brand_windows(ff, [2, 30, None])
+
+    last2 = windows[2].set_index("brand_id")
+    assert last2["days_observed"].tolist() == [2, 2]
+    assert last2["qty_sold_total"].tolist() == [2, 2]
+    assert last2.loc[1, "revenue_avg"] == pytest.approx(10.0)
+
+    # A window longer than the history covers all of it
+    pd.testing.assert_frame_equal(windows[30], windows[None])
+    assert windows[30]["days_observed"].tolist() == [5, 5]
+
+def test_all_stores_frames_match_per_store_build(mock_ctx):
+    # Add a second store with its own transactions and STT events
+    tx2 = pd.DataFrame({
+        "transaction_id": range(10, 14),
+        "store_id": [2]*4,
+        "tx_timestamp": pd.date_range("2024-01-02", periods=4),
+    })
+    tl2 = pd.DataFrame({
+        "transaction_id": range(10, 14),
+        "brand_id": [2]*4,
+        "quantity": [3]*4,
+        "subtotal": [30.0]*4,
+    })
+    stt = pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "store_id": [2, 2, 2],
+        "event_timestamp": pd.to_datetime(["2024-01-02 09:00", "2024-01-02 10:00", "2024-01-03 11:00"]),
+        "brand_id": [2, 2, 2],
+        "sentiment_score": [0.1, -0.2, 0.3],
+        "intent_label": ["ask_price", "complaint", "ask_price"],
+    })
+    mock_ctx.transactions = pd.concat([mock_ctx.transactions, tx2], ignore_index=True)
+    mock_ctx.transaction_lines = pd.concat([mock_ctx.transaction_lines, tl2], ignore_index=True)
+    mock_ctx.stt_events = stt
+
+    frames = build_brand_day_frames_all_stores(mock_ctx)
+    assert sorted(frames.store_ids) == [1, 2]
+
+    for store_id in (1, 2):
+        expected = build_brand_day_frame(mock_ctx, store_id=store_id)
+        # Counts stay integer even where other stores' gaps went through NaN
+        pd.testing.assert_frame_equal(frames.for_store(store_id), expected)
+        assert frames.for_store(store_id)["qty_sold"].dtype == "int64"
+
+    assert frames.for_store(99).empty
+
+def test_indexed_context_matches_raw_context(mock_ctx):
+    indexed = mock_ctx.index()
+    assert indexed.offsets["transactions"] == {1: (0, 10)}
+    assert len(indexed.store_rows("transaction_lines", 1)) == 10
+    assert indexed.store_rows("shelf_vision", 1).empty
+
+    expected = build_brand_day_frame(mock_ctx, store_id=1)
+    pd.testing.assert_frame_equal(build_brand_day_frame(indexed, store_id=1), expected)
+    pd.testing.assert_frame_equal(
+        build_brand_day_frames_all_stores(indexed).for_store(1), expected
+    )
+
+def test_day_keys_computed_once_and_dates_only_on_output(mock_ctx):
+    indexed = mock_ctx.index()
+    for name in ("transactions", "transaction_lines", "weather", "foot_traffic"):
+        assert getattr(indexed, name)["day"].dtype == "int32"
+    assert indexed.weather["day"].tolist() == day_keys(pd.date_range("2024-01-01", periods=5)).tolist()
+    assert day_dates(day_keys(["2024-01-03"]))[0] == dt.date(2024, 1, 3)
+
+    frames = build_brand_day_frames_all_stores(indexed)
+    assert "date" not in frames.frame.columns and frames.frame["day"].dtype == "int32"
+    ff = frames.for_store(1, start_date="2024-01-02", end_date=pd.Timestamp("2024-01-03"))
+    assert "day" not in ff.columns
+    assert ff["date"].tolist() == [dt.date(2024, 1, 2)] * 2 + [dt.date(2024, 1, 3)] * 2
+
+def test_cube_engine_matches_pandas_engine(mock_ctx):
+    stt = pd.DataFrame({
+        "id": ["a", "b", "c"],
+        "store_id": [1, 1, 1],
+        "event_timestamp": pd.to_datetime(["2024-01-02 09:00", "2024-01-02 10:00", "2024-01-06 11:00"]),
+        "brand_id": [2, 3, 1],
+        "sentiment_score": [0.1, -0.2, 0.3],
+        "intent_label": ["ask_price", "complaint", "ask_price"],
+    })
+    mock_ctx.stt_events = stt
+    calls = [
+        {},
+        {"start_date": "2024-01-02", "end_date": pd.Timestamp("2024-01-04")},
+        {"focus_brand_ids": [1, 3]},
+    ]
+    for ctx in (mock_ctx, mock_ctx.index()):
+        for kwargs in calls:
+            expected = build_brand_day_frame(ctx, store_id=1, **kwargs)
+            cube = build_brand_day_frame(ctx, store_id=1, engine="cube", **kwargs)
+            pd.testing.assert_frame_equal(cube, expected)
+        assert build_brand_day_frame(ctx, store_id=99, engine="cube").empty
+
+    with pytest.raises(ValueError, match="engine"):
+        build_brand_day_frame(mock_ctx, store_id=1, engine="polars")
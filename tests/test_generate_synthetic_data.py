@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from generate_synthetic_data import generate
+from saricoach.backends.csv_backend import build_context_from_csv
+from saricoach.backends.parts import load_parts_manifest
+
+
+def test_generate_writes_loadable_tables(tmp_path):
+    rows = generate(tmp_path, stores=7, days=14, brands=12, tx_per_day=20, stores_per_chunk=3, workers=1)
+    assert rows["stores"] == 7 and rows["brands"] == 12
+    assert rows["weather_daily"] == rows["foot_traffic_daily"] == 7 * 14
+
+    ctx = build_context_from_csv(tmp_path)
+    assert len(ctx.transactions) == rows["transactions"] > 0
+    assert ctx.transactions["store_id"].nunique() == 7
+    days = ctx.transactions["tx_timestamp"].dt.normalize()
+    assert days.min() == pd.Timestamp("2024-01-01") and days.max() == pd.Timestamp("2024-01-14")
+    assert ctx.transactions["tx_timestamp"].dt.hour.between(6, 21).all()
+
+    # Lines are numbered per transaction and add up to its total
+    lines = ctx.transaction_lines
+    assert lines.groupby("transaction_id")["line_no"].min().eq(1).all()
+    totals = lines.groupby("transaction_id")["subtotal"].sum()
+    tx = ctx.transactions.set_index("transaction_id")["total_amount"]
+    pd.testing.assert_series_equal(totals.sort_index(), tx.sort_index(), check_names=False, check_index_type=False)
+    assert set(lines["brand_id"]) <= set(ctx.brands["brand_id"])
+
+
+def test_generate_is_seeded_per_shard(tmp_path):
+    generate(tmp_path / "a", stores=5, days=5, brands=6, tx_per_day=10, stores_per_chunk=2, workers=1, seed=3)
+    generate(tmp_path / "b", stores=5, days=5, brands=6, tx_per_day=10, stores_per_chunk=2, workers=2, seed=3)
+    for path in (tmp_path / "a").iterdir():
+        assert path.read_bytes() == (tmp_path / "b" / path.name).read_bytes(), path.name
+
+
+def test_generate_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    rows = generate(tmp_path, stores=4, days=3, brands=5, tx_per_day=10, fmt="parquet", stores_per_chunk=2, workers=1)
+    tx = pd.read_parquet(tmp_path / "transactions.parquet")
+    assert len(tx) == rows["transactions"]
+    assert pd.read_parquet(tmp_path / "stt_events.parquet").shape[1] == 7
+
+
+def test_generate_parts_layout_matches_files(tmp_path):
+    files = generate(tmp_path / "files", stores=5, days=4, brands=6, tx_per_day=10, stores_per_chunk=2, workers=1)
+    parts = generate(
+        tmp_path / "parts", stores=5, days=4, brands=6, tx_per_day=10, stores_per_chunk=2, workers=2, layout="parts",
+    )
+    assert parts == files
+
+    manifest = load_parts_manifest(tmp_path / "parts")
+    tx = manifest["tables"]["transactions"]
+    assert tx["rows"] == files["transactions"] and len(tx["parts"]) == 3
+    assert [p["store_id"] for p in tx["parts"]] == [[1, 2], [3, 4], [5, 5]]
+    stacked = pd.concat([pd.read_csv(tmp_path / "parts" / p["file"]) for p in tx["parts"]], ignore_index=True)
+    pd.testing.assert_frame_equal(stacked, pd.read_csv(tmp_path / "files" / "transactions.csv"))
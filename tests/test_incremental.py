@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from conftest import make_tables, split_tables
+from saricoach.data_context import DataContext
+from saricoach.feature_frame import build_brand_day_frame, build_brand_day_frames_all_stores
+from saricoach.incremental import IncrementalFeatureFrame, diff_frames
+from saricoach.schema import compact_tables
+
+
+def _append_by_day(inc, ctx, cut):
+    for lo, hi in ((None, cut), (cut, None)):
+        def part(df, col):
+            m = pd.Series(True, index=df.index)
+            if lo is not None:
+                m &= df[col] >= lo
+            if hi is not None:
+                m &= df[col] < hi
+            return df[m]
+
+        tx = part(ctx.transactions, "tx_timestamp")
+        inc.append(
+            transactions=tx,
+            transaction_lines=ctx.transaction_lines[ctx.transaction_lines["transaction_id"].isin(tx["transaction_id"])],
+            shelf_vision=part(ctx.shelf_vision, "event_timestamp"),
+            stt_events=part(ctx.stt_events, "event_timestamp"),
+            weather=part(ctx.weather, "date"),
+            foot_traffic=part(ctx.foot_traffic, "date"),
+        )
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_incremental_matches_full_rebuild_bit_for_bit(compact):
+    tables = make_tables()
+    if compact:
+        tables = compact_tables(tables)
+    ctx = DataContext(**tables)
+
+    inc = IncrementalFeatureFrame(ctx.brands)
+    _append_by_day(inc, ctx, pd.Timestamp("2024-01-04"))
+
+    assert inc.verify(ctx).empty
+    pd.testing.assert_frame_equal(inc.frame(2), build_brand_day_frame(ctx, store_id=2), check_exact=True)
+
+
+def test_lines_wait_for_their_transaction():
+    ctx = DataContext(**make_tables())
+    inc = IncrementalFeatureFrame(ctx.brands)
+    inc.append(transaction_lines=ctx.transaction_lines)
+    inc.append(transactions=ctx.transactions, transaction_lines=ctx.transaction_lines.iloc[:0])
+    assert inc.frame(1)["qty_sold"].sum() == build_brand_day_frame(ctx, store_id=1)["qty_sold"].sum()
+
+
+def test_verify_reports_mismatched_cells():
+    ctx = DataContext(**make_tables())
+    inc = IncrementalFeatureFrame.from_context(ctx)
+    expected = inc.store_frames().frame
+    actual = expected.copy()
+    actual.loc[0, "revenue"] += 1e-9
+
+    diff = diff_frames(expected, actual)
+    assert len(diff) == 1
+    assert diff.loc[0, "column"] == "revenue"
+
+
+def test_refresh_reaggregates_only_touched_stores():
+    tables = make_tables()
+    cut = pd.Timestamp("2024-01-04")
+    early = split_tables(tables, lambda df, col: (df[col] < cut) | (df["store_id"] != 2))
+    late = split_tables(tables, lambda df, col: (df[col] >= cut) & (df["store_id"] == 2))
+
+    inc = IncrementalFeatureFrame.from_context(DataContext(**{**tables, **early}))
+    frames = inc.store_frames()
+    inc.append(**late)
+    assert inc._dirty == {2}
+    inc.store_frames = lambda: pytest.fail("refresh rebuilt every store")
+
+    refreshed = inc.refresh(frames)
+    assert inc.refresh(refreshed) is refreshed
+    full = DataContext(**tables)
+    pd.testing.assert_frame_equal(refreshed.frame, build_brand_day_frames_all_stores(full).frame, check_exact=True)
+    assert refreshed.offsets == build_brand_day_frames_all_stores(full).offsets
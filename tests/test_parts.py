@@ -0,0 +1,148 @@
+import pandas as pd
+import pytest
+
+from generate_synthetic_data import generate
+from saricoach.backends.copy_loader import SEED_TABLES
+from saricoach.backends.csv_backend import build_context_from_csv, read_csv_tables
+from saricoach.backends.parts import (
+    PartWriter,
+    build_context_from_parts,
+    load_parts_manifest,
+    split_by_store,
+    write_part,
+)
+
+
+def _events(stores=5, days=3):
+    return pd.DataFrame({
+        "store_id": [s for s in range(1, stores + 1) for _ in range(days)],
+        "event_timestamp": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"] * stores),
+        "facings": range(stores * days),
+    })
+
+
+def test_split_by_store_groups_consecutive_stores():
+    parts = split_by_store(_events(), stores_per_part=2)
+    assert [sorted(p["store_id"].unique()) for p in parts] == [[1, 2], [3, 4], [5]]
+    # Lines-style tables split by an aligned store Series
+    lines = pd.DataFrame({"line_no": range(4)})
+    parts = split_by_store(lines, 1, store_ids=pd.Series([7, 9, 7, 9]))
+    assert [p["line_no"].tolist() for p in parts] == [[0, 2], [1, 3]]
+    assert len(split_by_store(pd.DataFrame({"brand_id": [1]}), 2)) == 1
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_part_writer_manifest_counts_rows(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    events = _events()
+    with PartWriter(tmp_path, fmt=fmt) as writer:
+        for chunk in split_by_store(events, 2):
+            writer.write("shelf_vision_events", chunk)
+        # A part written elsewhere (e.g. by a worker) is only recorded
+        entry = write_part(tmp_path, "brands", 0, pd.DataFrame({"brand_id": [1, 2]}), fmt)
+        writer.add("brands", entry, ["brand_id"])
+
+    manifest = load_parts_manifest(tmp_path)
+    table = manifest["tables"]["shelf_vision_events"]
+    assert table["rows"] == len(events) and len(table["parts"]) == 3
+    assert table["parts"][1]["store_id"] == [3, 4]
+    assert table["parts"][1]["date"] == ["2024-01-01", "2024-01-03"]
+    assert manifest["tables"]["brands"]["rows"] == 2
+
+    read = pd.read_csv if fmt == "csv" else pd.read_parquet
+    back = pd.concat([read(tmp_path / p["file"]) for p in table["parts"]], ignore_index=True)
+    assert back["facings"].tolist() == events["facings"].tolist()
+    if fmt == "csv":
+        assert table["parts"][0]["file"].endswith(".csv.gz")
+
+
+@pytest.fixture(scope="module")
+def synthetic(tmp_path_factory):
+    root = tmp_path_factory.mktemp("synthetic")
+    args = dict(stores=6, days=6, brands=8, tx_per_day=10, stores_per_chunk=2, workers=1, seed=5)
+    generate(root / "files", **args)
+    generate(root / "parts", layout="parts", **args)
+    return root
+
+
+def test_parts_loader_matches_csv_loader(synthetic):
+    expected = build_context_from_csv(synthetic / "files").tables()
+    for parts_dir in (synthetic / "parts", synthetic / "files"):
+        got = build_context_from_parts(parts_dir, workers=4).tables()
+        for table, df in expected.items():
+            pd.testing.assert_frame_equal(got[table], df, obj=table)
+
+
+def test_parts_loader_prunes_by_store_and_date(synthetic, tmp_path):
+    full = build_context_from_parts(synthetic / "parts")
+    ctx = build_context_from_parts(synthetic / "parts", store_ids=[3], start_date="2024-01-02", end_date="2024-01-03")
+    assert ctx.stores["store_id"].tolist() == [3]
+    assert set(ctx.transactions["store_id"]) == {3}
+    assert pd.to_datetime(ctx.weather["date"]).dt.strftime("%Y-%m-%d").tolist() == ["2024-01-02", "2024-01-03"]
+    tx = full.transactions
+    mask = (tx["store_id"] == 3) & tx["tx_timestamp"].between("2024-01-02", "2024-01-04", inclusive="left")
+    assert len(ctx.transactions) == mask.sum()
+    assert set(ctx.transaction_lines["transaction_id"]) == set(ctx.transactions["transaction_id"])
+    assert len(ctx.brands) == len(full.brands)
+
+    # Parts outside the predicate are never opened
+    manifest = load_parts_manifest(synthetic / "parts")
+    for table in ("transactions", "transaction_lines", "stt_events"):
+        (synthetic / "parts" / manifest["tables"][table]["parts"][0]["file"]).rename(tmp_path / table)
+    try:
+        ctx = build_context_from_parts(synthetic / "parts", store_ids=[5, 6])
+        assert set(ctx.transactions["store_id"]) == {5, 6}
+        with pytest.raises(FileNotFoundError):
+            build_context_from_parts(synthetic / "parts", store_ids=[1])
+    finally:
+        for table in ("transactions", "transaction_lines", "stt_events"):
+            (tmp_path / table).rename(synthetic / "parts" / manifest["tables"][table]["parts"][0]["file"])
+
+
+def test_parts_loader_reads_hive_store_directories(synthetic, tmp_path):
+    pytest.importorskip("pyarrow")
+    full = read_csv_tables(synthetic / "files")
+    for table, df in full.items():
+        name = {"shelf_vision": "shelf_vision_events", "weather": "weather_daily",
+                "foot_traffic": "foot_traffic_daily"}.get(table, table)
+        if table == "transactions":
+            for store_id, group in df.groupby("store_id"):
+                out = tmp_path / name / f"store_id={store_id}"
+                out.mkdir(parents=True)
+                group.drop(columns="store_id").to_parquet(out / "part-0.parquet", index=False)
+        else:
+            df.to_parquet(tmp_path / f"{name}.parquet", index=False)
+
+    ctx = build_context_from_parts(tmp_path, region=full["stores"]["region"].iloc[0])
+    stores = set(ctx.stores["store_id"])
+    assert stores and set(ctx.transactions["store_id"]) == stores == set(ctx.weather["store_id"])
+    assert len(ctx.transactions) == full["transactions"]["store_id"].isin(stores).sum()
+
+
+def test_lines_parts_follow_transaction_stores(synthetic, tmp_path):
+    from seed_saricoach_data import stage_parts_manifest, stage_write_parts
+
+    full = read_csv_tables(synthetic / "files")
+    tx = full["transactions"]
+    # Store 2 has transactions but no lines: lines part 0 must still cover
+    # stores 1-2 so that store 3's lines stay in part 1 with its transactions
+    lines = full["transaction_lines"]
+    lines = lines[~lines["transaction_id"].isin(tx.loc[tx["store_id"] == 2, "transaction_id"])]
+    names = {"shelf_vision": "shelf_vision_events", "weather": "weather_daily", "foot_traffic": "foot_traffic_daily"}
+    written = []
+    for table in SEED_TABLES:
+        field_name = next(k for k in full if names.get(k, k) == table)
+        df = lines if table == "transaction_lines" else full[field_name]
+        written.append(stage_write_parts(
+            df, tx if table == "transaction_lines" else None,
+            out_dir=tmp_path, table=table, fmt="csv", stores_per_part=2,
+        ))
+    stage_parts_manifest(*written, out_dir=tmp_path, fmt="csv")
+
+    parts = load_parts_manifest(tmp_path)["tables"]["transaction_lines"]["parts"]
+    assert [p["store_id"] for p in parts] == [[1, 1], [3, 4], [5, 6]]
+    ctx = build_context_from_parts(tmp_path, store_ids=[3])
+    expected = lines["transaction_id"].isin(tx.loc[tx["store_id"] == 3, "transaction_id"]).sum()
+    assert expected and len(ctx.transaction_lines) == expected
+    assert len(build_context_from_parts(tmp_path, store_ids=[2]).transaction_lines) == 0
@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+from saricoach.pipeline import Pipeline, Stage, code_fingerprint, fingerprint
+
+
+def make_numbers(n):
+    return pd.DataFrame({"x": range(n)})
+
+
+def split_parity(df):
+    return df[df["x"] % 2 == 0].reset_index(drop=True), df[df["x"] % 2 == 1].reset_index(drop=True)
+
+
+def clip(df, upper):
+    return df.assign(x=df["x"].clip(upper=upper))
+
+
+def total(evens, odds):
+    return int(evens["x"].sum() + odds["x"].sum())
+
+
+def write_total(value, path):
+    path.write_text(str(value))
+    return path
+
+
+def _stages(tmp_path, n=6, upper=100):
+    return [
+        Stage("numbers", make_numbers, outputs=("numbers",), params={"n": n}),
+        Stage("split", split_parity, inputs=("numbers",), outputs=("evens", "odds")),
+        Stage("clip", clip, inputs=("odds",), outputs=("clipped",), params={"upper": upper}),
+        Stage("total", total, inputs=("evens", "clipped"), outputs=("total",)),
+        Stage("write", write_total, inputs=("total",), outputs=("total_file",), params={"path": tmp_path / "total.txt"}),
+    ]
+
+
+def _ran(pipeline):
+    return {name for name, secs in pipeline.timings.items() if secs is not None}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pipeline_runs_stages_in_dependency_order(tmp_path, workers):
+    out = Pipeline(_stages(tmp_path), workers=workers).run()
+    assert out["evens"]["x"].tolist() == [0, 2, 4]
+    assert out["total"] == 15
+    assert (tmp_path / "total.txt").read_text() == "15"
+
+
+def test_pipeline_cache_reruns_only_changed_downstream(tmp_path):
+    cache = tmp_path / "cache"
+    first = Pipeline(_stages(tmp_path), cache_dir=cache)
+    first.run()
+    assert _ran(first) == {"numbers", "split", "clip", "total", "write"}
+
+    again = Pipeline(_stages(tmp_path), cache_dir=cache)
+    assert again.run()["total"] == 15
+    assert _ran(again) == set()
+
+    # Changing clip's params reruns it; total's inputs then change too
+    clipped = Pipeline(_stages(tmp_path, upper=2), cache_dir=cache)
+    assert clipped.run()["total"] == 0 + 2 + 4 + 1 + 2 + 2
+    assert _ran(clipped) == {"clip", "total", "write"}
+
+    # A clip that changes nothing hits total's earlier entry; write reruns
+    # only because the upper=2 run overwrote its file
+    noop = Pipeline(_stages(tmp_path, upper=50), cache_dir=cache)
+    noop.run()
+    assert _ran(noop) == {"clip", "write"}
+
+    # File outputs are checked: a deleted artifact is rebuilt
+    (tmp_path / "total.txt").unlink()
+    rebuilt = Pipeline(_stages(tmp_path, upper=50), cache_dir=cache)
+    rebuilt.run()
+    assert _ran(rebuilt) == {"write"}
+    assert (tmp_path / "total.txt").read_text() == "15"
+
+
+def test_pipeline_uncached_stage_always_runs(tmp_path):
+    stages = _stages(tmp_path)
+    stages[0] = Stage("numbers", make_numbers, outputs=("numbers",), params={"n": 6}, cache=False)
+    Pipeline(stages, cache_dir=tmp_path / "cache").run()
+    again = Pipeline(stages, cache_dir=tmp_path / "cache")
+    again.run()
+    # Its output hash is unchanged, so everything downstream stays cached
+    assert _ran(again) == {"numbers"}
+
+
+def test_pipeline_rejects_bad_graphs(tmp_path):
+    with pytest.raises(ValueError, match="no stage produces"):
+        Pipeline([Stage("a", total, inputs=("missing",), outputs=("x",))])
+    with pytest.raises(ValueError, match="produced by both"):
+        Pipeline([Stage("a", make_numbers, outputs=("x",)), Stage("b", make_numbers, outputs=("x",))])
+    with pytest.raises(ValueError, match="Cycle"):
+        Pipeline([Stage("a", clip, inputs=("y",), outputs=("x",)), Stage("b", clip, inputs=("x",), outputs=("y",))])
+
+
+def test_fingerprints():
+    df = pd.DataFrame({"a": [1, 2]})
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.astype("int32"))
+    assert fingerprint({"b": df, "a": 1}) == fingerprint({"a": 1, "b": df.copy()})
+    # Code fingerprints follow each function's own source
+    assert code_fingerprint(make_numbers) != code_fingerprint(split_parity)
@@ -0,0 +1,82 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from service.app import dependencies
+from service.app.config import settings
+from service.app.main import app
+from service.app.reloader import ContextReloader
+
+client = TestClient(app)
+
+
+def test_reload_runs_off_thread_and_coalesces_triggers():
+    release = threading.Event()
+    loads = []
+    current = {"value": 0}
+
+    def load():
+        release.wait(5)
+        loads.append(1)
+        return len(loads)
+
+    def swap(value):
+        current["value"] = value
+
+    reloader = ContextReloader(load, swap)
+    assert reloader.trigger() is True
+    assert reloader.loading
+    # Still serving the old value while the load is in flight
+    assert current["value"] == 0
+    assert reloader.trigger() is False
+    assert reloader.trigger() is False
+
+    release.set()
+    assert reloader.wait(5)
+    assert current["value"] == 2  # one run plus one coalesced follow-up
+    assert reloader.status()["reloads"] == 2
+    assert reloader.status()["last_loaded_at"] is not None
+
+
+def test_failed_reload_keeps_current_data():
+    current = {"value": "old"}
+
+    def load():
+        raise RuntimeError("boom")
+
+    reloader = ContextReloader(load, lambda v: current.update(value=v))
+    reloader.trigger()
+    reloader.wait(5)
+    assert current["value"] == "old"
+    assert "boom" in reloader.status()["last_error"]
+
+
+def test_admin_routes_need_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    assert client.post("/api/admin/reload").status_code == 403
+
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert client.post("/api/admin/reload").status_code == 401
+    assert client.get("/api/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert not dependencies.reloader.loading
+
+
+def test_admin_reload_swaps_analyst(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    admin = {"X-Admin-Token": "s3cret"}
+    assert client.post("/api/coach/recommendations", json={"store_id": 1}).status_code == 200
+    _, old_analyst, _ = dependencies.get_agents()
+    version = dependencies.get_data_version()
+
+    res = client.post("/api/admin/reload", headers=admin)
+    assert res.status_code == 202
+    assert dependencies.reloader.wait(30)
+
+    status = client.get("/api/admin/reload", headers=admin).json()
+    assert status["data_version"] == version + 1
+    assert status["last_loaded_at"] is not None
+    assert status["last_error"] is None
+
+    _, new_analyst, _ = dependencies.get_agents()
+    assert new_analyst is not old_analyst
+    assert client.post("/api/coach/recommendations", json={"store_id": 1}).status_code == 200
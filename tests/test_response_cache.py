@@ -0,0 +1,104 @@
+from fastapi.testclient import TestClient
+
+from service.app import dependencies
+from service.app.cache import ResponseCache, response_cache
+from service.app.main import app
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_oldest_past_size_bound():
+    cache = ResponseCache(max_mb=30 / (1024 * 1024))
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    cache.put("c", b"x" * 10)
+    assert cache.get("a") is not None  # a is now most recent
+    cache.put("d", b"x" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["size_bytes"] == 30
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=10, clock=clock)
+    cache.put("a", b"{}")
+    clock.now = 9.9
+    assert cache.get("a") is not None
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_coach_recommendations_cached_with_etag():
+    body = {"store_id": 1, "days": 30}
+    first = client.post("/api/coach/recommendations", json=body)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    hits = response_cache.stats()["hits"]
+    again = client.post("/api/coach/recommendations", json=body)
+    assert again.json() == first.json()
+    assert response_cache.stats()["hits"] == hits + 1
+
+    not_modified = client.post("/api/coach/recommendations", json=body, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+    # A data change moves requests to a new key
+    dependencies.bump_data_version()
+    misses = response_cache.stats()["misses"]
+    fresh = client.post("/api/coach/recommendations", json=body)
+    assert fresh.status_code == 200
+    assert response_cache.stats()["misses"] == misses + 1
+
+    metrics = client.get("/api/metrics").json()
+    assert metrics["data_version"] == dependencies.get_data_version()
+    assert metrics["response_cache"]["entries"] >= 1
+
+
+def test_store_summary_cached_with_etag():
+    first = client.get("/api/store/1/summary")
+    assert first.status_code == 200
+    assert first.json()["store_id"] == 1
+    etag = first.headers["etag"]
+
+    hits = client.get("/api/metrics").json()["response_cache"]["hits"]
+    again = client.get("/api/store/1/summary")
+    assert again.json() == first.json()
+    assert client.get("/api/metrics").json()["response_cache"]["hits"] == hits + 1
+
+    not_modified = client.get("/api/store/1/summary", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+
+def test_store_summary_is_ttl_only(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "_clock", clock)
+    response_cache.clear()
+    client.get("/api/store/2/summary")
+
+    # Not tied to the DataContext version: a reload or ingest keeps the entry
+    dependencies.bump_data_version()
+    hits = response_cache.stats()["hits"]
+    client.get("/api/store/2/summary")
+    assert response_cache.stats()["hits"] == hits + 1
+
+    # Only the TTL refetches it from the backend
+    clock.now += response_cache.ttl_seconds
+    expirations = response_cache.stats()["expirations"]
+    assert client.get("/api/store/2/summary").status_code == 200
+    assert response_cache.stats()["expirations"] == expirations + 1
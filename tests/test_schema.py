@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from saricoach.schema import apply_schema, compact_tables, concat_compacted, memory_report
+
+
+def test_apply_schema_compacts_shelf_vision():
+    sv = pd.DataFrame({
+        "id": ["a1", "b2", "c3"],
+        "store_id": [1, 1, 2],
+        "event_timestamp": ["2024-01-01 08:00", "2024-01-02 08:00", "2024-01-01 08:00"],
+        "brand_id": [10, 11, 10],
+        "facings": [3, 0, 5],
+        "share_of_shelf": [0.5, 0.0, 1.0],
+        "oos_flag": [False, True, False],
+        "confidence": [0.9, 0.8, 0.95],
+    })
+    out = apply_schema("shelf_vision", sv)
+
+    assert "id" not in out.columns
+    assert out["store_id"].dtype == np.int32
+    assert out["facings"].dtype == np.int16
+    assert out["share_of_shelf"].dtype == np.float32
+    assert out["oos_flag"].dtype == bool
+    assert pd.api.types.is_datetime64_any_dtype(out["event_timestamp"])
+
+    assert "id" in apply_schema("shelf_vision", sv, drop_unused=False).columns
+
+    # timestamptz values from Postgres come back tz-aware
+    aware = sv.assign(event_timestamp=pd.to_datetime(sv["event_timestamp"]).dt.tz_localize("Asia/Manila"))
+    out = apply_schema("shelf_vision", aware)
+    assert out["event_timestamp"].dtype == "datetime64[ns]"
+    assert str(out["event_timestamp"].iloc[0]) == "2024-01-01 00:00:00"
+
+
+def test_compact_tables_reports_savings():
+    stt = pd.DataFrame({
+        "id": [f"uuid-{i}" for i in range(200)],
+        "store_id": 1,
+        "event_timestamp": pd.Timestamp("2024-01-01 09:00"),
+        "brand_id": np.arange(200) % 5,
+        "raw_text": "Meron pa bang Brand 1?",
+        "intent_label": ["ask_price", "searching"] * 100,
+        "sentiment_score": 0.1,
+    })
+    before = {"stt_events": stt}
+    after = compact_tables(before)
+
+    assert isinstance(after["stt_events"]["intent_label"].dtype, pd.CategoricalDtype)
+    assert not isinstance(after["stt_events"]["raw_text"].dtype, pd.CategoricalDtype)
+    report = memory_report(before, after)
+    assert report.loc[0, "bytes_after"] < report.loc[0, "bytes_before"]
+
+
+def test_concat_compacted_keeps_categories_across_chunks():
+    stt = pd.DataFrame({
+        "store_id": [1, 1, 2, 2],
+        "intent_label": ["searching", "ask_price", "complaint", "searching"],
+    })
+    chunks = [apply_schema("stt_events", stt.iloc[:2]), apply_schema("stt_events", stt.iloc[2:])]
+    out = concat_compacted(chunks)
+
+    pd.testing.assert_frame_equal(out, apply_schema("stt_events", stt))
+    assert list(out["intent_label"].cat.categories) == ["ask_price", "complaint", "searching"]
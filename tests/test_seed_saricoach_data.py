@@ -42,3 +42,99 @@ def test_seed_script_generates_processed_files(tmp_path, monkeypatch):
     tx = pd.read_csv(processed_dir / "transactions.csv")
     assert "store_id" in tx.columns
     assert any(col for col in tx.columns if "time" in col.lower())
+
+
+def test_generate_stt_events_is_seeded_and_bounded():
+    import numpy as np
+
+    from seed_saricoach_data import STT_INTENTS, STT_SENTIMENT_RANGE, generate_stt_events
+
+    sv = pd.DataFrame({
+        "store_id": np.repeat([1, 2], 30),
+        "event_timestamp": np.tile(pd.date_range("2024-01-01 08:00", periods=30, freq="D"), 2),
+        "brand_id": 7,
+        "facings": np.tile([0, 6, 60], 20),
+    })
+    stt = generate_stt_events(sv, max_events_per_day=3, rng=np.random.default_rng(1))
+    assert stt.equals(generate_stt_events(sv, max_events_per_day=3, rng=np.random.default_rng(1)))
+    assert not stt.equals(generate_stt_events(sv, max_events_per_day=3, rng=np.random.default_rng(2)))
+
+    assert stt["id"].dtype == "int64" and stt["id"].is_unique
+    assert stt.groupby(["store_id", stt["event_timestamp"].dt.date]).size().max() <= 3
+    assert stt["event_timestamp"].dt.hour.between(8, 19).all()
+    for code, intent in enumerate(STT_INTENTS):
+        rows = stt[stt["intent_label"] == intent]
+        assert rows["sentiment_score"].between(*STT_SENTIMENT_RANGE[code]).all()
+        assert (rows["raw_text"].str.contains("Brand 7")).all()
+
+    empty = generate_stt_events(sv.iloc[:0])
+    assert empty.empty and list(empty.columns) == list(stt.columns)
+
+
+def test_generate_weather_and_traffic_grid_and_city_correlation():
+    import numpy as np
+
+    from seed_saricoach_data import generate_weather_and_traffic
+
+    stores = pd.DataFrame({"store_id": [1, 2, 3], "city": ["Manila", "Cebu", "Manila"]})
+    tx = pd.DataFrame({"tx_timestamp": pd.to_datetime(["2024-01-03 10:00", "2024-01-01 18:30"])})
+
+    weather, traffic = generate_weather_and_traffic(stores, tx, rng=np.random.default_rng(3))
+    assert len(weather) == len(traffic) == 3 * 3
+    assert weather["store_id"].tolist() == [1, 1, 1, 2, 2, 2, 3, 3, 3]
+    assert [str(d) for d in weather["date"][:3]] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert (weather.loc[weather["condition"] == "Cloudy", "rainfall_mm"] == 0).all()
+    assert (traffic["traffic_index"] >= 20).all()
+
+    weather, _ = generate_weather_and_traffic(stores, tx, rng=np.random.default_rng(3), correlated=True)
+    by_store = weather.set_index(["store_id", "date"])[["temp_c", "rainfall_mm", "condition"]]
+    manila_1, cebu, manila_3 = (by_store.loc[s] for s in (1, 2, 3))
+    assert manila_1.equals(manila_3)
+    assert not manila_1.equals(cebu)
+
+    # A store without a city draws its own weather, not the last city's
+    stores = pd.DataFrame({"store_id": [1, 2, 3, 4], "city": ["Manila", "Cebu", None, None]})
+    weather, _ = generate_weather_and_traffic(stores, tx, rng=np.random.default_rng(3), correlated=True)
+    by_store = weather.set_index(["store_id", "date"])[["temp_c", "rainfall_mm"]]
+    no_city, other = by_store.loc[3], by_store.loc[4]
+    assert not no_city.equals(by_store.loc[2]) and not no_city.equals(by_store.loc[1])
+    assert not no_city.equals(other)
+
+
+def test_generate_shelf_vision_bins_and_ids():
+    import uuid
+
+    import numpy as np
+
+    from seed_saricoach_data import generate_shelf_vision, pack_event_ids, render_ids
+
+    tx = pd.DataFrame({
+        "transaction_id": ["a", "b", "c", "d"],
+        "store_id": [1, 1, 1, 2],
+        "tx_timestamp": pd.to_datetime(["2024-01-01 09:00", "2024-01-01 17:00", "2024-01-02 10:00", "2024-01-01 12:00"]),
+    })
+    lines = pd.DataFrame({
+        "transaction_id": ["a", "a", "b", "c", "d"],
+        "brand_id": [1, 2, 1, 3, 1],
+        "quantity": [15, 2, 10, 0, 1],
+    })
+    sv = generate_shelf_vision(lines, tx, None, rng=np.random.default_rng(5))
+    assert sv.equals(generate_shelf_vision(lines, tx, None, rng=np.random.default_rng(5)))
+
+    by_key = sv.set_index(["store_id", "brand_id", sv["event_timestamp"].dt.day])
+    assert 8 <= by_key.loc[(1, 1, 1), "facings"] < 12  # 25 sold
+    assert 1 <= by_key.loc[(1, 2, 1), "facings"] < 4  # 2 sold
+    assert by_key.loc[(1, 3, 2), "facings"] == 1 and by_key.loc[(1, 3, 2), "oos_flag"]
+    assert (sv["event_timestamp"].dt.hour == 8).all()
+    assert np.allclose(sv.groupby(["store_id", "event_timestamp"])["share_of_shelf"].sum(), 1.0)
+
+    # Ids are packed from (store, day, brand) and render as stable UUID text
+    expected = pack_event_ids(sv["store_id"], sv["event_timestamp"].dt.normalize(), sv["brand_id"])
+    assert (sv["id"].to_numpy() == expected).all() and sv["id"].is_unique
+    rendered = render_ids("shelf_vision_events", sv)["id"]
+    assert rendered.is_unique and all(uuid.UUID(u).version == 8 for u in rendered)
+    assert rendered.tolist() == render_ids("shelf_vision_events", sv)["id"].tolist()
+    assert rendered.tolist() != render_ids("stt_events", sv)["id"].tolist()
+
+    with pytest.raises(ValueError, match="store_id out of range"):
+        pack_event_ids([1 << 20], ["2024-01-01"])
@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 from service.app.main import app
 import pytest
@@ -30,3 +31,16 @@ def test_store_summary_basic():
     assert isinstance(coach["actions"], list)
     assert isinstance(coach["risks"], list)
     assert isinstance(coach["opportunities"], list)
+
+def test_coach_batch_streams_one_line_per_store():
+    res = client.post("/api/coach/batch", json={"store_ids": [1, 1, 424242], "days": 30})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [line["store_id"] for line in lines] == [1, 424242]
+
+    single = client.post("/api/coach/recommendations", json={"store_id": 1, "days": 30})
+    assert single.status_code == 200
+    assert lines[0]["coach"] == single.json()
+    assert "daily_sales" in lines[0]["kpis"]
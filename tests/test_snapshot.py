@@ -0,0 +1,70 @@
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from saricoach.backends.csv_backend import CSV_FILES, build_context_from_csv
+from saricoach.backends.snapshot import (
+    build_context_from_snapshot,
+    build_snapshot,
+    is_snapshot_stale,
+)
+from saricoach.feature_frame import build_brand_day_frame
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "data" / "processed"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    out = tmp_path / "processed"
+    out.mkdir()
+    for file_name, _ in CSV_FILES.values():
+        shutil.copy(DATA_DIR / file_name, out / file_name)
+    return out
+
+
+def test_snapshot_round_trip_matches_csv(data_dir, tmp_path):
+    snap_dir = tmp_path / "snapshot"
+    build_snapshot(data_dir, snap_dir)
+    assert not is_snapshot_stale(snap_dir, data_dir)
+
+    from_snap = build_context_from_snapshot(snap_dir, data_dir=data_dir)
+    from_csv = build_context_from_csv(data_dir)
+    assert from_snap.transactions["store_id"].dtype == "int32"
+
+    pd.testing.assert_frame_equal(
+        build_brand_day_frame(from_snap, store_id=1),
+        build_brand_day_frame(from_csv, store_id=1),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_snapshot_staleness_uses_content_hash(data_dir, tmp_path):
+    snap_dir = tmp_path / "snapshot"
+    build_snapshot(data_dir, snap_dir)
+
+    # Touching a file without changing it keeps the snapshot fresh
+    brands = data_dir / "brands.csv"
+    st = brands.stat()
+    os.utime(brands, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not is_snapshot_stale(snap_dir, data_dir)
+
+    brands.write_text(brands.read_text() + "2,Other Brand,Snacks\n")
+    assert is_snapshot_stale(snap_dir, data_dir)
+
+    # Stale snapshot falls back to the CSVs
+    ctx = build_context_from_snapshot(snap_dir, data_dir=data_dir)
+    assert len(ctx.brands) == 2
+
+
+def test_missing_snapshot_falls_back_to_csv(data_dir, tmp_path):
+    ctx = build_context_from_snapshot(tmp_path / "nope", data_dir=data_dir)
+    assert len(ctx.transactions) == 1
+    with pytest.raises(FileNotFoundError):
+        build_context_from_snapshot(tmp_path / "nope")
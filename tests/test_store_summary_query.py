@@ -0,0 +1,49 @@
+import datetime as dt
+from decimal import Decimal
+
+from service.app.backend.supabase_backend import summary_from_row
+
+
+def _row(**overrides):
+    row = dict(
+        id=7, name="Aling Nena",
+        date=dt.date(2024, 3, 1), volume=120, revenue=Decimal("1500.00"),
+        basket=Decimal("2.50"), duration=40,
+        prev_volume=100, prev_revenue=Decimal("2000.00"), prev_basket=Decimal("2.50"), prev_duration=50,
+        hours=[8, 9], volumes=[5, 12],
+        found=True, insights=["Busy morning"], coach_message="Stock up",
+    )
+    row.update(overrides)
+    return tuple(row.values())
+
+
+def test_summary_from_row_computes_deltas_and_chart():
+    summary = summary_from_row(_row())
+    assert summary.period == "Latest (2024-03-01)"
+    assert [k.delta_pct for k in summary.kpis] == [20.0, -25.0, 0.0, -20.0]
+    assert [k.trend for k in summary.kpis] == ["up", "down", "up", "down"]
+    assert summary.kpis[1].value == "₱1,500"
+    assert summary.chart == [{"date": "08:00", "volume": 5}, {"date": "09:00", "volume": 12}]
+    assert summary.insights == ["Busy morning"]
+
+
+def test_summary_from_row_without_previous_day_or_insights():
+    summary = summary_from_row(_row(
+        prev_volume=None, prev_revenue=None, prev_basket=None, prev_duration=None,
+        hours=None, volumes=None, found=None, insights=None, coach_message=None,
+    ))
+    assert [k.delta_pct for k in summary.kpis] == [0.0] * 4
+    assert summary.chart == []
+    assert summary.insights == []
+    assert summary.coach_message == "Analysis pending..."
+
+
+def test_summary_from_row_without_metrics():
+    none = dict.fromkeys([
+        "date", "volume", "revenue", "basket", "duration",
+        "prev_volume", "prev_revenue", "prev_basket", "prev_duration",
+        "hours", "volumes", "found", "insights", "coach_message",
+    ])
+    summary = summary_from_row(_row(**none))
+    assert summary.period == "No Data"
+    assert summary.kpis == []
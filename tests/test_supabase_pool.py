@@ -0,0 +1,88 @@
+import asyncio
+import os
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+
+from service.app import deps
+from service.app.backend.supabase_backend import SupabaseBackend
+from service.app.main import app
+
+# Point at a disposable local Postgres, e.g. postgresql://postgres@localhost/postgres
+TEST_DB_URL = os.getenv("SARICOACH_TEST_DATABASE_URL")
+
+
+def test_backend_is_a_singleton_with_lazy_pool(monkeypatch):
+    monkeypatch.setattr(deps.settings, "data_backend", "supabase")
+    monkeypatch.setattr(deps.settings, "database_url", "postgresql://localhost:1/unused")
+    monkeypatch.setattr(deps.settings, "db_pool_max_size", 3)
+    deps.close_backend()
+    try:
+        backend = deps.get_backend()
+        assert deps.get_backend() is backend
+
+        stats = TestClient(app).get("/api/metrics").json()["db_pool"]
+        assert stats["open"] is False
+        assert stats["max_size"] == 3
+        assert stats["in_use"] == 0
+    finally:
+        deps.close_backend()
+
+
+
+def test_pools_disable_prepared_statements(monkeypatch):
+    # The 6543 transaction pooler drops prepared statements between transactions
+    monkeypatch.setattr(deps.settings, "data_backend", "supabase")
+    monkeypatch.setattr(deps.settings, "database_url", "postgresql://localhost:1/unused")
+    deps.close_backend()
+    asyncio.run(deps.close_async_backend())
+    try:
+        assert deps.get_backend().pool.kwargs == {"prepare_threshold": None}
+        assert deps.get_async_backend().pool.kwargs == {"prepare_threshold": None}
+    finally:
+        deps.close_backend()
+        asyncio.run(deps.close_async_backend())
+    backend = SupabaseBackend("postgresql://localhost:1/unused", prepare_threshold=5)
+    assert backend.pool.kwargs == {"prepare_threshold": 5}
+
+@pytest.mark.skipif(not TEST_DB_URL, reason="SARICOACH_TEST_DATABASE_URL not set")
+def test_fetch_store_summary_reuses_pooled_connection():
+    backend = SupabaseBackend(TEST_DB_URL, min_size=1, max_size=1)
+    try:
+        # One connection, so session-local temp tables shadow any real ones
+        with backend.connection() as conn:
+            conn.execute("CREATE TEMP TABLE stores (id int, name text)")
+            conn.execute(
+                "CREATE TEMP TABLE daily_metrics (store_id int, date date, volume int, "
+                "revenue numeric, avg_basket_size numeric, avg_duration_seconds int)"
+            )
+            conn.execute("CREATE TEMP TABLE hourly_traffic (store_id int, date date, hour_of_day int, volume int)")
+            conn.execute("CREATE TEMP TABLE daily_insights (store_id int, date date, insights text[], coach_message text)")
+            conn.execute("INSERT INTO stores VALUES (1, 'Test Store')")
+            conn.execute(
+                "INSERT INTO daily_metrics VALUES (1, %s, 100, 1000, 2.5, 40), (1, %s, 80, 800, 2.0, 50)",
+                (dt.date(2024, 1, 2), dt.date(2024, 1, 1)),
+            )
+            conn.execute("INSERT INTO hourly_traffic VALUES (1, %s, 9, 12), (1, %s, 8, 5)", (dt.date(2024, 1, 2),) * 2)
+            conn.execute(
+                "INSERT INTO daily_insights VALUES (1, %s, ARRAY['Busy morning'], 'Stock up')",
+                (dt.date(2024, 1, 2),),
+            )
+
+        for _ in range(3):
+            summary = backend.fetch_store_summary(1)
+        assert summary.store_name == "Test Store"
+        assert summary.kpis[0].value == 100
+        assert summary.kpis[0].delta_pct == 25.0
+        assert [p["date"] for p in summary.chart] == ["08:00", "09:00"]
+        assert summary.insights == ["Busy morning"]
+        assert backend.fetch_store_summary(2) is None
+        assert list(backend.fetch_store_summaries([2, 1, 1])) == [1]
+
+        stats = backend.stats()
+        assert stats["open"] and stats["size"] == 1
+        assert stats["in_use"] == 0
+        assert stats["requests"] >= 6
+    finally:
+        backend.close()
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from saricoach.backends.supabase_backend import build_frames_from_supabase
+from saricoach.data_context import DataContext
+from saricoach.feature_frame import build_brand_day_frame, build_brand_day_frames_all_stores
+
+
+def test_pushdown_matches_pandas_frames(seeded_db):
+    url, schema, tables = seeded_db
+    ctx = DataContext(**tables)
+    expected = build_brand_day_frames_all_stores(ctx)
+    actual = build_frames_from_supabase(db_url=url, schema=schema)
+
+    assert actual.offsets == expected.offsets
+    pd.testing.assert_series_equal(actual.frame.dtypes, expected.frame.dtypes)
+    pd.testing.assert_frame_equal(actual.frame, expected.frame, rtol=1e-12)
+
+
+def test_pushdown_store_and_date_filters(seeded_db):
+    url, schema, tables = seeded_db
+    ctx = DataContext(**tables)
+    expected = build_brand_day_frame(ctx, 2, "2024-01-03", "2024-01-05")
+    frames = build_frames_from_supabase(2, "2024-01-03", "2024-01-05", db_url=url, schema=schema)
+
+    assert frames.store_ids == [2]
+    pd.testing.assert_frame_equal(frames.for_store(2), expected, rtol=1e-12)
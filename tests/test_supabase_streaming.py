@@ -0,0 +1,27 @@
+import pandas as pd
+
+from saricoach.backends.supabase_backend import build_context_from_supabase, stream_frames_from_supabase
+from saricoach.data_context import DataContext
+from saricoach.feature_frame import build_brand_day_frames_all_stores
+from saricoach.schema import compact_tables
+
+
+def test_streamed_frames_match_compact_pandas_frames(seeded_db):
+    url, schema, tables = seeded_db
+    expected = build_brand_day_frames_all_stores(DataContext(**compact_tables(tables)))
+
+    inc = stream_frames_from_supabase(chunksize=256, db_url=url, schema=schema)
+    actual = inc.store_frames()
+
+    assert actual.offsets == expected.offsets
+    pd.testing.assert_series_equal(actual.frame.dtypes, expected.frame.dtypes)
+    pd.testing.assert_frame_equal(actual.frame, expected.frame, rtol=1e-12)
+
+
+def test_chunked_context_matches_single_read(seeded_db):
+    url, schema, _ = seeded_db
+    whole = build_context_from_supabase(db_url=url, schema=schema)
+    chunked = build_context_from_supabase(chunksize=256, db_url=url, schema=schema)
+
+    for name, df in whole.tables().items():
+        pd.testing.assert_frame_equal(chunked.tables()[name], df, obj=name)